@@ -41,6 +41,10 @@ class AppBuilder:
             "Manual Entry": {
                 "enabled": True,
                 "config": {}
+            },
+            "Saved Results": {
+                "enabled": True,
+                "config": {}
             }
         }
         
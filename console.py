@@ -1,20 +1,28 @@
 #/console.py
-import flet as ft
 import datetime
-import flet
-from flet_dstring import DString, DStringConfig
+import re
+import sys
+
+# d[<style>, <text>] markup, reduced to its text when printing without the GUI
+_DSTRING_MARKUP = re.compile(r"d\[<[^>]*>,\s*<(.*?)>\]")
+
 
 class DHConsole:
     _instance = None
+    # Set before the first DHConsole() to print to stderr instead of building Flet controls
+    headless = False
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance.messages = []
-            cls._instance.container = ft.Container(bgcolor=ft.Colors.BLACK, padding=5, height=200, border_radius=5)
-            cls._instance.listView = ft.ListView(auto_scroll=True, spacing=0)
-            cls._instance.selection = ft.SelectionArea(content=cls._instance.listView)
-            cls._instance.container.content = cls._instance.selection
+            cls._instance.container = None
+            if not cls.headless:
+                import flet as ft
+                cls._instance.container = ft.Container(bgcolor=ft.Colors.BLACK, padding=5, height=200, border_radius=5)
+                cls._instance.listView = ft.ListView(auto_scroll=True, spacing=0)
+                cls._instance.selection = ft.SelectionArea(content=cls._instance.listView)
+                cls._instance.container.content = cls._instance.selection
         return cls._instance
 
     def print(self, message, severity="info"):
@@ -25,6 +33,14 @@ class DHConsole:
             "date": date
         })
 
+        if self._instance.container is None:
+            plain = _DSTRING_MARKUP.sub(r"\1", str(message))
+            print(f"{date.split(' ')[1]} [{severity}] {plain}", file=sys.stderr)
+            return
+
+        import flet as ft
+        from flet_dstring import DString, DStringConfig
+
         icon = None
         if severity == "info":
             icon = ft.Icons.INFO
@@ -33,7 +49,7 @@ class DHConsole:
         elif severity == "error":
             icon = ft.Icons.ERROR
 
-        dateFormatStr = f"d[<f=ffffff,w=bold,size=12>, <{date.split(" ")[1]}>] "
+        dateFormatStr = f"d[<f=ffffff,w=bold,size=12>, <{date.split(' ')[1]}>] "
         leading = "d[<f=ff6b6b,w=bold,size=14>, <DH$>>] "
         text = f"{dateFormatStr}{leading} {message}"
         dtext: ft.Text = DString(text, DStringConfig(default_color=ft.Colors.AMBER, default_size=12)).to_flet()
@@ -49,4 +65,4 @@ class DHConsole:
         self.update()
 
     def get_console(self):
-        return self._instance.container
\ No newline at end of file
+        return self._instance.container
@@ -0,0 +1,319 @@
+#/control_api.py
+"""
+Local REST and WebSocket API to drive Dog House from other tools.
+
+Scripts enqueue plugin searches, push targets into the processing queue,
+start and stop runs, and subscribe to /ws/results to receive every result
+as it completes. Runs use the same engines, run options and outcome
+history as the GUI and the CLI. The server only binds to 127.0.0.1 and
+refuses requests that do not come from, or are not addressed to, this
+machine. Start it with `python -m doghouse serve`.
+"""
+import asyncio
+import json
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Set
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict, Field
+from console import DHConsole
+from data.db_manager import DBManager
+from data.outcome_history import OutcomeHistory, config_hash
+from processor.base import ProcessorConfig, ConfigValueError
+from processor.engine import WorkItem, ENGINE_CONFIG_PROPERTIES
+from processor.manager import ProcessorManager
+from processor.metrics import RunMetrics
+from processor.runner import ProcessingRun, build_run, configure_rtt
+from processor.timeouts import RttTracker
+
+API_HOST = "127.0.0.1"
+DEFAULT_API_PORT = 8765
+LOCAL_HOSTS = {"127.0.0.1", "::1", "localhost"}
+SUBSCRIBER_BACKLOG = 10000
+
+
+class SearchRequest(BaseModel):
+    plugin: str
+    query: str
+    config: Dict[str, Any] = Field(default_factory=dict)
+    dedupe: bool = False
+    enqueue: bool = True
+
+
+class Target(BaseModel):
+    """A target to process, extra fields travel with it into the results"""
+    model_config = ConfigDict(extra="allow")
+    ip: str
+    port: int
+
+
+class RunRequest(BaseModel):
+    processor: str
+    config: Dict[str, Any] = Field(default_factory=dict)
+    options: Dict[str, Any] = Field(default_factory=dict)
+    consume: bool = True
+
+
+def _is_local(host: Optional[str]) -> bool:
+    """Whether a client address, Host header or origin (without scheme) names this machine"""
+    if not host:
+        return False
+    if host.startswith("["):
+        host = host[1:].split("]")[0]
+    elif host.count(":") == 1:
+        host = host.split(":")[0]
+    return host in LOCAL_HOSTS
+
+
+def _local_request(client: Optional[str], headers) -> bool:
+    origin = headers.get("origin")
+    return (_is_local(client) and _is_local(headers.get("host"))
+            and (not origin or _is_local(origin.split("//")[-1])))
+
+
+class ControlService:
+    """
+    State behind the API: the processing queue, the active run and the
+    WebSocket subscribers. Everything runs on the server's event loop.
+    """
+
+    def __init__(self):
+        self.console = DHConsole()
+        self.processors = ProcessorManager()
+        self.history = OutcomeHistory()
+        self.targets: List[Dict[str, Any]] = []
+        self.run: Optional[ProcessingRun] = None
+        self.metrics: Optional[RunMetrics] = None
+        self.run_id = 0
+        # Kept between runs so later runs start with the RTTs learned so far
+        self.rtt = RttTracker()
+        self._task: Optional[asyncio.Task] = None
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_BACKLOG)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """Hand an event to every subscriber, a subscriber that falls behind loses its oldest events"""
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    async def search(self, request: SearchRequest) -> List[Dict[str, Any]]:
+        from plugins.manager import PluginManager
+        plugin = PluginManager().get_plugin(request.plugin)
+        if plugin is None:
+            raise LookupError(f"Plugin '{request.plugin}' not found")
+        config = {control.id: control.default_value for control in plugin.get_ui_controls()}
+        config.update(request.config)
+        # Plugins may block on HTTP calls, keep them off the API loop
+        results = await asyncio.to_thread(asyncio.run, plugin.search(request.query, config))
+        rows = [asdict(result) for result in results]
+        if request.dedupe:
+            db = DBManager()
+            rows = [row for row in rows if db.add_if_original(row["ip"], int(row["port"]))]
+        if request.enqueue:
+            self.targets.extend(rows)
+        self.console.print(f"API search on {plugin.name} found {len(results)} results, kept {len(rows)}")
+        return rows
+
+    def start_run(self, request: RunRequest) -> int:
+        if self.running:
+            raise RuntimeError("A run is already active")
+        processor = self.processors.get_processor(request.processor)
+        if processor is None:
+            raise LookupError(f"Processor '{request.processor}' not found")
+        config = processor.build_config(request.config)
+        options = ProcessorConfig(ENGINE_CONFIG_PROPERTIES, request.options)
+        if not self.targets:
+            raise ValueError("The processing queue is empty")
+
+        rows = self.targets
+        items = [WorkItem(index=i, target={"ip": row["ip"], "port": row["port"]}, source=row)
+                 for i, row in enumerate(rows)]
+        if options["skip_recent_hours"] > 0:
+            items = self.history.exclude_recent(items, processor.name, config_hash(config),
+                                                options["skip_recent_hours"] * 3600)
+
+        self.run_id += 1
+        run_id = self.run_id
+        self.metrics = RunMetrics(expected=len(items))
+        history_keys = []
+
+        def on_finished(stage_index, item, result, final):
+            name, key = history_keys[stage_index]
+            self.history.record(name, item.target["ip"], item.target["port"], key, result)
+            if final:
+                self.metrics.item_done()
+            self.publish({
+                "type": "result", "run": run_id, "stage": stage_index, "processor": name, "final": final,
+                "target": item.source, "success": result.success, "color": result.color,
+                "message": result.message, "error_type": result.error_type, "details": result.details,
+            })
+
+        def on_error(stage_index, item, ex):
+            self.metrics.item_done()
+            self.publish({"type": "error", "run": run_id, "stage": stage_index, "target": item.source,
+                          "message": str(ex), "error_type": type(ex).__name__})
+
+        def on_skipped(stage_index, item):
+            self.metrics.item_done()
+            self.publish({"type": "skipped", "run": run_id, "stage": stage_index, "target": item.source})
+
+        self.run = build_run(
+            processor, config, options, self.processors.get_processor,
+            on_finished=on_finished,
+            on_error=on_error,
+            on_skipped=on_skipped,
+            metrics=self.metrics,
+            rtt=configure_rtt(self.rtt, options) if options["adaptive_timeouts"] else None,
+        )
+        history_keys.extend((stage.processor.name, config_hash(stage.config)) for stage in self.run.stages)
+        if request.consume:
+            self.targets = []
+        self._task = asyncio.create_task(self._execute(run_id, self.run, items))
+        return run_id
+
+    async def _execute(self, run_id: int, run: ProcessingRun, items: List[WorkItem]) -> None:
+        stages = [stage.processor.name for stage in run.stages]
+        self.publish({"type": "run_started", "run": run_id, "stages": stages, "targets": len(items)})
+        self.console.print(f"API run {run_id}: {' > '.join(stages)} over {len(items)} targets")
+        error = None
+        try:
+            await run.engine.run(items)
+        except Exception as ex:
+            error = str(ex)
+            self.console.print(f"API run {run_id} failed: {ex}", "error")
+        finally:
+            self.history.flush()
+        self.publish({
+            "type": "run_finished", "run": run_id, "stopped": run.engine.stopped, "error": error,
+            "summary": self.metrics.summary_lines(),
+        })
+
+    def stop_run(self) -> bool:
+        if not self.running:
+            return False
+        self.run.engine.stop()
+        return True
+
+    def status(self) -> Dict[str, Any]:
+        status = {"run": self.run_id, "running": self.running, "queued": len(self.targets)}
+        if self.metrics is not None:
+            status.update(
+                done=self.metrics.done,
+                expected=self.metrics.expected,
+                in_flight=self.metrics.in_flight,
+                rate=self.metrics.rate,
+                eta=self.metrics.eta,
+                colors=dict(self.metrics.colors),
+                errors=dict(self.metrics.errors),
+            )
+        return status
+
+
+def create_app(service: Optional[ControlService] = None) -> FastAPI:
+    service = service or ControlService()
+    app = FastAPI(title="Dog House control API")
+    app.state.service = service
+
+    @app.middleware("http")
+    async def local_only(request: Request, call_next):
+        # Refuse remote clients, and web pages from elsewhere reaching us through the browser
+        if not _local_request(request.client.host if request.client else None, request.headers):
+            return JSONResponse({"detail": "Only local requests are accepted"}, status_code=403)
+        return await call_next(request)
+
+    def fail(ex: Exception):
+        if isinstance(ex, LookupError):
+            raise HTTPException(status_code=404, detail=str(ex))
+        if isinstance(ex, RuntimeError):
+            raise HTTPException(status_code=409, detail=str(ex))
+        raise HTTPException(status_code=400, detail=str(ex))
+
+    @app.get("/processors")
+    async def list_processors():
+        return [
+            {"name": name, "description": processor.description,
+             "config": [{"name": p.name, "type": p.type.__name__, "default": p.default, "description": p.description}
+                        for p in processor.config_properties]}
+            for name, processor in service.processors.get_all_processors().items()
+        ]
+
+    @app.get("/options")
+    async def list_options():
+        return [{"name": p.name, "type": p.type.__name__, "default": p.default, "description": p.description}
+                for p in ENGINE_CONFIG_PROPERTIES]
+
+    @app.post("/searches")
+    async def search(request: SearchRequest):
+        try:
+            rows = await service.search(request)
+        except Exception as ex:
+            fail(ex)
+        return {"results": rows, "queued": len(service.targets)}
+
+    @app.get("/targets")
+    async def get_targets():
+        return service.targets
+
+    @app.post("/targets")
+    async def add_targets(targets: List[Target]):
+        service.targets.extend(target.model_dump() for target in targets)
+        return {"added": len(targets), "queued": len(service.targets)}
+
+    @app.delete("/targets")
+    async def clear_targets():
+        removed = len(service.targets)
+        service.targets = []
+        return {"removed": removed}
+
+    @app.post("/runs")
+    async def start_run(request: RunRequest):
+        try:
+            run_id = service.start_run(request)
+        except (LookupError, RuntimeError, ConfigValueError, ValueError) as ex:
+            fail(ex)
+        return {"run": run_id}
+
+    @app.get("/runs/current")
+    async def run_status():
+        return service.status()
+
+    @app.delete("/runs/current")
+    async def stop_run():
+        if not service.stop_run():
+            raise HTTPException(status_code=409, detail="No run is active")
+        return {"stopped": service.run_id}
+
+    @app.websocket("/ws/results")
+    async def stream_results(websocket: WebSocket):
+        if not _local_request(websocket.client.host if websocket.client else None, websocket.headers):
+            await websocket.close(code=1008)
+            return
+        await websocket.accept()
+        queue = service.subscribe()
+        try:
+            while True:
+                await websocket.send_text(json.dumps(await queue.get(), default=str))
+        except (WebSocketDisconnect, RuntimeError):
+            pass
+        finally:
+            service.unsubscribe(queue)
+
+    return app
+
+
+def serve(port: int = DEFAULT_API_PORT) -> None:
+    import uvicorn
+    uvicorn.run(create_app(), host=API_HOST, port=port, log_level="warning")
@@ -1,8 +1,10 @@
 # data/AggResultQueue.py
-from typing import List, Optional
+import flet as ft
+from typing import Callable, Iterable, List, Optional
 from data.Models import AggResult
 from interface.elements.ExpandableTiles import ExpandableListTile, DynamicExpandableList
 from data.db_manager import DBManager
+from data.outcome_history import OutcomeHistory, target_key
 
 class AggResultQueue:
     def __init__(self, purpose):
@@ -10,10 +12,14 @@ class AggResultQueue:
         self.attached_list = None
         self.results: List[AggResult] = []
         self.db = DBManager()
+        self.on_pin_changed: Optional[Callable[[int], None]] = None
 
-    def add_result(self, result: AggResult):
-        """Add a single result and sync if list is attached."""
-        isUnseen = self.db.add_if_original(result.ip, int(result.port))
+    def add_result(self, result: AggResult, sync: bool = True, record: bool = True):
+        """Add a single result and sync if list is attached. With record False the search history is left alone."""
+        if record:
+            isUnseen = self.db.add_if_original(result.ip, int(result.port))
+        else:
+            isUnseen = result.isUnseen
         new_result = AggResult(
             ip=result.ip,
             port=result.port,
@@ -26,19 +32,53 @@ class AggResultQueue:
             extra=result.extra,
             isUnseen=isUnseen
         )
+        # Carry over status attributes set outside the dataclass (e.g. diff tags)
+        for key, value in result.__dict__.items():
+            if key not in new_result.__dict__:
+                setattr(new_result, key, value)
         setattr(new_result, 'isSelected', False)
         self.results.append(new_result)
-        self._sync_if_attached()
+        if sync:
+            self._sync_if_attached()
 
-    def add_results(self, results: List[AggResult]):
-        """Add multiple results and sync if list is attached."""
+    def add_results(self, results: Iterable[AggResult], record: bool = True):
+        """Add multiple results and sync once if list is attached."""
         for result in results:
-            self.add_result(result)  # Use add_result to ensure fresh copies
+            self.add_result(result, sync=False, record=record)  # Use add_result to ensure fresh copies
+        self._sync_if_attached()
+
+    def replace_results(self, results: Iterable[AggResult], record: bool = True):
+        """Swap the results for new ones and sync once if list is attached."""
+        self.results = []
+        self.add_results(results, record=record)
 
     def get_result_by_index(self, index: int) -> Optional[AggResult]:
         """Safely get result by index."""
         return self.results[index] if 0 <= index < len(self.results) else None
 
+    def load_last_outcomes(self):
+        """Attach the most recent processing outcome of each target from the history."""
+        try:
+            latest = OutcomeHistory().latest((result.ip, result.port) for result in self.results)
+        except Exception as ex:
+            print(f"Failed to load processing history: {ex}")
+            return
+        for result in self.results:
+            last = latest.get(target_key(result.ip, result.port))
+            if last:
+                setattr(result, 'last_outcome', last)
+        self._sync_if_attached()
+
+    def toggle_pinned(self, index: int):
+        """Pin or unpin a result so priority ordered runs process it first."""
+        result = self.get_result_by_index(index)
+        if not result:
+            return
+        setattr(result, 'pinned', not getattr(result, 'pinned', False))
+        if self.on_pin_changed:
+            self.on_pin_changed(index)
+        self._sync_if_attached()
+
     def select_all(self):
         """Select all results and sync UI if attached."""
         for result in self.results:
@@ -59,26 +99,57 @@ class AggResultQueue:
         self.attached_list = attached_list
         # Don't immediately sync - let the UI control handle its own mounting
 
+    def _build_tile(self, i: int, result: AggResult) -> ExpandableListTile:
+        trailing = "URL" if self.purpose == "PROC" else "CHECKBOX"
+        details = self._format_result_details(result)
+        title = f"{result.ip}:{result.port}"
+        last_outcome = getattr(result, 'last_outcome', None)
+        if getattr(result, 'message', None):
+            title += f" [Status]: {result.message}"
+        elif self.purpose == "PROC" and last_outcome:
+            title += (f" [Last]: {last_outcome['processor']}, "
+                      f"{OutcomeHistory.format_age(last_outcome['ts'])}: {last_outcome['message']}")
+
+        bgColor = "#37414f" if (not result.isUnseen and self.purpose != "PROC") else getattr(result, 'color', None)
+        expandable_tile = ExpandableListTile(title, expanded_content=details, bgcolor=bgColor)
+        expandable_tile.queue_index = i
+        expandable_tile.checkbox.value = getattr(result, 'isSelected', False)
+        expandable_tile.parent_queue = self
+        expandable_tile.set_trailing(trailing)
+        if getattr(result, 'processing', False):
+            expandable_tile.list_tile.trailing = ft.ProgressRing(width=16, height=16)
+        if getattr(result, 'pinned', False):
+            expandable_tile.list_tile.leading = ft.Icon(ft.Icons.PUSH_PIN, size=16)
+        return expandable_tile
+
+    def refresh_items(self, indices: List[int]):
+        """Rebuild only the tiles at indices, falling back to a full sync if the list is out of step."""
+        if not self.attached_list:
+            return
+        if len(self.attached_list.items) != len(self.results):
+            self.sync_list()
+            return
+        try:
+            for i in indices:
+                result = self.get_result_by_index(i)
+                if result is None:
+                    continue
+                tile = self._build_tile(i, result)
+                tile.is_expanded = self.attached_list.items[i].is_expanded
+                tile.content_container.visible = tile.is_expanded
+                tile.content_container.height = None if tile.is_expanded else 0
+                self.attached_list.items[i] = tile
+                self.attached_list.items_column.controls[i] = tile
+            self.attached_list._safe_update()
+        except Exception as e:
+            import traceback
+            print(f"Failed to refresh list items: {traceback.format_exc()}")
+
     def sync_list(self):
         if not self.attached_list:
             return
         try:
-            trailing = "URL" if self.purpose == "PROC" else "CHECKBOX"
-            
-            new_items = []
-            for i, result in enumerate(self.results):
-                details = self._format_result_details(result)
-                title = f"{result.ip}:{result.port}"
-                if getattr(result, 'message', None):
-                    title += f" [Status]: {result.message}"
- 
-                bgColor = "#37414f" if (not result.isUnseen and self.purpose != "PROC") else getattr(result, 'color', None)                   
-                expandable_tile = ExpandableListTile(title, expanded_content=details, bgcolor=bgColor)
-                expandable_tile.queue_index = i
-                expandable_tile.checkbox.value = getattr(result, 'isSelected', False)
-                expandable_tile.parent_queue = self
-                expandable_tile.set_trailing(trailing)
-                new_items.append(expandable_tile)
+            new_items = [self._build_tile(i, result) for i, result in enumerate(self.results)]
             
             self.attached_list.items = new_items
             self.attached_list.items_column.controls = new_items
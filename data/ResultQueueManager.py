@@ -77,6 +77,7 @@ class ResultQueueManager:
             self.proc_queue.results.extend(selected)
             self.results_queue.results = [
                 r for r in self.results_queue.results if r not in selected]
+            self.proc_queue.load_last_outcomes()
 
             self.console.print(f"Moved {len(selected)} items to processing")
             return self.proc_queue.results, self.results_queue.results
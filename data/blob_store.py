@@ -0,0 +1,84 @@
+# data/blob_store.py
+import hashlib
+import os
+import tempfile
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Optional
+
+BLOB_THRESHOLD = 1024
+PREVIEW_LENGTH = 160
+BLOB_KEY = "$blob"
+
+
+class BlobStore:
+    """
+    Content-addressed store for large raw responses.
+
+    Each payload is written once, zlib-compressed, under the SHA-256 of its
+    content, so identical responses (default pages, honeypot farms) share
+    one file. Results keep a small reference dict holding the hash, the
+    original size and a short preview in place of the payload.
+    """
+    _instance = None
+
+    def __init__(self, root: Path = Path("saved_results") / "blobs"):
+        if not BlobStore._instance:
+            self.root = Path(root)
+            self.lock = threading.Lock()
+            self._known = set()
+            BlobStore._instance = self
+        else:
+            self.root = BlobStore._instance.root
+            self.lock = BlobStore._instance.lock
+            self._known = BlobStore._instance._known
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:]
+
+    def put(self, data: str) -> str:
+        """Store data if it is not stored yet and return its hash"""
+        raw = data.encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        if digest in self._known:
+            return digest
+        path = self._path(digest)
+        with self.lock:
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # Write then rename so a crash never leaves a truncated blob under its hash
+                fd, tmp = tempfile.mkstemp(dir=path.parent)
+                with os.fdopen(fd, "wb") as f:
+                    f.write(zlib.compress(raw, 6))
+                os.replace(tmp, path)
+            self._known.add(digest)
+        return digest
+
+    def get(self, digest: str) -> Optional[str]:
+        """Stored data for a hash, None if the blob is missing"""
+        try:
+            return zlib.decompress(self._path(digest).read_bytes()).decode("utf-8")
+        except (OSError, zlib.error):
+            return None
+
+    def externalize(self, value: Any, threshold: int = BLOB_THRESHOLD) -> Any:
+        """Copy of value with every string longer than threshold replaced by a blob reference"""
+        if isinstance(value, dict):
+            return {key: self.externalize(item, threshold) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self.externalize(item, threshold) for item in value]
+        if isinstance(value, str) and len(value) > threshold:
+            return {BLOB_KEY: self.put(value), "size": len(value), "preview": value[:PREVIEW_LENGTH]}
+        return value
+
+    def resolve(self, value: Any) -> Any:
+        """Copy of value with blob references replaced by their data, or their preview if missing"""
+        if isinstance(value, dict):
+            if BLOB_KEY in value:
+                data = self.get(value[BLOB_KEY])
+                return data if data is not None else value.get("preview", "")
+            return {key: self.resolve(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.resolve(item) for item in value]
+        return value
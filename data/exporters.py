@@ -0,0 +1,234 @@
+# data/exporters.py
+import csv
+import html
+import json
+from abc import ABC, abstractmethod
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional, TextIO, Tuple
+from data.blob_store import BlobStore
+
+EXPORT_COLUMNS = [
+    "ip", "port", "service", "location", "asn", "banner", "domain", "date", "extra",
+    "isUnseen", "processed", "failed", "color", "message",
+]
+
+
+@dataclass
+class OutcomeSummary:
+    """Outcome counts gathered while rows stream past an exporter"""
+    total: int = 0
+    processed: int = 0
+    failed: int = 0
+    pending: int = 0
+    colors: Counter = field(default_factory=Counter)
+
+    def add(self, attrs: Dict[str, Any]) -> None:
+        self.total += 1
+        if attrs.get("processed"):
+            self.processed += 1
+        elif attrs.get("failed"):
+            self.failed += 1
+        else:
+            self.pending += 1
+        if attrs.get("color"):
+            self.colors[attrs["color"]] += 1
+
+    def lines(self) -> list:
+        lines = [
+            f"Total: {self.total}",
+            f"Processed: {self.processed}",
+            f"Failed: {self.failed}",
+            f"Not processed: {self.pending}",
+        ]
+        lines += [f"Color {color}: {count}" for color, count in self.colors.most_common()]
+        return lines
+
+
+def split_row(result: Any) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """Split a queue item into its flat attributes and its details dict, with stored responses resolved."""
+    attrs = dict(result.__dict__) if not isinstance(result, dict) else dict(result)
+    details = attrs.pop("details", None)
+    if details:
+        details = BlobStore().resolve(details)
+    attrs.pop("isSelected", None)
+    attrs.pop("processing", None)
+    return attrs, details
+
+
+class ExporterBase(ABC):
+    """
+    Base class for streaming exporters.
+
+    Rows are written one at a time as they are pulled from the iterable and
+    the outcome summary is built in that same pass, so memory use does not
+    grow with the number of rows.
+    """
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        """Name of the format shown in UI"""
+        pass
+
+    @property
+    @abstractmethod
+    def extension(self) -> str:
+        """File extension without the dot"""
+        pass
+
+    def begin(self, f: TextIO, total: Optional[int]) -> None:
+        """Write anything that goes before the first row"""
+        pass
+
+    @abstractmethod
+    def write_row(self, f: TextIO, index: int, attrs: Dict[str, Any], details: Optional[Dict[str, Any]]) -> None:
+        """Write a single row"""
+        pass
+
+    def end(self, f: TextIO, summary: OutcomeSummary) -> None:
+        """Write anything that goes after the last row"""
+        pass
+
+    def export(self, rows: Iterable[Any], f: TextIO, total: Optional[int] = None) -> OutcomeSummary:
+        summary = OutcomeSummary()
+        self.begin(f, total)
+        for index, row in enumerate(rows):
+            attrs, details = split_row(row)
+            summary.add(attrs)
+            self.write_row(f, index, attrs, details)
+        self.end(f, summary)
+        return summary
+
+
+class CsvExporter(ExporterBase):
+    @property
+    def name(self) -> str:
+        return "CSV"
+
+    @property
+    def extension(self) -> str:
+        return "csv"
+
+    def begin(self, f, total):
+        csv.writer(f).writerow(EXPORT_COLUMNS + ["details"])
+
+    def write_row(self, f, index, attrs, details):
+        csv.writer(f).writerow(
+            [attrs.get(col, "") for col in EXPORT_COLUMNS]
+            + [json.dumps(details, default=str) if details else ""]
+        )
+
+
+class NdjsonExporter(ExporterBase):
+    @property
+    def name(self) -> str:
+        return "NDJSON"
+
+    @property
+    def extension(self) -> str:
+        return "ndjson"
+
+    def write_row(self, f, index, attrs, details):
+        attrs["details"] = details
+        f.write(json.dumps(attrs, default=str))
+        f.write("\n")
+
+
+class MarkdownExporter(ExporterBase):
+    columns = ["ip", "port", "service", "color", "message"]
+
+    @property
+    def name(self) -> str:
+        return "Markdown"
+
+    @property
+    def extension(self) -> str:
+        return "md"
+
+    def __init__(self, page_size: int = 500):
+        self.page_size = page_size
+
+    @staticmethod
+    def _cell(value: Any) -> str:
+        return str(value if value is not None else "").replace("|", "\\|").replace("\n", " ")
+
+    def begin(self, f, total):
+        f.write("# Dog House processing report\n")
+        if total is not None:
+            f.write(f"\n{total} items\n")
+
+    def write_row(self, f, index, attrs, details):
+        if index % self.page_size == 0:
+            f.write(f"\n## Page {index // self.page_size + 1}\n\n")
+            f.write("| # | " + " | ".join(self.columns) + " |\n")
+            f.write("|---|" + "---|" * len(self.columns) + "\n")
+        f.write(f"| {index + 1} | " + " | ".join(self._cell(attrs.get(c)) for c in self.columns) + " |\n")
+
+    def end(self, f, summary):
+        f.write("\n## Summary\n\n")
+        for line in summary.lines():
+            f.write(f"- {line}\n")
+
+
+class HtmlExporter(ExporterBase):
+    columns = ["ip", "port", "service", "color", "message"]
+
+    @property
+    def name(self) -> str:
+        return "HTML"
+
+    @property
+    def extension(self) -> str:
+        return "html"
+
+    def __init__(self, page_size: int = 500):
+        self.page_size = page_size
+
+    def begin(self, f, total):
+        f.write("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Dog House processing report</title>\n")
+        f.write("<style>body{font-family:sans-serif;background:#111;color:#ddd}"
+                "table{border-collapse:collapse}td,th{border:1px solid #444;padding:2px 6px}"
+                "nav a{margin-right:6px;color:#a0cafd}</style></head><body>\n")
+        f.write("<h1>Dog House processing report</h1>\n")
+        if total:
+            pages = (total + self.page_size - 1) // self.page_size
+            f.write("<nav>" + "".join(f"<a href=\"#page-{p}\">{p}</a>" for p in range(1, pages + 1))
+                    + "<a href=\"#summary\">Summary</a></nav>\n")
+
+    def write_row(self, f, index, attrs, details):
+        if index % self.page_size == 0:
+            if index:
+                f.write("</table></section>\n")
+            page = index // self.page_size + 1
+            f.write(f"<section id=\"page-{page}\"><h2>Page {page}</h2><table>\n<tr><th>#</th>"
+                    + "".join(f"<th>{c}</th>" for c in self.columns) + "</tr>\n")
+        color = html.escape(str(attrs.get("color") or ""))
+        f.write(f"<tr style=\"color:{color}\"><td>{index + 1}</td>"
+                + "".join(f"<td>{html.escape(str(attrs.get(c) if attrs.get(c) is not None else ''))}</td>"
+                          for c in self.columns)
+                + "</tr>\n")
+
+    def end(self, f, summary):
+        if summary.total:
+            f.write("</table></section>\n")
+        f.write("<section id=\"summary\"><h2>Summary</h2><ul>\n")
+        for line in summary.lines():
+            f.write(f"<li>{html.escape(line)}</li>\n")
+        f.write("</ul></section></body></html>\n")
+
+
+EXPORTERS: Dict[str, ExporterBase] = {}
+
+
+def register_exporter(exporter: ExporterBase) -> None:
+    """Register an exporter so it is offered wherever exports are listed"""
+    EXPORTERS[exporter.name] = exporter
+
+
+def get_exporter(name: str) -> Optional[ExporterBase]:
+    return EXPORTERS.get(name)
+
+
+for _exporter in (CsvExporter(), NdjsonExporter(), MarkdownExporter(), HtmlExporter()):
+    register_exporter(_exporter)
@@ -2,10 +2,13 @@
 import json
 from pathlib import Path
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 from data.Models import AggResult
+from data.exporters import get_exporter
 from console import DHConsole
 
+READ_CHUNK_SIZE = 1 << 16
+
 
 class JsonStorageManager:
     def __init__(self, results_dir: Path, console: DHConsole):
@@ -27,25 +30,46 @@ class JsonStorageManager:
         self.console.print(f"Saved {len(results)} results to {filename}")
         return filename
 
+    def export(self, results: list, prefix: str, format_name: str) -> Optional[Path]:
+        """
+        Stream results to a file using one of the registered exporters.
+
+        Args:
+            results: Queue items to export
+            prefix: Filename prefix, e.g. "processing"
+            format_name: Name of a registered exporter, e.g. "CSV"
+
+        Returns:
+            Path of the written file, or None if nothing was written
+        """
+        exporter = get_exporter(format_name)
+        if not exporter:
+            self.console.print(f"Unknown export format: {format_name}", "error")
+            return None
+        if not results:
+            self.console.print("No results to export", "warning")
+            return None
+
+        # Only the list of references is copied, rows are streamed from it
+        rows = list(results)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = self.results_dir / f"{prefix}_{timestamp}.{exporter.extension}"
+
+        with open(filename, 'w', newline='', encoding='utf-8') as f:
+            summary = exporter.export(rows, f, total=len(rows))
+
+        self.console.print(
+            f"Exported {summary.total} results to {filename} "
+            f"({summary.processed} processed, {summary.failed} failed)")
+        return filename
+
     def load_from_json(self, file_path: Path) -> List[AggResult]:
         try:
             with open(file_path, 'r') as file:
                 results = json.load(file)
 
             if results:
-                clean_results = []
-                for r in results:
-                    try:
-                        result = AggResult(**r)
-                        clean_results.append(result)
-                    except TypeError:
-                        expected_args = set(
-                            AggResult.__init__.__code__.co_varnames)
-                        filtered_data = {k: v for k,
-                                         v in r.items() if k in expected_args}
-                        result = AggResult(**filtered_data)
-                        clean_results.append(result)
-
+                clean_results = [self.result_from_dict(r) for r in results]
                 self.console.print(f"Loaded {len(results)} results")
                 return clean_results
             return []
@@ -53,3 +77,85 @@ class JsonStorageManager:
             self.console.print(
                 f"Error loading results from JSON: {ex}", "error")
             return []
+
+    @staticmethod
+    def result_from_dict(data: Dict[str, Any]) -> AggResult:
+        """Build an AggResult from a saved dict, dropping unknown keys."""
+        try:
+            return AggResult(**data)
+        except TypeError:
+            expected_args = set(AggResult.__init__.__code__.co_varnames)
+            filtered_data = {k: v for k, v in data.items() if k in expected_args}
+            return AggResult(**filtered_data)
+
+    @staticmethod
+    def iter_from_json(file_path: Path) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the objects of a saved results file one at a time.
+
+        Saved files are a single JSON array, so this decodes it element by
+        element from fixed-size chunks instead of loading the whole document.
+
+        Args:
+            file_path: Path to a file written by save_to_json
+
+        Yields:
+            dict: One saved result per iteration
+
+        Raises:
+            ValueError: If the file is not a JSON array of objects
+        """
+        decoder = json.JSONDecoder()
+        with open(file_path, 'r') as file:
+            buffer = ""
+            pos = 0
+            eof = False
+            started = False
+
+            while True:
+                if not eof and len(buffer) - pos < READ_CHUNK_SIZE:
+                    chunk = file.read(READ_CHUNK_SIZE)
+                    if chunk:
+                        buffer = buffer[pos:] + chunk
+                        pos = 0
+                    else:
+                        eof = True
+
+                # Skip whitespace and separators between elements
+                while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                    pos += 1
+
+                if pos >= len(buffer):
+                    if not eof:
+                        continue
+                    if started:
+                        raise ValueError(f"Unexpected end of file in {file_path}")
+                    return
+
+                if not started:
+                    if buffer[pos] != "[":
+                        raise ValueError(f"{file_path} is not a JSON array")
+                    started = True
+                    pos += 1
+                    continue
+
+                if buffer[pos] == "]":
+                    return
+
+                try:
+                    obj, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    # Element spans past the buffered data, pull in more
+                    chunk = file.read(READ_CHUNK_SIZE)
+                    if not chunk:
+                        eof = True
+                    buffer = buffer[pos:] + chunk
+                    pos = 0
+                    continue
+
+                if not isinstance(obj, dict):
+                    raise ValueError(f"{file_path} contains a non-object element")
+                pos = end
+                yield obj
@@ -0,0 +1,172 @@
+# data/outcome_history.py
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+from console import DHConsole
+from processor.resilience import REJECTION_ERRORS
+
+HISTORY_BATCH_SIZE = 500
+DETAIL_PREVIEW_LENGTH = 200
+
+
+def config_hash(config: Optional[Mapping[str, Any]]) -> str:
+    """Stable short hash of a processor config, equal configs give equal hashes"""
+    encoded = json.dumps(dict(config or {}), sort_keys=True, default=str)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+def target_key(ip: Any, port: Any) -> Tuple[str, Any]:
+    """(ip, port) as stored, numeric ports as ints and anything else a plugin gave as text"""
+    port = str(port).strip()
+    return str(ip), int(port) if port.isdigit() else port
+
+
+def _key_details(details: Optional[Dict[str, Any]]) -> str:
+    """Details as JSON with long values cut down, full responses are not kept"""
+    def trim(value):
+        if isinstance(value, dict):
+            return {key: trim(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [trim(item) for item in value[:10]]
+        if isinstance(value, str) and len(value) > DETAIL_PREVIEW_LENGTH:
+            return value[:DETAIL_PREVIEW_LENGTH] + "..."
+        return value
+    return json.dumps(trim(details or {}), default=str)
+
+
+class OutcomeHistory:
+    """
+    Every processing outcome, keyed by (processor, ip, port, config hash).
+
+    Outcomes are buffered and written in batches to an indexed SQLite table,
+    so recording from engine callbacks stays cheap. `recent` tells a run
+    which targets it can skip and `latest` gives the last outcome of each
+    target for the queue tiles.
+    """
+    _instance = None
+
+    def __init__(self, db_path="./data/history.db"):
+        if not OutcomeHistory._instance:
+            self.console = DHConsole()
+            self.lock = threading.Lock()
+            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._pending: List[tuple] = []
+            self._create_tables()
+            OutcomeHistory._instance = self
+        else:
+            self.console = OutcomeHistory._instance.console
+            self.lock = OutcomeHistory._instance.lock
+            self.conn = OutcomeHistory._instance.conn
+            self._pending = OutcomeHistory._instance._pending
+
+    def _create_tables(self) -> None:
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS outcomes ("
+                "processor TEXT, ip TEXT, port INTEGER, config_hash TEXT, ts REAL, "
+                "success INTEGER, color TEXT, message TEXT, error_type TEXT, details TEXT)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS outcomes_target "
+                "ON outcomes (processor, ip, port, config_hash, ts)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS outcomes_latest ON outcomes (ip, port, ts)")
+
+    def record(self, processor: str, ip: str, port: int, config_key: str, result) -> None:
+        """
+        Queue a ProcessingResult for writing, flushed in batches. Results the
+        engine reported without probing (e.g. an open circuit) are left out,
+        so later runs do not skip targets that were never scanned.
+        """
+        if result.error_type in REJECTION_ERRORS:
+            return
+        row = (
+            processor, *target_key(ip, port), config_key, time.time(),
+            int(bool(result.success)), result.color, result.message,
+            result.error_type, _key_details(result.details),
+        )
+        with self.lock:
+            self._pending.append(row)
+            if len(self._pending) < HISTORY_BATCH_SIZE:
+                return
+            self._write_pending()
+
+    def flush(self) -> None:
+        """Write every buffered outcome now"""
+        with self.lock:
+            self._write_pending()
+
+    def _write_pending(self) -> None:
+        if not self._pending:
+            return
+        rows = list(self._pending)
+        self._pending.clear()
+        try:
+            with self.conn:
+                self.conn.executemany("INSERT INTO outcomes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        except sqlite3.Error as ex:
+            self.console.print(f"Failed to save {len(rows)} processing outcomes: {ex}", "error")
+
+    def recent(self, processor: str, config_key: str, max_age: float) -> Set[Tuple[str, int]]:
+        """(ip, port) pairs processed by processor with this config within max_age seconds"""
+        self.flush()
+        since = time.time() - max_age
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT DISTINCT ip, port FROM outcomes WHERE processor = ? AND config_hash = ? AND ts >= ?",
+                (processor, config_key, since),
+            ).fetchall()
+        return {target_key(ip, port) for ip, port in rows}
+
+    def exclude_recent(self, items: List[Any], processor: str, config_key: str, max_age: float) -> List[Any]:
+        """Work items whose target was not processed by processor with this config within max_age seconds"""
+        recent = self.recent(processor, config_key, max_age)
+        if not recent:
+            return list(items)
+        return [item for item in items
+                if target_key(item.target.get("ip"), item.target.get("port")) not in recent]
+
+    def latest(self, targets: Iterable[Tuple[str, int]]) -> Dict[Tuple[str, int], Dict[str, Any]]:
+        """Most recent outcome of each (ip, port) by any processor, targets never processed are left out"""
+        self.flush()
+        wanted = {target_key(ip, port) for ip, port in targets}
+        if not wanted:
+            return {}
+        latest: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        with self.lock:
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS wanted_targets (ip TEXT, port INTEGER)")
+            try:
+                with self.conn:
+                    self.conn.execute("DELETE FROM temp.wanted_targets")
+                    self.conn.executemany("INSERT INTO temp.wanted_targets VALUES (?, ?)", wanted)
+                # With max() SQLite takes the bare columns from the row holding the maximum
+                rows = self.conn.execute(
+                    "SELECT o.ip, o.port, o.processor, max(o.ts), o.success, o.color, o.message, o.error_type "
+                    "FROM outcomes o JOIN temp.wanted_targets w ON o.ip = w.ip AND o.port = w.port "
+                    "GROUP BY o.ip, o.port"
+                ).fetchall()
+            finally:
+                with self.conn:
+                    self.conn.execute("DELETE FROM temp.wanted_targets")
+        for ip, port, processor, ts, success, color, message, error_type in rows:
+            latest[target_key(ip, port)] = {
+                "processor": processor,
+                "ts": ts,
+                "success": bool(success),
+                "color": color,
+                "message": message,
+                "error_type": error_type,
+            }
+        return latest
+
+    @staticmethod
+    def format_age(ts: float) -> str:
+        age = max(0.0, time.time() - ts)
+        if age < 3600:
+            return f"{int(age // 60)}m ago"
+        if age < 86400:
+            return f"{int(age // 3600)}h ago"
+        return f"{int(age // 86400)}d ago"
@@ -0,0 +1,232 @@
+# data/search_index.py
+import json
+import sqlite3
+import threading
+from itertools import count
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from data.Models import AggResult
+from data.json_storage import JsonStorageManager
+from data.blob_store import BlobStore
+from console import DHConsole
+
+INDEX_BATCH_SIZE = 5000
+INDEXED_COLUMNS = ("banner", "extra", "service", "domain", "message", "details")
+# Stored alongside the text so a hit can be turned back into an AggResult
+STORED_COLUMNS = ("ip", "port", "location", "asn", "date")
+RESULT_COLUMNS = ("banner", "extra", "service", "domain") + STORED_COLUMNS
+# Bumped whenever the table layout changes, the index is then rebuilt from the snapshots
+SCHEMA_VERSION = 2
+
+_FTS_COLUMNS = ", ".join(INDEXED_COLUMNS + tuple(f"{c} UNINDEXED" for c in STORED_COLUMNS + ("source",)))
+_ROW_WIDTH = len(INDEXED_COLUMNS) + len(STORED_COLUMNS) + 1
+
+
+class SearchIndex:
+    """
+    Full-text index over saved result snapshots and the live queues.
+
+    Snapshots are indexed incrementally into an on-disk SQLite FTS5 table,
+    keyed by file path, size and mtime, so only new or rewritten files are
+    read on refresh. Live queue rows go into a connection-local temp table
+    that tracks the queue items it holds, so each sync only indexes items
+    that are new or whose status changed and drops the ones that left.
+    """
+    _instance = None
+
+    def __init__(self, db_path="./data/index.db", results_dir: Path = Path("saved_results")):
+        if not SearchIndex._instance:
+            self.results_dir = Path(results_dir)
+            self.console = DHConsole()
+            self.lock = threading.Lock()
+            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+            # (queue name, id of the queue item) -> (item, status it was indexed with, rowid)
+            self._live: Dict[Tuple[str, int], Tuple[AggResult, tuple, int]] = {}
+            self._live_rowids = count(1)
+            self._create_tables()
+            SearchIndex._instance = self
+        else:
+            self.results_dir = SearchIndex._instance.results_dir
+            self.console = SearchIndex._instance.console
+            self.lock = SearchIndex._instance.lock
+            self.conn = SearchIndex._instance.conn
+            self._live = SearchIndex._instance._live
+            self._live_rowids = SearchIndex._instance._live_rowids
+
+    def _create_tables(self) -> None:
+        with self.conn:
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                self.conn.execute("DROP TABLE IF EXISTS results_fts")
+                self.conn.execute("DROP TABLE IF EXISTS indexed_files")
+                self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self.conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS results_fts USING fts5({_FTS_COLUMNS})")
+            self.conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS temp.live_fts USING fts5({_FTS_COLUMNS})")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS indexed_files ("
+                "path TEXT PRIMARY KEY, size INTEGER, mtime REAL, rows INTEGER)"
+            )
+
+    @staticmethod
+    def _to_row(data: Dict[str, Any], source: str) -> tuple:
+        details = ""
+        if data.get("details"):
+            # Index the full responses, not just the previews the results keep
+            details = json.dumps(BlobStore().resolve(data["details"]), default=str)
+        text = tuple(str(data.get(column) or "") for column in INDEXED_COLUMNS[:-1])
+        stored = tuple(
+            value if value is None or isinstance(value, (str, int, float)) else str(value)
+            for value in (data.get(column) for column in STORED_COLUMNS)
+        )
+        return text + (details,) + stored + (source,)
+
+    @staticmethod
+    def _to_result(row: tuple) -> AggResult:
+        data = {key: value for key, value in zip(RESULT_COLUMNS, row) if value not in (None, "")}
+        return JsonStorageManager.result_from_dict(data)
+
+    def _insert_rows(self, table: str, rows: Iterable[tuple], with_rowid: bool = False) -> int:
+        total = 0
+        batch = []
+        width = _ROW_WIDTH + with_rowid
+        columns = f"(rowid, {', '.join(INDEXED_COLUMNS + STORED_COLUMNS)}, source)" if with_rowid else ""
+        sql = f"INSERT INTO {table}{columns} VALUES ({', '.join('?' * width)})"
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= INDEX_BATCH_SIZE:
+                self.conn.executemany(sql, batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            self.conn.executemany(sql, batch)
+            total += len(batch)
+        return total
+
+    def refresh(self) -> int:
+        """
+        Index any snapshot in the results directory that is new or changed.
+
+        Returns:
+            int: Number of rows added to the index
+        """
+        added = 0
+        if not self.results_dir.exists():
+            return added
+
+        with self.lock:
+            known = {
+                path: (size, mtime)
+                for path, size, mtime in self.conn.execute("SELECT path, size, mtime FROM indexed_files")
+            }
+            on_disk = set()
+
+            for file_path in sorted(self.results_dir.glob("*.json")):
+                stat = file_path.stat()
+                source = str(file_path.resolve())
+                on_disk.add(source)
+                if known.get(source) == (stat.st_size, stat.st_mtime):
+                    continue
+
+                try:
+                    with self.conn:
+                        if source in known:
+                            self.conn.execute("DELETE FROM results_fts WHERE source = ?", (source,))
+                        rows = self._insert_rows(
+                            "results_fts",
+                            (self._to_row(r, source) for r in JsonStorageManager.iter_from_json(file_path))
+                        )
+                        self.conn.execute(
+                            "INSERT OR REPLACE INTO indexed_files VALUES (?, ?, ?, ?)",
+                            (source, stat.st_size, stat.st_mtime, rows)
+                        )
+                    added += rows
+                except (ValueError, OSError) as ex:
+                    self.console.print(f"Skipping {file_path.name} while indexing: {ex}", "warning")
+
+            # Forget snapshots that were deleted from disk
+            with self.conn:
+                for source in set(known) - on_disk:
+                    self.conn.execute("DELETE FROM results_fts WHERE source = ?", (source,))
+                    self.conn.execute("DELETE FROM indexed_files WHERE path = ?", (source,))
+
+        if added:
+            self.console.print(f"Indexed {added} saved results")
+        return added
+
+    @staticmethod
+    def _live_status(result: AggResult) -> tuple:
+        """What makes an indexed live row stale when it changes"""
+        return getattr(result, 'message', None), getattr(result, 'color', None)
+
+    def index_live(self, queues: Dict[str, List[AggResult]]) -> int:
+        """
+        Bring the indexed live rows in line with the current queue contents.
+        Pass copies of the queue lists when calling from another thread.
+
+        Returns:
+            int: Number of rows indexed by this call
+        """
+        current = {
+            (name, id(result)): result
+            for name, results in queues.items() for result in results
+        }
+        with self.lock:
+            stale = {
+                key for key, (result, status, _) in self._live.items()
+                if current.get(key) is not result or self._live_status(result) != status
+            }
+            fresh = []
+            for key, result in current.items():
+                entry = self._live.get(key)
+                if entry is None or key in stale:
+                    fresh.append((key, result))
+            with self.conn:
+                self.conn.executemany(
+                    "DELETE FROM temp.live_fts WHERE rowid = ?",
+                    [(self._live.pop(key)[2],) for key in stale]
+                )
+                rows = []
+                for key, result in fresh:
+                    rowid = next(self._live_rowids)
+                    # Holding the item keeps its id from being reused while it is indexed
+                    self._live[key] = (result, self._live_status(result), rowid)
+                    rows.append((rowid,) + self._to_row(dict(result.__dict__), f"live:{key[0]}"))
+                return self._insert_rows("temp.live_fts", rows, with_rowid=True)
+
+    @staticmethod
+    def build_query(text: str) -> str:
+        """
+        Turn free text into an FTS5 prefix phrase query.
+
+        "Apache/2.4.49" tokenizes to apache 2 4 49, so quoting it as a phrase
+        matches the exact token sequence, and the trailing prefix lets
+        "OpenSSH_7.2" also match "OpenSSH_7.2p2".
+        """
+        return '"' + text.strip().replace('"', '""') + '" *'
+
+    def search(self, text: str, limit: Optional[int] = 1000, include_live: bool = True) -> List[AggResult]:
+        """
+        Search banners, extra data and messages across all indexed rows.
+
+        Args:
+            text: Free text to match, e.g. "Apache/2.4.49"
+            limit: Maximum number of results, None for no limit
+            include_live: Also match rows in the live queues
+
+        Returns:
+            List of AggResult objects for every matching row
+        """
+        if not text or not text.strip():
+            return []
+
+        query = self.build_query(text)
+        tables = ["results_fts"] + (["temp.live_fts"] if include_live else [])
+        columns = ", ".join(RESULT_COLUMNS)
+        sql = " UNION ALL ".join(f"SELECT {columns} FROM {t} WHERE {t.split('.')[-1]} MATCH ?" for t in tables)
+        params: list = [query] * len(tables)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [self._to_result(row) for row in rows]
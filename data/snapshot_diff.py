@@ -0,0 +1,174 @@
+# data/snapshot_diff.py
+import hashlib
+import re
+import socket
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Set, Tuple
+from data.Models import AggResult
+from data.json_storage import JsonStorageManager
+
+# Each compared field gets its own full-width digest in a row's fingerprint
+DIGEST_SIZE = 16
+DIFF_FIELDS = ("banner", "service", "outcome")
+
+# Key classes keep IPv4, IPv6 and hostname keys from colliding
+_IPV6_FLAG = 1 << 160
+_HOST_FLAG = 2 << 160
+
+# save_to_json names snapshots <prefix>_<YYYYmmdd_HHMMSS>.json
+_SNAPSHOT_TIME = re.compile(r"_(\d{8}_\d{6})$")
+
+DIFF_COLORS = {
+    "added": "green",
+    "removed": "red",
+    "changed": "yellow",
+}
+
+
+def _digest(value: Any) -> bytes:
+    text = str(value if value is not None else "")
+    return hashlib.blake2b(text.encode("utf-8", errors="ignore"), digest_size=DIGEST_SIZE).digest()
+
+
+def pack_key(ip: str, port: Any) -> int:
+    """Pack an ip:port pair into a single int usable as a set/dict key."""
+    try:
+        port = int(port or 0) & 0xFFFF
+    except (TypeError, ValueError):
+        # Not a port number, key the whole pair like a hostname
+        return _HOST_FLAG | (int.from_bytes(_digest(f"{ip}:{port}"), "big") << 16)
+    try:
+        return (int.from_bytes(socket.inet_aton(ip), "big") << 16) | port
+    except (OSError, TypeError):
+        pass
+    try:
+        return _IPV6_FLAG | (int.from_bytes(socket.inet_pton(socket.AF_INET6, ip), "big") << 16) | port
+    except (OSError, TypeError, ValueError):
+        return _HOST_FLAG | (int.from_bytes(_digest(ip), "big") << 16) | port
+
+
+def fingerprint(row: Dict[str, Any]) -> bytes:
+    """Digests of the compared fields of a saved row, one after the other."""
+    outcome = f"{row.get('color', '')}|{row.get('processed', '')}|{row.get('failed', '')}"
+    return _digest(row.get("banner")) + _digest(row.get("service")) + _digest(outcome)
+
+
+def changed_fields(old_print: bytes, new_print: bytes) -> List[str]:
+    """List which compared fields differ between two fingerprints."""
+    changed = []
+    for i, name in enumerate(DIFF_FIELDS):
+        part = slice(DIGEST_SIZE * i, DIGEST_SIZE * (i + 1))
+        if old_print[part] != new_print[part]:
+            changed.append(name)
+    return changed
+
+
+def snapshot_time(path: Path) -> float:
+    """When a snapshot was taken: the timestamp in its file name, or its mtime."""
+    path = Path(path)
+    match = _SNAPSHOT_TIME.search(path.stem)
+    if match:
+        try:
+            return datetime.strptime(match.group(1), "%Y%m%d_%H%M%S").timestamp()
+        except ValueError:
+            pass
+    return path.stat().st_mtime
+
+
+def order_snapshots(first: Path, second: Path) -> Tuple[Path, Path]:
+    """The two snapshots as (older, newer), whatever their prefixes."""
+    older, newer = sorted((Path(first), Path(second)), key=snapshot_time)
+    return older, newer
+
+
+@dataclass
+class SnapshotDiff:
+    """
+    Keys of the rows that differ between two snapshots. The rows themselves
+    stay on disk and are streamed back out by iter_results.
+    """
+    old_path: Path
+    new_path: Path
+    old_count: int = 0
+    new_count: int = 0
+    added: Set[int] = field(default_factory=set)
+    removed: Set[int] = field(default_factory=set)
+    changed: Dict[int, List[str]] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        return (f"{len(self.added)} added, {len(self.removed)} removed, "
+                f"{len(self.changed)} changed ({self.old_count} -> {self.new_count} rows)")
+
+    def iter_rows(self) -> Iterator[Tuple[Dict[str, Any], str]]:
+        """Stream (row, status) for every differing row, added and changed first."""
+        wanted = self.added | set(self.changed)
+        for row in JsonStorageManager.iter_from_json(self.new_path):
+            key = pack_key(row.get("ip"), row.get("port"))
+            if key not in wanted:
+                continue
+            wanted.discard(key)
+            fields = self.changed.get(key)
+            yield row, "added" if fields is None else f"changed: {', '.join(fields)}"
+        wanted = set(self.removed)
+        for row in JsonStorageManager.iter_from_json(self.old_path):
+            key = pack_key(row.get("ip"), row.get("port"))
+            if key in wanted:
+                wanted.discard(key)
+                yield row, "removed"
+
+    def iter_results(self) -> Iterator[AggResult]:
+        """Stream the diff as AggResults tagged with their diff status."""
+        for row, status in self.iter_rows():
+            result = JsonStorageManager.result_from_dict(row)
+            setattr(result, 'diff', status.split(":")[0])
+            setattr(result, 'message', status)
+            setattr(result, 'color', DIFF_COLORS[result.diff])
+            yield result
+
+    def to_results(self) -> List[AggResult]:
+        return list(self.iter_results())
+
+
+class SnapshotDiffer:
+    """
+    Compares two saved results snapshots by ip:port.
+
+    Both files are streamed. Only a packed key and the field digests are
+    held per row of the older snapshot, and only keys are kept for the
+    rows that differ, so memory stays flat no matter how large the rows
+    themselves are. When a snapshot holds an ip:port more than once, its
+    first row counts in both snapshots.
+    """
+
+    def diff(self, old_path: Path, new_path: Path) -> SnapshotDiff:
+        result = SnapshotDiff(Path(old_path), Path(new_path))
+
+        # Pass 1: fingerprint every row of the old snapshot
+        old_prints: Dict[int, bytes] = {}
+        for row in JsonStorageManager.iter_from_json(old_path):
+            result.old_count += 1
+            key = pack_key(row.get("ip"), row.get("port"))
+            if key not in old_prints:
+                old_prints[key] = fingerprint(row)
+
+        # Pass 2: stream the new snapshot against it. Matched keys are
+        # taken out, so whatever is left afterwards was removed.
+        seen = set()
+        for row in JsonStorageManager.iter_from_json(new_path):
+            result.new_count += 1
+            key = pack_key(row.get("ip"), row.get("port"))
+            if key in seen:
+                continue
+            seen.add(key)
+            old_print = old_prints.pop(key, None)
+            if old_print is None:
+                result.added.add(key)
+                continue
+            new_print = fingerprint(row)
+            if new_print != old_print:
+                result.changed[key] = changed_fields(old_print, new_print)
+
+        result.removed = set(old_prints)
+        return result
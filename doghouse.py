@@ -0,0 +1,288 @@
+#/doghouse.py
+"""
+Headless Dog House: run plugin searches, dedupe and processors from the
+command line, with NDJSON in and out, using the same engines as the GUI.
+
+    python -m doghouse search "Saved Results" "Apache/2.4.49" --dedupe > targets.ndjson
+    python -m doghouse process "Capture The Flag" -i targets.ndjson -c timeout=3 -O concurrency=200
+    python -m doghouse pipeline "Port Knocker > Capture The Flag?success" -i targets.ndjson
+"""
+import argparse
+import asyncio
+import json
+import sys
+from contextlib import contextmanager
+from dataclasses import asdict
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+from console import DHConsole
+
+# Everything below builds on the console singleton, make it headless before anything creates it
+DHConsole.headless = True
+
+from data.Models import AggResult
+from data.db_manager import DBManager
+from data.outcome_history import OutcomeHistory, config_hash
+from processor.base import ProcessorConfig, ConfigValueError
+from processor.engine import WorkItem, ENGINE_CONFIG_PROPERTIES
+from processor.manager import ProcessorManager
+from processor.metrics import RunMetrics
+from processor.pipeline import parse_pipeline
+from processor.runner import build_run, configure_rtt
+from processor.timeouts import RttTracker
+
+
+def parse_pairs(pairs: Optional[List[str]]) -> Dict[str, str]:
+    """key=value arguments as a dict of raw strings"""
+    values = {}
+    for pair in pairs or []:
+        name, sep, value = pair.partition("=")
+        if not sep:
+            raise ConfigValueError(f"Expected key=value, got '{pair}'")
+        values[name.strip()] = value
+    return values
+
+
+@contextmanager
+def open_stream(path: Optional[str], mode: str) -> Iterator[TextIO]:
+    """File at path, or stdin / stdout for '-' and None"""
+    if not path or path == "-":
+        yield sys.stdin if "r" in mode else sys.stdout
+        return
+    with open(path, mode, encoding="utf-8") as f:
+        yield f
+
+
+def read_ndjson(f: TextIO) -> Iterator[Dict[str, Any]]:
+    for number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as ex:
+            raise ValueError(f"Line {number} is not valid JSON: {ex}")
+        if not isinstance(row, dict) or "ip" not in row or "port" not in row:
+            raise ValueError(f"Line {number} needs an object with 'ip' and 'port'")
+        yield row
+
+
+def write_ndjson(f: TextIO, row: Dict[str, Any]) -> None:
+    f.write(json.dumps(row, default=str) + "\n")
+
+
+def _row(result: Any) -> Dict[str, Any]:
+    return asdict(result) if isinstance(result, AggResult) else dict(result.__dict__)
+
+
+def dedupe_rows(rows, record: bool = True) -> Iterator[Dict[str, Any]]:
+    """Rows whose ip:port is not in the search history, recording them unless record is False"""
+    db = DBManager()
+    for row in rows:
+        ip, port = row["ip"], int(row["port"])
+        unseen = db.add_if_original(ip, port) if record else not db.check_service(ip, port)
+        if unseen:
+            yield row
+
+
+async def cmd_search(args) -> int:
+    from plugins.manager import PluginManager
+    console = DHConsole()
+    plugin = PluginManager().get_plugin(args.plugin)
+    if plugin is None:
+        console.print(f"Plugin '{args.plugin}' not found", "error")
+        return 2
+    # Same values the GUI would send: control defaults, overridden from the command line
+    config = {control.id: control.default_value for control in plugin.get_ui_controls()}
+    config.update(parse_pairs(args.config))
+    results = await plugin.search(args.query, config)
+    rows = (_row(result) for result in results)
+    if args.dedupe:
+        rows = dedupe_rows(rows)
+    written = 0
+    with open_stream(args.output, "w") as out:
+        for row in rows:
+            write_ndjson(out, row)
+            written += 1
+    console.print(f"Found {len(results)} results, wrote {written}")
+    return 0
+
+
+async def cmd_dedupe(args) -> int:
+    console = DHConsole()
+    written = 0
+    with open_stream(args.input, "r") as f, open_stream(args.output, "w") as out:
+        for row in dedupe_rows(read_ndjson(f), record=not args.check_only):
+            write_ndjson(out, row)
+            written += 1
+    console.print(f"{written} targets not seen before")
+    return 0
+
+
+async def cmd_process(args) -> int:
+    console = DHConsole()
+    manager = ProcessorManager()
+    raw_options = parse_pairs(args.option)
+    if args.command == "pipeline":
+        # The first stage is the processor, the rest of the spec becomes the pipeline option
+        first, _, rest = args.spec.partition(">")
+        if "?" in first:
+            raise ValueError(f"'{first.strip()}': the first stage gets every target, "
+                             f"a ?condition only applies to the stages after it")
+        first_stage = parse_pipeline(first, manager.get_processor)[0]
+        processor = first_stage.processor
+        if "*" in first:
+            raw_options["concurrency"] = first_stage.concurrency
+        raw_options["pipeline"] = rest.strip()
+    else:
+        processor = manager.get_processor(args.processor)
+        if processor is None:
+            console.print(f"Processor '{args.processor}' not found", "error")
+            return 2
+
+    config = processor.build_config(parse_pairs(args.config))
+    options = ProcessorConfig(ENGINE_CONFIG_PROPERTIES, raw_options)
+
+    with open_stream(args.input, "r") as f:
+        rows = list(read_ndjson(f))
+    items = [WorkItem(index=i, target={"ip": row["ip"], "port": row["port"]}, source=row)
+             for i, row in enumerate(rows)]
+    history = OutcomeHistory()
+    if options["skip_recent_hours"] > 0:
+        before = len(items)
+        items = history.exclude_recent(items, processor.name, config_hash(config),
+                                       options["skip_recent_hours"] * 3600)
+        console.print(f"Skipping {before - len(items)} targets processed in the last {options['skip_recent_hours']}h")
+    if not items:
+        console.print("Nothing to process", "warning")
+        return 0
+
+    metrics = RunMetrics(expected=len(items))
+    rtt = configure_rtt(RttTracker(), options) if options["adaptive_timeouts"] else None
+    history_keys = []
+    with open_stream(args.output, "w") as out:
+
+        def emit(stage_index: int, item: WorkItem, **fields) -> None:
+            row = {**item.source, "stage": stage_index, **fields}
+            write_ndjson(out, row)
+
+        def on_finished(stage_index, item, result, final):
+            name, key = history_keys[stage_index]
+            history.record(name, item.target["ip"], item.target["port"], key, result)
+            if final:
+                metrics.item_done()
+            if final or args.all_stages:
+                emit(stage_index, item, processor=name, success=result.success, color=result.color,
+                     message=result.message, error_type=result.error_type, details=result.details)
+
+        def on_error(stage_index, item, ex):
+            metrics.item_done()
+            emit(stage_index, item, processor=history_keys[stage_index][0], success=False, color="red",
+                 message=str(ex), error_type=type(ex).__name__)
+
+        def on_skipped(stage_index, item):
+            metrics.item_done()
+            emit(stage_index, item, processor=history_keys[stage_index][0], skipped=True)
+
+        run = build_run(
+            processor, config, options, manager.get_processor,
+            on_finished=on_finished,
+            on_error=on_error,
+            on_skipped=on_skipped,
+            metrics=metrics,
+            rtt=rtt,
+            on_concurrency_changed=lambda limit, rate: console.print(
+                f"Concurrency set to {limit} ({rate * 100:.0f}% congestion errors)"),
+        )
+        history_keys.extend((stage.processor.name, config_hash(stage.config)) for stage in run.stages)
+        console.print(" > ".join(stage.processor.name for stage in run.stages) + f" over {len(items)} targets")
+        try:
+            await run.engine.run(items)
+        finally:
+            history.flush()
+            out.flush()
+
+    for line in metrics.summary_lines():
+        console.print(line)
+    if run.context.hits:
+        console.print(f"Connection cache: {run.context.hits} hits, {run.context.misses} probes")
+    return 0
+
+
+async def cmd_list(args) -> int:
+    if args.kind == "processors":
+        for name, processor in ProcessorManager().get_all_processors().items():
+            print(f"{name}: {processor.description}")
+            for prop in processor.config_properties:
+                print(f"    {prop.name} ({prop.type.__name__}, default {prop.default!r}): {prop.description}")
+    elif args.kind == "plugins":
+        from plugins.manager import PluginManager
+        for name, plugin in PluginManager().get_all_plugins().items():
+            print(f"{name}: {plugin.description}")
+            for control in plugin.get_ui_controls():
+                print(f"    {control.id}: {control.label}")
+    else:
+        for prop in ENGINE_CONFIG_PROPERTIES:
+            print(f"{prop.name} ({prop.type.__name__}, default {prop.default!r}): {prop.description}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m doghouse", description="Dog House without the GUI")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    search = commands.add_parser("search", help="Run a plugin search and write the results as NDJSON")
+    search.add_argument("plugin", help="Plugin name, see 'list plugins'")
+    search.add_argument("query")
+    search.add_argument("-c", "--config", action="append", metavar="KEY=VALUE", help="Plugin control value")
+    search.add_argument("--dedupe", action="store_true", help="Only write results not seen in earlier searches")
+    search.add_argument("-o", "--output", help="Output file, stdout by default")
+    search.set_defaults(handler=cmd_search)
+
+    dedupe = commands.add_parser("dedupe", help="Drop NDJSON targets already in the search history")
+    dedupe.add_argument("-i", "--input", help="Input file, stdin by default")
+    dedupe.add_argument("-o", "--output", help="Output file, stdout by default")
+    dedupe.add_argument("--check-only", action="store_true", help="Do not add new targets to the history")
+    dedupe.set_defaults(handler=cmd_dedupe)
+
+    for name, help_text in (("process", "Run a processor over NDJSON targets"),
+                            ("pipeline", "Run a pipeline such as 'Port Knocker > Bear Claw?banner'")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("spec" if name == "pipeline" else "processor")
+        command.add_argument("-i", "--input", help="NDJSON targets with ip and port, stdin by default")
+        command.add_argument("-o", "--output", help="Output file, stdout by default")
+        command.add_argument("-c", "--config", action="append", metavar="KEY=VALUE",
+                             help="Processor config value")
+        command.add_argument("-O", "--option", action="append", metavar="KEY=VALUE",
+                             help="Run option, see 'list options'")
+        command.add_argument("--all-stages", action="store_true",
+                             help="Write every stage's result, not only where a target left the pipeline")
+        command.set_defaults(handler=cmd_process)
+
+    serve = commands.add_parser("serve", help="Serve the local REST and WebSocket control API")
+    serve.add_argument("--port", type=int, default=8765, help="Port on 127.0.0.1, 8765 by default")
+    serve.set_defaults(handler=None)
+
+    listing = commands.add_parser("list", help="List processors, plugins or run options")
+    listing.add_argument("kind", choices=("processors", "plugins", "options"))
+    listing.set_defaults(handler=cmd_list)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "serve":
+        # Only this command needs FastAPI and uvicorn, which run their own loop
+        from control_api import serve
+        serve(args.port)
+        return 0
+    try:
+        return asyncio.run(args.handler(args))
+    except (ConfigValueError, ValueError, OSError) as ex:
+        DHConsole().print(str(ex), "error")
+        return 2
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -78,6 +78,7 @@ class DogHouseUI:
         self.processing_column.controls = [
             self.processingPanel,
             self.processing_controls_container,
+            self.processingPanel.get_metrics_panel(),
             self.proc_config
         ]
 
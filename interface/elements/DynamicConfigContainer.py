@@ -2,6 +2,7 @@ import flet as ft
 from typing import Any, Dict, Type, Optional, List
 from dataclasses import dataclass
 from flet_dstring import DString, DStringConfig
+from processor.base import ConfigValueError, convert_value
 
 @dataclass
 class ConfigField:
@@ -11,9 +12,6 @@ class ConfigField:
     description: str
     options: Optional[List[Any]] = None
 
-class ConfigValueError(Exception):
-    pass
-
 class DynamicConfigContainer(ft.Container):
     def __init__(self):
         super().__init__()
@@ -41,18 +39,7 @@ class DynamicConfigContainer(ft.Container):
         self._controls: Dict[str, ft.Control] = {}
 
     def convert_value(self, value: Any, target_type: Type) -> Any:
-        try:
-            if target_type == bool:
-                if isinstance(value, bool):
-                    return value
-                return str(value).lower() in ('true', '1', 'yes', 'on')
-            if target_type == list:
-                if isinstance(value, list):
-                    return value
-                return [item.strip() for item in str(value).split(',')]
-            return target_type(value)
-        except (ValueError, TypeError) as e:
-            raise ConfigValueError(f"Cannot convert '{value}' to {target_type.__name__}: {str(e)}")
+        return convert_value(value, target_type)
 
     def create_input_for_type(self, field: ConfigField) -> ft.Control:
         if field.type == bool:
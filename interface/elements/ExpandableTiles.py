@@ -40,6 +40,7 @@ class ExpandableListTile(ft.Container):
             title=ft.Text(self.title),
             trailing=self.checkbox,
             on_click=self.toggle_expanded,
+            on_long_press=self.toggle_pinned,
             bgcolor=bgcolor  
         )
 
@@ -65,6 +66,10 @@ class ExpandableListTile(ft.Container):
         self.content_container.height = None if self.is_expanded else 0
         self.update()
 
+    def toggle_pinned(self, _):
+        if self.parent_queue is not None and self.queue_index is not None:
+            self.parent_queue.toggle_pinned(self.queue_index)
+
     def set_trailing(self, value = "CHECKBOX"):
         if value == "CHECKBOX":
             self.list_tile.trailing = self.checkbox
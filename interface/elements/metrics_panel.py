@@ -0,0 +1,47 @@
+import flet as ft
+from processor.metrics import RunMetrics
+
+
+class MetricsPanel(ft.Container):
+    """Compact live view of the running processing job"""
+
+    def __init__(self):
+        super().__init__()
+        self.bgcolor = ft.Colors.ON_TERTIARY
+        self.border_radius = 5
+        self.padding = ft.Padding(20, 5, 20, 5)
+        self.visible = False
+
+        self._txt_progress = ft.Text(size=12, color=ft.Colors.GREY_300)
+        self._txt_latency = ft.Text(size=12, color=ft.Colors.GREY_400)
+        self._txt_outcomes = ft.Text(size=12, color=ft.Colors.GREY_400)
+        self.content = ft.Column(
+            controls=[self._txt_progress, self._txt_latency, self._txt_outcomes],
+            spacing=2,
+        )
+
+    def show_metrics(self, metrics: RunMetrics, running: bool = True):
+        self._txt_progress.value = (
+            f"{metrics.done}/{metrics.expected} done  |  {metrics.rate:.1f} items/s  |  "
+            f"{metrics.in_flight} in flight  |  "
+            f"{'ETA ' + metrics.format_seconds(metrics.eta) if running else 'finished'}"
+        )
+        self._txt_latency.value = "  |  ".join(
+            f"{name} p50/p95/p99 " + "/".join(metrics.format_seconds(v) for v in metrics.percentiles(name))
+            for name in metrics.latency
+        ) or "No attempts yet"
+        # While running show what happens now, once finished the totals of the run
+        colors, errors = (metrics.recent_colors, metrics.recent_errors) if running else (metrics.colors, metrics.errors)
+        outcomes = [f"{color} {count}" for color, count in colors.most_common()]
+        outcomes += [f"{error} {count}" for error, count in errors.most_common(4)]
+        label = f"Last {metrics.window:.0f}s: " if running else "Total: "
+        self._txt_outcomes.value = label + (", ".join(outcomes) or "no outcomes")
+        self.visible = True
+        self._safe_update()
+
+    def _safe_update(self):
+        try:
+            if self.page:
+                self.update()
+        except AssertionError:
+            pass
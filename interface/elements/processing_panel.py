@@ -1,6 +1,8 @@
 import flet as ft
 from interface.elements.ExpandableTiles import DynamicExpandableList
+from interface.elements.metrics_panel import MetricsPanel
 from logic import LogicManager
+from data.exporters import EXPORTERS
 from processor_logic import start_processor, on_processor_changed
 from page_manager import PageManager
 
@@ -11,6 +13,7 @@ class ProcessingPanel(ft.Container):
         self._page_manager = PageManager()
         self._logic = LogicManager()
         self._list = DynamicExpandableList()
+        self._metrics_panel = MetricsPanel()
         self._page = None
         self._proc_config = None
         self._init_controls()
@@ -21,11 +24,36 @@ class ProcessingPanel(ft.Container):
 
     def _init_controls(self):
         # Processing buttons
-        self._btn_save_json = ft.ElevatedButton(
-            text="Save JSON",
-            icon=ft.Icons.SAVE,
-            tooltip="Save processing list to JSON.",
-            expand=True
+        self._popupMnuItm_json = ft.PopupMenuItem(text="Save JSON")
+        self._popupMnuItms_export = {
+            name: ft.PopupMenuItem(text=f"Export {name}") for name in EXPORTERS
+        }
+        self._cnt_save_facade = ft.Container(
+            content=ft.Row(
+                controls=[
+                    ft.Icon(
+                        ft.Icons.SAVE,
+                        color="#A0CAFD",
+                    ),
+                    ft.Icon(
+                        ft.Icons.ARROW_DROP_DOWN,
+                        color="#A0CAFD",
+                        size=20,
+                    )
+                ],
+                alignment=ft.MainAxisAlignment.CENTER,
+                spacing=4,
+            ),
+            bgcolor="#191C20",
+            padding=ft.padding.only(left=16, right=8, top=4, bottom=4),
+            border_radius=20,
+            ink=True,
+        )
+        self._popupMnuBtn_save = ft.PopupMenuButton(
+            content=self._cnt_save_facade,
+            items=[self._popupMnuItm_json, *self._popupMnuItms_export.values()],
+            expand=True,
+            tooltip="Save or export the processing list."
         )
         self._btn_clear = ft.ElevatedButton(
             text="Clear",
@@ -49,16 +77,18 @@ class ProcessingPanel(ft.Container):
         self._proc_config = config
 
     def _bind_controls(self):
-        self._btn_save_json.on_click = lambda e: self._logic.save_processing_json(e)
+        self._popupMnuItm_json.on_click = lambda e: self._logic.save_processing_json(e)
+        for name, item in self._popupMnuItms_export.items():
+            item.on_click = lambda e, fmt=name: self._logic.export_processing(e, fmt)
         self._btn_clear.on_click = lambda e: self._logic.clear_processing(e)
         self._dropdown_processor.on_change = lambda e: on_processor_changed(e, self._proc_config)
         self._btn_start.on_click = lambda e: start_processor(
-            e, self._dropdown_processor.value, self._proc_config, self._list
+            e, self._dropdown_processor.value, self._proc_config, self._list, self._metrics_panel
         )
 
     def get_controls(self):
         return [
-            self._btn_save_json,
+            self._popupMnuBtn_save,
             self._btn_clear,
             self._btn_start,
             self._dropdown_processor
@@ -74,3 +104,6 @@ class ProcessingPanel(ft.Container):
         
     def get_list(self):
         return self._list
+
+    def get_metrics_panel(self):
+        return self._metrics_panel
@@ -38,6 +38,7 @@ class ResultsPanel(ft.Container):
         # Load results popup menu
         self._popupMnuItm_json = ft.PopupMenuItem(text="Load from a JSON backup file.")
         self._popupMnuItm_db = ft.PopupMenuItem(text="Load from DB", disabled=True, tooltip="Not yet implemented")
+        self._popupMnuItm_diff = ft.PopupMenuItem(text="Diff two JSON backup files.")
         self._popupMnuItm_clear_all = ft.PopupMenuItem(text="Clear all")
         self._popupMnuItm_clear_dupes = ft.PopupMenuItem(text="Clear Duplicates")
         self._popupMnuItm_clear_seen = ft.PopupMenuItem(text="Clear Seen")
@@ -86,7 +87,7 @@ class ResultsPanel(ft.Container):
         )
         self._popupMenubtn_load_file = ft.PopupMenuButton(
             content=self._cnt_load_facade,
-            items=[self._popupMnuItm_json, self._popupMnuItm_db],
+            items=[self._popupMnuItm_json, self._popupMnuItm_diff, self._popupMnuItm_db],
             expand=True,
             tooltip="Load from file or from DB."
         )
@@ -140,6 +141,7 @@ class ResultsPanel(ft.Container):
     def _bind_controls(self):
         self._popupMnuItm_db.on_click = lambda e: print("Load from DB")
         self._popupMnuItm_json.on_click = lambda e: self._logic.load_results_json(e)
+        self._popupMnuItm_diff.on_click = lambda e: self._logic.diff_results_json(e)
         self._ebtn_sel_all.on_click = lambda e: self._logic.select_all_results(e)
         self._ebtn_des_all.on_click = lambda e: self._logic.deselect_all_results(e)
         self._popupMnuItm_clear_dupes.on_click = lambda e: self._confirm_action(e, "CLEAR_DUPES")
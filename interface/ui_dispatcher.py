@@ -0,0 +1,92 @@
+#interface/ui_dispatcher.py
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, List, Tuple
+
+
+class UIDispatcher:
+    """
+    Carries UI changes from worker threads to the page at a fixed frame rate.
+
+    `post` records attribute changes for a key (e.g. a queue index) and
+    merges them with any change still pending for that key. At each frame
+    the attributes are set and `redraw` is called once with the changed
+    keys, so a tile that changes ten times between frames is redrawn once.
+    `call` queues plain callbacks such as console prints, run in order
+    before the frame's attribute changes, so changes they post are applied
+    in the same frame.
+    A daemon thread applies everything pending `hz` times per second, so
+    the engine never waits on rendering.
+    """
+
+    def __init__(self, redraw: Callable[[List[Hashable]], None], hz: float = 15.0):
+        self.redraw = redraw
+        self.interval = 1.0 / max(1.0, min(hz, 60.0))
+        self._pending: Dict[Hashable, Tuple[Any, Dict[str, Any]]] = {}
+        self._calls: Deque[Tuple[Callable, tuple]] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def post(self, key: Hashable, target: Any, **changes) -> None:
+        """Set attributes on target at the next frame, merged with pending changes for key"""
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is None or pending[0] is not target:
+                self._pending[key] = (target, changes)
+            else:
+                pending[1].update(changes)
+
+    def call(self, callback: Callable, *args) -> None:
+        """Run callback at the next frame, after earlier calls"""
+        self._calls.append((callback, args))
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="dh-ui-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Apply everything still pending and end the frame thread. The thread
+        does the last flush itself, this only waits for it, so call it off
+        the engine loop. Without a thread the caller flushes.
+        """
+        self._stopping.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+        else:
+            self.flush()
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.interval):
+            self.flush()
+        self.flush()
+
+    def flush(self) -> None:
+        """Apply everything pending now"""
+        with self._flush_lock:
+            calls = []
+            while self._calls:
+                calls.append(self._calls.popleft())
+            for callback, args in calls:
+                try:
+                    callback(*args)
+                except Exception as ex:
+                    print(f"UI dispatcher call failed: {ex}")
+
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return
+            for target, changes in batch.values():
+                for name, value in changes.items():
+                    setattr(target, name, value)
+            try:
+                self.redraw(list(batch))
+            except Exception as ex:
+                print(f"UI dispatcher redraw failed: {ex}")
@@ -1,10 +1,13 @@
 # logic.py
+import asyncio
 import flet as ft
+import threading
 from pathlib import Path
 from typing import Callable
 from interface.elements.ExpandableTiles import ExpandableListTile
 from data.ResultQueueManager import ResultQueueManager
 from data.json_storage import JsonStorageManager
+from data.snapshot_diff import SnapshotDiffer, order_snapshots
 from page_manager import PageManager
 
 class LogicManager:
@@ -83,6 +86,18 @@ class LogicManager:
         results = self.queue_manager.get_proc_queue().results
         self.storage_manager.save_to_json(results, "processing")
 
+    def export_processing(self, e, format_name: str):
+        results = self.queue_manager.get_proc_queue().results
+
+        def run_export():
+            try:
+                self.storage_manager.export(results, "processing", format_name)
+            except Exception as ex:
+                self.queue_manager.console.print(f"Error exporting results: {ex}", "error")
+
+        # Large queues take a while to write, keep the UI responsive
+        threading.Thread(target=run_export, daemon=True).start()
+
     def load_results_json(self, e):
         self.queue_manager.console.print("Loading results from JSON...")
         
@@ -101,3 +116,42 @@ class LogicManager:
         self.page_manager.get_page().overlay.append(file_picker)
         self.page_manager.get_page().update()
         file_picker.pick_files()
+
+    @staticmethod
+    def _diff_snapshots(first, second):
+        """Diff two snapshots, older against newer, and read back the rows that differ"""
+        old_path, new_path = order_snapshots(first, second)
+        diff = SnapshotDiffer().diff(old_path, new_path)
+        return old_path, new_path, diff, diff.to_results()
+
+    def diff_results_json(self, e):
+        self.queue_manager.console.print("Pick two saved snapshots to diff...")
+
+        async def on_files_picked(e: ft.FilePickerResultEvent):
+            if not e.files or len(e.files) != 2:
+                self.queue_manager.console.print("Select exactly two snapshots to diff", "warning")
+                return
+
+            try:
+                # Both snapshots are streamed from disk, keep that off the UI loop
+                old_path, new_path, diff, results = await asyncio.to_thread(
+                    self._diff_snapshots, e.files[0].path, e.files[1].path)
+            except Exception as ex:
+                self.queue_manager.console.print(f"Error diffing snapshots: {ex}", "error")
+                return
+
+            self.queue_manager.console.print(
+                f"Diff d[<f=ffffff, b>, <{old_path.name}>] -> d[<f=ffffff, b>, <{new_path.name}>]: {diff.summary()}")
+            # Only the rows that differ are shown, diff rows must not mark anything as seen
+            self.queue_manager.get_results_queue().replace_results(results, record=False)
+            self.page_manager.get_page().update()
+
+        file_picker = ft.FilePicker(on_result=on_files_picked)
+        self.page_manager.get_page().overlay.append(file_picker)
+        self.page_manager.get_page().update()
+        file_picker.pick_files(
+            dialog_title="Select two saved snapshots",
+            initial_directory=str(self.storage_manager.results_dir.resolve()),
+            allowed_extensions=["json"],
+            allow_multiple=True
+        )
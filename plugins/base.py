@@ -1,10 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional, Callable
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Callable
 from dataclasses import dataclass
 from enum import Enum
-import flet as ft
 import datetime
 
+if TYPE_CHECKING:
+    # Flet is only needed to build controls, the headless CLI never imports it
+    import flet as ft
+
 @dataclass
 class SearchResult:
     """Standard format for search results across all plugins"""
@@ -81,7 +84,7 @@ class PluginBase(ABC):
         """
         pass
 
-    def create_flet_control(self, config: FletControlConfig, page: ft.Page) -> ft.Control:
+    def create_flet_control(self, config: FletControlConfig, page: "ft.Page") -> "ft.Control":
         """
         Create a Flet control from configuration
         
@@ -92,6 +95,8 @@ class PluginBase(ABC):
         Returns:
             Flet Control instance
         """
+        import flet as ft
+
         if config.control_type == FletControlType.TEXTFIELD:
             return ft.TextField(
                 label=config.label,
@@ -149,7 +154,7 @@ class PluginBase(ABC):
             
         raise ValueError(f"Unsupported control type: {config.control_type}")
 
-    def handle_control_event(self, control_id: str, event_data: Any, page: ft.Page) -> Any:
+    def handle_control_event(self, control_id: str, event_data: Any, page: "ft.Page") -> Any:
         """
         Handle control events (e.g. button clicks, value changes)
         
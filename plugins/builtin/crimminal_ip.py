@@ -1,9 +1,8 @@
 import aiohttp
 from typing import List, Dict, Any, Optional
-import flet as ft
 from plugins.base import PluginBase, FletControlType, FletControlConfig
 from plugins.manager import PluginManager
-from data.AggResultQueue import AggResult
+from data.Models import AggResult
 
 class CriminalIPPlugin(PluginBase):
     """CriminalIP Plugin for querying the CriminalIP API"""
@@ -51,7 +50,7 @@ class CriminalIPPlugin(PluginBase):
             ),
         ]
 
-    def handle_control_event(self, control_id: str, event_data: Any, page: ft.Page) -> Any:
+    def handle_control_event(self, control_id: str, event_data: Any, page: "ft.Page") -> Any:
         """Handle UI control events"""
         control_values = {
             "offset": int(page.get_control("offset").value),
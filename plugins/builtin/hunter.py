@@ -1,10 +1,9 @@
 import base64
 import requests
 from typing import List, Dict, Any
-import flet as ft
 from plugins.base import PluginBase, FletControlType, FletControlConfig
 from plugins.manager import PluginManager
-from data.AggResultQueue import AggResult
+from data.Models import AggResult
 
 class HunterPlugin(PluginBase):
     """Hunter Plugin for querying the Hunter API"""
@@ -68,7 +67,7 @@ class HunterPlugin(PluginBase):
             )
         ]
 
-    def handle_control_event(self, control_id: str, event_data: Any, page: ft.Page) -> Any:
+    def handle_control_event(self, control_id: str, event_data: Any, page: "ft.Page") -> Any:
         """Handle UI control events"""
         # Get current values of controls for search configuration
         control_values = {
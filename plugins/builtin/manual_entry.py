@@ -1,10 +1,9 @@
 import base64
 import requests
 from typing import List, Dict, Any
-import flet as ft
 from plugins.base import PluginBase, FletControlType, FletControlConfig
 from plugins.manager import PluginManager
-from data.AggResultQueue import AggResult
+from data.Models import AggResult
 
 class ManualEntry(PluginBase):
     """Manually enter service information without a database"""
@@ -51,7 +50,7 @@ class ManualEntry(PluginBase):
             )
         ]
 
-    def handle_control_event(self, control_id: str, event_data: Any, page: ft.Page) -> Any:
+    def handle_control_event(self, control_id: str, event_data: Any, page: "ft.Page") -> Any:
         """Handle UI control events"""
         control_values = {
             "banner": page.get_control("banner").value,
@@ -0,0 +1,77 @@
+import asyncio
+from typing import List, Dict, Any
+from plugins.base import PluginBase, FletControlType, FletControlConfig
+from data.Models import AggResult
+from data.search_index import SearchIndex
+
+class SavedResultsPlugin(PluginBase):
+    """Full-text search over saved snapshots and the live queues"""
+
+    @property
+    def name(self) -> str:
+        return "Saved Results"
+
+    @property
+    def description(self) -> str:
+        return "Search banners and extra data across every saved result and the live queues."
+
+    @property
+    def requires_api_key(self) -> bool:
+        return False
+
+    def get_config_fields(self) -> Dict[str, Dict[str, Any]]:
+        return {}
+
+    def get_ui_controls(self) -> List[FletControlConfig]:
+        """Define the UI controls for the saved results plugin"""
+        return [
+            FletControlConfig(
+                control_type=FletControlType.TEXTFIELD,
+                id="limit",
+                label="Max results",
+                default_value="1000",
+                width=150,
+                tooltip="Maximum number of matches to load, 0 for no limit"
+            ),
+            FletControlConfig(
+                control_type=FletControlType.CHECKBOX,
+                id="include_live",
+                label="Include live queues",
+                default_value=True,
+                tooltip="Also match results and processing queue items"
+            ),
+        ]
+
+    async def search(self, query: str, config: Dict[str, Any] = None) -> List[AggResult]:
+        """
+        Search the saved results index
+
+        Args:
+            query: Free text to match, e.g. "Apache/2.4.49"
+            config: Configuration dictionary containing optional parameters
+
+        Returns:
+            List of AggResult objects for every match
+        """
+        if not config:
+            config = {}
+
+        limit = int(config.get("limit") or 0) or None
+        include_live = config.get("include_live", True)
+
+        index = SearchIndex()
+        # Indexing and searching touch disk and SQLite, keep them off the UI loop
+        await asyncio.to_thread(index.refresh)
+        if include_live:
+            from data.ResultQueueManager import ResultQueueManager
+            queue_manager = ResultQueueManager()
+            # Copy the lists here, the queues keep changing while the thread indexes them
+            await asyncio.to_thread(index.index_live, {
+                "results": list(queue_manager.get_results_queue().results),
+                "processing": list(queue_manager.get_proc_queue().results),
+            })
+        return await asyncio.to_thread(index.search, query, limit, include_live)
+
+    def format_results(self, raw_results: List[Dict[str, Any]]) -> List[AggResult]:
+        """Results come back from the index already formatted"""
+        return raw_results
@@ -1,10 +1,9 @@
 import aiohttp
 import base64
 from typing import List, Dict, Any, Optional
-import flet as ft
 from plugins.base import PluginBase, FletControlType, FletControlConfig
 from plugins.manager import PluginManager
-from data.AggResultQueue import AggResult
+from data.Models import AggResult
 
 class ZoomEyePlugin(PluginBase):
     """ZoomEye API integration plugin for searching internet-connected devices"""
@@ -87,7 +86,7 @@ class ZoomEyePlugin(PluginBase):
 
         ]
 
-    def handle_control_event(self, control_id: str, event_data: Any, page: ft.Page) -> Any:
+    def handle_control_event(self, control_id: str, event_data: Any, page: "ft.Page") -> Any:
         """Handle UI control events"""
         control_values = {
             "sub_type": page.get_control("sub_type").value,
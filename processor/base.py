@@ -1,6 +1,13 @@
+import asyncio
+import errno
+import socket
+import time
 from abc import ABC, abstractmethod
+from collections.abc import Mapping
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, Type
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Type
+from .context import current_run_context
 
 
 @dataclass
@@ -9,6 +16,24 @@ class ProcessingResult:
     message: str
     details: Optional[Dict[str, Any]] = None
     color: str = "red"
+    error_type: Optional[str] = None
+
+@dataclass
+class ConnectOutcome:
+    status: str  # "open", "refused", "timeout", "reset", "dns", "resource" or "oserror"
+    rtt: Optional[float] = None
+    error: Optional[str] = None
+    timeout: Optional[float] = None  # the timeout the probe was made with
+
+    @property
+    def is_open(self) -> bool:
+        return self.status == "open"
+
+class ExecutionMode(Enum):
+    """How the engine runs a processor"""
+    ASYNC = "async"      # awaited directly on the engine loop
+    THREAD = "thread"    # blocking I/O, process_blocking runs in a thread pool
+    PROCESS = "process"  # CPU bound, process_blocking runs in a process pool
 
 @dataclass 
 class ConfigProperty:
@@ -19,17 +44,90 @@ class ConfigProperty:
     required: bool = False
 
 
+class ConfigValueError(ValueError):
+    pass
+
+
+def convert_value(value: Any, target_type: Type) -> Any:
+    """Convert a raw (usually UI string) value to the type of a config property"""
+    try:
+        if target_type == bool:
+            if isinstance(value, bool):
+                return value
+            return str(value).lower() in ('true', '1', 'yes', 'on')
+        if target_type == list:
+            if isinstance(value, list):
+                return value
+            return [item.strip() for item in str(value).split(',')]
+        return target_type(value)
+    except (ValueError, TypeError) as e:
+        raise ConfigValueError(f"Cannot convert '{value}' to {target_type.__name__}: {str(e)}")
+
+
+class ProcessorConfig(Mapping):
+    """
+    Validated, typed config values built once per run from ConfigProperty
+    definitions. Values are read as attributes (config.timeout) or by key,
+    unknown keys are kept as given.
+    """
+
+    def __init__(self, properties: List[ConfigProperty], values: Optional[Mapping] = None):
+        values = dict(values or {})
+        typed = {}
+        errors = []
+        for prop in properties:
+            value = values.pop(prop.name, None)
+            if value is None or (value == "" and prop.type != str):
+                if prop.required:
+                    errors.append(f"{prop.name} is required")
+                typed[prop.name] = prop.default
+                continue
+            try:
+                typed[prop.name] = convert_value(value, prop.type)
+            except ConfigValueError as e:
+                errors.append(f"Error in {prop.name}: {str(e)}")
+        if errors:
+            raise ConfigValueError("\n".join(errors))
+        typed.update(values)
+        self._values = typed
+
+    def __getitem__(self, name: str) -> Any:
+        return self._values[name]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __getattr__(self, name: str) -> Any:
+        values = self.__dict__.get("_values")
+        if values is None or name not in values:
+            raise AttributeError(name)
+        return values[name]
+
+    def __repr__(self) -> str:
+        return f"ProcessorConfig({self._values!r})"
+
+
 class ProcessorBase(ABC):
     """Base class for all processors"""
 
+    # Set by ProcessorManager to the file the processor was loaded from
+    source_path: Optional[str] = None
+
     def __init__(self, config: Optional[dict] = None):
         """
         Initialize the processor with optional configuration.
         :param config: Configuration dictionary to initialize the processor.
         """
+        if (type(self).process is ProcessorBase.process
+                and type(self).process_blocking is ProcessorBase.process_blocking):
+            # Checked like abstract methods, so ProcessorManager refuses the class when loading it
+            raise TypeError(f"Can't instantiate processor {type(self).__name__} "
+                            f"without an implementation of process or process_blocking")
         self._validate_config_properties()
-        defaults = self.get_config_defaults()
-        self.config = defaults | (config or {})
+        self.config = self.build_config(config)
 
     @property
     def config_properties(self) -> list[ConfigProperty]:
@@ -37,7 +135,14 @@ class ProcessorBase(ABC):
         return []
     def get_config_defaults(self) -> Dict[str, Any]:
         """Returns a dictionary of default values for all config properties"""
-        return {prop.name: prop.default for prop in self.config_properties}
+        defaults = self.__dict__.get("_config_defaults")
+        if defaults is None:
+            defaults = self._config_defaults = {prop.name: prop.default for prop in self.config_properties}
+        return dict(defaults)
+
+    def build_config(self, values: Optional[Mapping] = None) -> ProcessorConfig:
+        """Convert and validate raw values, e.g. from the UI, raises ConfigValueError"""
+        return ProcessorConfig(self.config_properties, values)
 
     def _validate_config_properties(self) -> None:
         """Validate that all config properties have unique names"""
@@ -50,12 +155,15 @@ class ProcessorBase(ABC):
     def get_config_values(self, name: str, target: Optional[dict] = None) -> Any:
         """
         Get a configuration value, checking target dict first, then config, then defaults.
+        Prefer attribute access on self.config, it is already typed.
         :param name: Name of the config property
         :return: The configuration value
         """
         if target and name in target:
             return target[name]
-        return self.config.get(name, self.get_config_defaults().get(name))
+        if name in self.config:
+            return self.config[name]
+        return self.get_config_defaults().get(name)
     
     def get_all_config_values(self) -> Dict[str, Any]:
         return {prop.name: self.get_config_values(prop.name) for prop in self.config_properties}
@@ -71,7 +179,195 @@ class ProcessorBase(ABC):
         """Description of what the processor does"""
         pass
 
-    @abstractmethod
+    async def setup(self, config: Optional[dict] = None) -> None:
+        """
+        Called once by the engine before a run with the run's config.
+        Override to create expensive shared resources (sessions, SSL contexts,
+        compiled patterns) and call super().setup(config) first.
+        """
+        self.config = config if isinstance(config, ProcessorConfig) else self.build_config(config)
+
+    async def teardown(self) -> None:
+        """Called once by the engine after a run, release what setup created"""
+        pass
+
+    @property
+    def execution_mode(self) -> ExecutionMode:
+        """Override to run blocking or CPU bound work off the engine loop"""
+        return ExecutionMode.ASYNC
+
     async def process(self, target: dict) -> ProcessingResult:
-        """Process a single target"""
+        """
+        Process a single target.
+        Implement this, process_blocking, or both; the default runs process_blocking in a thread.
+        """
+        return await asyncio.to_thread(self.process_blocking, target)
+
+    def process_blocking(self, target: dict) -> ProcessingResult:
+        """
+        Process a single target synchronously.
+        Implement this instead of process for THREAD and PROCESS execution modes,
+        the default runs process on a private event loop.
+        """
+        return asyncio.run(self.process(target))
+
+    @property
+    def batch_size(self) -> int:
+        """Maximum number of targets handed to process_batch at once"""
+        return 64
+
+    @property
+    def supports_batch(self) -> bool:
+        """True when a subclass provides its own process_batch"""
+        return type(self).process_batch is not ProcessorBase.process_batch
+
+    async def process_batch(self, targets: List[dict]) -> AsyncIterator[Tuple[dict, ProcessingResult]]:
+        """
+        Process several targets at once, yielding (target, result) pairs as each finishes.
+        Override to amortize work across targets; the engine prefers it when overridden.
+        The default simply calls process for each target in turn.
+        """
+        for target in targets:
+            yield target, await self.process(target)
+
+
+# Errnos of a local machine running out of sockets, ports or buffers
+RESOURCE_ERRNOS = {errno.EMFILE, errno.ENFILE, errno.ENOBUFS, errno.EADDRNOTAVAIL, errno.EAGAIN}
+
+
+def classify_error(ex: BaseException) -> str:
+    """Map a socket level exception to a short error type"""
+    if isinstance(ex, (asyncio.TimeoutError, socket.timeout)):
+        return "timeout"
+    if isinstance(ex, ConnectionRefusedError):
+        return "refused"
+    if isinstance(ex, (ConnectionResetError, ConnectionAbortedError, BrokenPipeError)):
+        return "reset"
+    if isinstance(ex, socket.gaierror):
+        return "dns"
+    if isinstance(ex, OSError) and ex.errno in RESOURCE_ERRNOS:
+        return "resource"
+    return "oserror"
+
+
+def adaptive_timeout(host: str, default: float) -> float:
+    """
+    The timeout to use against host. During a run with adaptive timeouts this
+    is derived from RTTs observed so far, never longer than default,
+    otherwise it is default.
+    """
+    context = current_run_context()
+    if context is None or context.rtt is None:
+        return default
+    return context.rtt.timeout_for(host, default)
+
+
+async def open_connection(host: str, port: int, timeout: float) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """Open a TCP connection without blocking the event loop"""
+    return await asyncio.wait_for(asyncio.open_connection(host, int(port)), timeout)
+
+
+async def close_connection(writer: asyncio.StreamWriter) -> None:
+    """Close a connection, ignoring errors from an already dead socket"""
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
         pass
+
+
+def outcome_error(outcome: ConnectOutcome) -> Exception:
+    """Rebuild the exception a failed connect outcome stands for"""
+    message = outcome.error or outcome.status
+    if outcome.status == "timeout":
+        return asyncio.TimeoutError(message)
+    if outcome.status == "refused":
+        return ConnectionRefusedError(message)
+    if outcome.status == "reset":
+        return ConnectionResetError(message)
+    if outcome.status == "dns":
+        return socket.gaierror(message)
+    return OSError(message)
+
+
+async def _connect(host: str, port: int, timeout: float,
+                   context=None) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter, ConnectOutcome]:
+    """Open a connection, recording how the handshake went in the run context if given"""
+    start = time.monotonic()
+    try:
+        reader, writer = await open_connection(host, port, timeout)
+    except (OSError, asyncio.TimeoutError) as ex:
+        if context is not None:
+            context.record_connect(host, port, ConnectOutcome(
+                status=classify_error(ex), error=str(ex) or type(ex).__name__, timeout=timeout))
+        raise
+    outcome = ConnectOutcome(status="open", rtt=time.monotonic() - start, timeout=timeout)
+    if context is not None:
+        context.record_connect(host, port, outcome)
+        if context.rtt is not None:
+            context.rtt.observe(host, outcome.rtt)
+    return reader, writer, outcome
+
+
+async def _probe(host: str, port: int, timeout: float, context=None) -> ConnectOutcome:
+    try:
+        _, writer, outcome = await _connect(host, port, timeout, context)
+    except (OSError, asyncio.TimeoutError) as ex:
+        return ConnectOutcome(status=classify_error(ex), error=str(ex) or type(ex).__name__, timeout=timeout)
+    await close_connection(writer)
+    return outcome
+
+
+async def probe_port(host: str, port: int, timeout: float, use_cache: bool = True) -> ConnectOutcome:
+    """
+    Attempt a TCP handshake and report how it went.
+
+    Never raises for network errors, the failure is described in the outcome.
+    During a processing run the outcome is shared through the run context, so
+    a port another processor already probed is answered without connecting.
+    Pass use_cache=False when the timing of the handshake itself matters.
+    """
+    context = current_run_context() if use_cache else None
+    if context is None:
+        return await _probe(host, port, timeout)
+    return await context.connect(host, port, timeout, lambda: _probe(host, port, timeout, context))
+
+
+async def _exchange(host: str, port: int, payload: Optional[bytes], timeout: float,
+                    read_size: int, connect_timeout: float, context=None) -> str:
+    reader, writer, _ = await _connect(host, port, connect_timeout, context)
+    try:
+        if payload:
+            writer.write(payload)
+            await asyncio.wait_for(writer.drain(), timeout)
+        data = await asyncio.wait_for(reader.read(read_size), timeout)
+        return data.decode("utf-8", errors="ignore")
+    finally:
+        await close_connection(writer)
+
+
+async def exchange(host: str, port: int, payload: Optional[bytes], timeout: float,
+                   read_size: int = 1024, use_cache: bool = True,
+                   connect_timeout: Optional[float] = None) -> str:
+    """
+    Connect, optionally send a payload and return the first read.
+    connect_timeout bounds the handshake alone and defaults to timeout.
+
+    During a processing run, targets already known to be dead fail straight
+    away and the first read for a given payload is reused.
+
+    Raises:
+        asyncio.TimeoutError: If connecting or reading takes longer than timeout
+        OSError: If the connection fails
+    """
+    connect_timeout = connect_timeout or timeout
+    context = current_run_context() if use_cache else None
+    if context is None:
+        return await _exchange(host, port, payload, timeout, read_size, connect_timeout)
+
+    outcome = context.known_connect(host, port, connect_timeout)
+    if outcome is not None and not outcome.is_open:
+        context.hits += 1
+        raise outcome_error(outcome)
+    return await context.banner(host, port, payload,
+                                lambda: _exchange(host, port, payload, timeout, read_size, connect_timeout, context))
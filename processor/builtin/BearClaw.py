@@ -1,7 +1,7 @@
 # processor/builtin/BearClaw.py
-import socket
+import asyncio
 import random
-from processor.base import ProcessorBase, ProcessingResult
+from processor.base import ProcessorBase, ProcessingResult, exchange, classify_error, adaptive_timeout
 
 
 class BearClaw(ProcessorBase):
@@ -37,12 +37,8 @@ class BearClaw(ProcessorBase):
             payload = f"GET /{random_string} HTTP/1.1\r\nHost: {ip}\r\n\r\n"
 
             # Attempt to connect to the target
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                sock.settimeout(5)
-                sock.connect((ip, int(port)))
-                sock.sendall(payload.encode("utf-8"))
-
-                response = sock.recv(1024).decode("utf-8", errors="ignore")
+            response = await exchange(ip, int(port), payload.encode("utf-8"), timeout=5,
+                                      connect_timeout=adaptive_timeout(ip, 5))
 
             # Simple honeypot detection heuristics
             if "honeypot" in response.lower() or "capture" in response.lower():
@@ -69,10 +65,11 @@ class BearClaw(ProcessorBase):
                 color="green",
             )
 
-        except (socket.timeout, socket.error) as e:
+        except (asyncio.TimeoutError, OSError) as e:
             return ProcessingResult(
                 success=False,
-                message=f"Failed to connect to {ip}:{port}: {str(e)}",
+                message=f"Failed to connect to {ip}:{port}: {str(e) or type(e).__name__}",
                 details={"ip": ip, "port": port, "error": str(e)},
                 color="red",
+                error_type=classify_error(e),
             )
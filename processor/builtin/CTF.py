@@ -1,6 +1,6 @@
-import socket
+import asyncio
 from typing import List
-from processor.base import ProcessorBase, ProcessingResult, ConfigProperty
+from processor.base import ProcessorBase, ProcessingResult, ConfigProperty, exchange, classify_error, adaptive_timeout
 
 
 class CaptureTheFlag(ProcessorBase):
@@ -43,7 +43,7 @@ class CaptureTheFlag(ProcessorBase):
                 color="red",
             )
 
-        timeout = self.get_config_values("timeout", target)
+        timeout = self.config.timeout
 
         # Service-specific payloads or interactions
         banners = {}
@@ -53,29 +53,24 @@ class CaptureTheFlag(ProcessorBase):
             25: "SMTP",
             110: "POP3",
         }
-        forced_service = self.get_config_values("force_service", target)
+        forced_service = self.config.force_service
         if forced_service:
             service_name = forced_service
         else:
             service_name = service_ports.get(port, "Unknown Service")
 
         try:
-            service_name = service_ports.get(port, "Unknown Service")
-
-            # Create a socket connection
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                sock.settimeout(timeout)
-                sock.connect((host, port))
-
-                if port == 80:
-                    # Send an HTTP GET request
-                    sock.sendall(b"GET / HTTP/1.1\r\nHost: \r\n\r\n")
-                elif port == 21 or port == 25 or port == 110:
-                    # Let the service respond with its default banner
-                    pass
+            if service_name.upper() == "HTTP":
+                # Send an HTTP GET request
+                payload = b"GET / HTTP/1.1\r\nHost: \r\n\r\n"
+            else:
+                # Let the service respond with its default banner (FTP, SMTP, POP3)
+                payload = None
 
-                # Receive the banner
-                response = sock.recv(1024).decode("utf-8", errors="ignore")
+            # Receive the banner
+            response = await exchange(host, port, payload, timeout=timeout,
+                                      connect_timeout=adaptive_timeout(host, timeout))
+            if response:
                 banners[service_name] = response
 
             # Process the result
@@ -94,12 +89,13 @@ class CaptureTheFlag(ProcessorBase):
                     color="yellow",
                 )
 
-        except socket.timeout:
+        except asyncio.TimeoutError:
             return ProcessingResult(
                 success=False,
                 message=f"Connection to {host}:{port} timed out.",
                 details={},
                 color="red",
+                error_type="timeout",
             )
         except Exception as e:
             return ProcessingResult(
@@ -107,4 +103,5 @@ class CaptureTheFlag(ProcessorBase):
                 message=f"Error during banner grab for {host}:{port}: {str(e)}",
                 details={"error": str(e)},
                 color="red",
+                error_type=classify_error(e),
             )
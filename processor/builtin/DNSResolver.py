@@ -1,6 +1,8 @@
+import asyncio
 import socket
-from processor.base import ProcessorBase, ProcessingResult
-from typing import Any, Callable
+from processor.base import ProcessorBase, ProcessingResult, ExecutionMode
+from processor.executors import run_blocking
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple
 
 class DNSResolver(ProcessorBase):
     @property
@@ -15,7 +17,12 @@ class DNSResolver(ProcessorBase):
     def config_properties(self) -> list[str]:
         return []
 
-    async def process(self, target: dict) -> ProcessingResult:
+    @property
+    def execution_mode(self) -> ExecutionMode:
+        # gethostbyname blocks, let the engine run it in its thread pool
+        return ExecutionMode.THREAD
+
+    def process_blocking(self, target: dict) -> ProcessingResult:
         hostname = target['ip']
         port = target['port']
 
@@ -38,5 +45,20 @@ class DNSResolver(ProcessorBase):
                 success=False,
                 message=f"Failed to resolve {hostname}: {e}",
                 details={"hostname": hostname, "error": str(e)},
-                color="red"
-            )
\ No newline at end of file
+                color="red",
+                error_type="dns"
+            )
+
+    async def process_batch(self, targets: List[dict]) -> AsyncIterator[Tuple[dict, ProcessingResult]]:
+        # Queues often hold many ports per host, resolve each hostname once per batch
+        by_hostname: Dict[Any, List[dict]] = {}
+        for target in targets:
+            by_hostname.setdefault((target.get('ip'), bool(target.get('port'))), []).append(target)
+
+        async def resolve(group: List[dict]):
+            return group, await run_blocking(self.process_blocking, group[0])
+
+        for lookup in asyncio.as_completed([resolve(group) for group in by_hostname.values()]):
+            group, result = await lookup
+            for target in group:
+                yield target, result
@@ -1,5 +1,4 @@
-import socket
-from processor.base import ProcessorBase, ProcessingResult, ConfigProperty
+from processor.base import ProcessorBase, ProcessingResult, ConfigProperty, probe_port, classify_error, adaptive_timeout
 
 
 class PortKnocker(ProcessorBase):
@@ -29,28 +28,28 @@ class PortKnocker(ProcessorBase):
 
         try:
             # Attempt to connect to the specified IP and port
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                sock.settimeout(3)  # Set a timeout for the connection attempt
-                result = sock.connect_ex((ip, int(port)))
-
-                if result == 0:
-                    return ProcessingResult(
-                        success=True,
-                        message=f"Knocked on port {port} at {ip}: It's open!",
-                        details={"ip": ip, "port": port},
-                        color="green"
-                    )
-                else:
-                    return ProcessingResult(
-                        success=False,
-                        message=f"Knocked on port {port} at {ip}: No response (closed).",
-                        details={"ip": ip, "port": port},
-                        color="red"
-                    )
+            outcome = await probe_port(ip, int(port), timeout=adaptive_timeout(ip, 3))
+
+            if outcome.is_open:
+                return ProcessingResult(
+                    success=True,
+                    message=f"Knocked on port {port} at {ip}: It's open!",
+                    details={"ip": ip, "port": port, "rtt": outcome.rtt},
+                    color="green"
+                )
+            else:
+                return ProcessingResult(
+                    success=False,
+                    message=f"Knocked on port {port} at {ip}: No response (closed).",
+                    details={"ip": ip, "port": port, "status": outcome.status},
+                    color="red",
+                    error_type=outcome.status
+                )
         except Exception as e:
             return ProcessingResult(
                 success=False,
                 message=f"Error while knocking on port {port} at {ip}: {str(e)}",
                 details={"ip": ip, "port": port, "error": str(e)},
-                color="red"
+                color="red",
+                error_type=classify_error(e)
             )
@@ -1,6 +1,5 @@
-import socket
-from time import time
-from processor.base import ProcessorBase, ProcessingResult, ConfigProperty
+from time import monotonic
+from processor.base import ProcessorBase, ProcessingResult, ConfigProperty, probe_port
 from typing import List
 
 
@@ -44,20 +43,19 @@ class StutterTester(ProcessorBase):
                 color="red",
             )
 
-        timeout = int(self.get_config_values("timeout", target))
-        attempts = int(self.get_config_values("attempts", target))
+        # Slow failures are what this measures, an RTT derived timeout would cut them short
+        timeout = self.config.timeout
+        attempts = self.config.attempts
         results = []
 
         try:
             for attempt in range(1, attempts + 1):
-                start_time = time()
-                try:
-                    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                        sock.settimeout(timeout)
-                        sock.connect((host, port))
-                except (socket.timeout, socket.error):
+                start_time = monotonic()
+                # The failure timing is the measurement, never answer it from the run cache
+                outcome = await probe_port(host, port, timeout, use_cache=False)
+                if not outcome.is_open:
                     # Record the time for failed attempts
-                    end_time = time()
+                    end_time = monotonic()
                     results.append(end_time - start_time)
 
             # Analyze results
@@ -0,0 +1,96 @@
+#processor/concurrency.py
+import asyncio
+from collections import deque
+from typing import Callable, Deque, Optional
+
+# Error types that point at congestion (ours or the network's) rather than a closed port.
+# Timeouts are left out, most of them are filtered ports and scans would shrink towards 1.
+# Other OS errors such as unreachable hosts say nothing about load and are left out too
+CONGESTION_ERRORS = {"reset", "resource"}
+
+
+class AIMDController:
+    """
+    Adjusts how many probes may be in flight with additive increase and
+    multiplicative decrease.
+
+    Workers take a slot with `acquire` and give it back with `release`,
+    saying whether the attempt hit a congestion error, or with `cancel`
+    when they did not probe after all. After every window of completions
+    the error rate is checked: below `max_error_rate` the limit grows
+    (doubling during slow start, then by `increase`), above it the limit is
+    multiplied by `decrease` and slow start ends. Without an `initial`
+    limit it starts at `maximum`, so it only backs off once errors show up.
+    """
+
+    def __init__(self, maximum: int, initial: Optional[int] = None, minimum: int = 1,
+                 increase: int = 1, decrease: float = 0.5, max_error_rate: float = 0.1,
+                 min_window: int = 20, on_change: Optional[Callable[[int, float], None]] = None):
+        self.maximum = max(1, int(maximum))
+        self.minimum = max(1, min(int(minimum), self.maximum))
+        self.limit = max(self.minimum, min(int(initial or self.maximum), self.maximum))
+        self.increase = max(1, int(increase))
+        self.decrease = min(max(float(decrease), 0.1), 0.9)
+        self.max_error_rate = max_error_rate
+        self.min_window = max(1, int(min_window))
+        self.on_change = on_change
+        self.active = 0
+        self._slow_start = True
+        self._completed = 0
+        self._congested = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> None:
+        while self.active >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif not waiter.cancelled():
+                    # Woken just before being cancelled, pass the wake-up on
+                    self._wake()
+                raise
+        self.active += 1
+
+    def release(self, congested: bool = False) -> None:
+        self.active -= 1
+        self._completed += 1
+        self._congested += congested
+        if self._completed >= max(self.min_window, self.limit):
+            self._adjust()
+        self._wake()
+
+    def cancel(self) -> None:
+        """Give back a slot that was not used for a probe, without counting it"""
+        self.active -= 1
+        self._wake()
+
+    def _adjust(self) -> None:
+        rate = self._congested / self._completed
+        self._completed = self._congested = 0
+
+        previous = self.limit
+        if rate > self.max_error_rate:
+            self._slow_start = False
+            self.limit = max(self.minimum, int(self.limit * self.decrease))
+        elif self._slow_start:
+            self.limit = min(self.maximum, self.limit * 2)
+        else:
+            self.limit = min(self.maximum, self.limit + self.increase)
+
+        if self.limit != previous and self.on_change:
+            try:
+                self.on_change(self.limit, rate)
+            except Exception as ex:
+                print(f"Concurrency callback error: {ex}")
+
+    def _wake(self) -> None:
+        free = self.limit - self.active
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
@@ -0,0 +1,137 @@
+#processor/context.py
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+_current_run: ContextVar[Optional["RunContext"]] = ContextVar("dh_run_context", default=None)
+
+
+def current_run_context() -> Optional["RunContext"]:
+    """The context of the processing run executing the caller, if any"""
+    return _current_run.get()
+
+
+@contextmanager
+def run_context(context: Optional["RunContext"]):
+    """Make context current for the enclosed code and any task it creates"""
+    token = _current_run.set(context)
+    try:
+        yield context
+    finally:
+        _current_run.reset(token)
+
+
+class RunContext:
+    """
+    State shared by every processor taking part in one processing run.
+
+    Caches connect outcomes per (host, port) and first-read banners per
+    (host, port, payload), so when several processors or pipeline stages
+    touch the same service only the first one pays for the handshake or the
+    timeout. Concurrent lookups of the same key share a single probe.
+
+    An RttTracker, when given, collects handshake times so processors can
+    size their timeouts to the network instead of a fixed value.
+    """
+
+    def __init__(self, rtt=None):
+        self.rtt = rtt
+        self.connects: Dict[Tuple[str, int], Any] = {}
+        self.banners: Dict[Tuple[str, int, Optional[bytes]], str] = {}
+        self.hits = 0
+        self.misses = 0
+        self._pending: Dict[Tuple, asyncio.Future] = {}
+
+    @staticmethod
+    def _key(host: str, port: int) -> Tuple[str, int]:
+        return str(host), int(port)
+
+    def known_connect(self, host: str, port: int, timeout: float):
+        """
+        A cached connect outcome that answers a probe with this timeout, or None.
+        Timeouts only count when they were observed with at least as long a timeout.
+        """
+        outcome = self.connects.get(self._key(host, port))
+        if outcome is None:
+            return None
+        if outcome.status == "timeout" and (outcome.timeout or 0) < timeout:
+            return None
+        return outcome
+
+    def record_connect(self, host: str, port: int, outcome) -> None:
+        key = self._key(host, port)
+        previous = self.connects.get(key)
+        # An open port stays open for the run, a later failure does not overwrite it
+        if previous is not None and previous.is_open and not outcome.is_open:
+            return
+        self.connects[key] = outcome
+
+    def forget_failure(self, host: str, port: int) -> None:
+        """Drop a cached failed connect, so a retry of the target really connects again"""
+        key = self._key(host, port)
+        outcome = self.connects.get(key)
+        if outcome is not None and not outcome.is_open:
+            del self.connects[key]
+
+    async def _shared(self, key: Tuple, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fetch once for concurrent callers asking for the same key"""
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.hits += 1
+            # wait() only raises if this caller is cancelled, not the one probing
+            await asyncio.wait({pending})
+            if not pending.cancelled():
+                return pending.result()
+            return await fetch()
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            value = await fetch()
+        except asyncio.CancelledError:
+            # Waiters probe for themselves rather than inherit our cancellation
+            future.cancel()
+            raise
+        except Exception as ex:
+            future.set_exception(ex)
+            # Waiters re-raise it, keep the loop from warning when nobody waits
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            self._pending.pop(key, None)
+
+    async def connect(self, host: str, port: int, timeout: float,
+                      probe: Callable[[], Awaitable[Any]]):
+        """Return a cached connect outcome or run probe and cache what it finds"""
+        outcome = self.known_connect(host, port, timeout)
+        if outcome is not None:
+            self.hits += 1
+            return outcome
+        outcome = await self._shared(("connect",) + self._key(host, port), probe)
+        if outcome.status == "timeout" and (outcome.timeout or 0) < timeout:
+            # Shared a probe that gave up sooner than this caller would have
+            outcome = await probe()
+        self.record_connect(host, port, outcome)
+        return outcome
+
+    def known_banner(self, host: str, port: int, payload: Optional[bytes]) -> Optional[str]:
+        banner = self.banners.get(self._key(host, port) + (payload,))
+        if banner is not None:
+            self.hits += 1
+        return banner
+
+    async def banner(self, host: str, port: int, payload: Optional[bytes],
+                     fetch: Callable[[], Awaitable[str]]) -> str:
+        """Return the cached first read for this payload or fetch and cache it"""
+        banner = self.known_banner(host, port, payload)
+        if banner is not None:
+            return banner
+        key = self._key(host, port) + (payload,)
+        banner = await self._shared(("banner",) + key, fetch)
+        self.banners[key] = banner
+        return banner
@@ -0,0 +1,610 @@
+#processor/engine.py
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from .base import ProcessorBase, ProcessingResult, ConfigProperty
+from .executors import ExecutorPool, executor_pool
+from .scheduler import PolitenessScheduler, PoliteWorkQueue
+from .resilience import RetryPolicy, CircuitBreaker
+from .context import RunContext, run_context
+from .concurrency import AIMDController, CONGESTION_ERRORS
+from .priority import Prioritizer, PriorityWorkQueue
+from .metrics import RunMetrics
+
+DEFAULT_CONCURRENCY = 50
+
+# Run options shown below the processor config, shared by every processor
+ENGINE_CONFIG_PROPERTIES = [
+    ConfigProperty(
+        name="concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        description="Maximum number of targets processed at once."
+    ),
+    ConfigProperty(
+        name="adaptive_concurrency",
+        type=bool,
+        default=True,
+        description="Back off from concurrency while probes hit congestion errors (resets, running out of local sockets or ports), then recover."
+    ),
+    ConfigProperty(
+        name="priority",
+        type=str,
+        default="pinned",
+        description="Processing order, scorers by importance: pinned, unseen, ports, open_ports."
+    ),
+    ConfigProperty(
+        name="priority_ports",
+        type=str,
+        default="22,80,443",
+        description="Ports processed first by the 'ports' scorer, most important first."
+    ),
+    ConfigProperty(
+        name="time_budget_min",
+        type=int,
+        default=0,
+        description="Finish within this many minutes, skipping what is left in the queue. 0 for no limit."
+    ),
+    ConfigProperty(
+        name="sample_size",
+        type=int,
+        default=0,
+        description="Process a stratified random sample of this many targets and estimate hit rates. 0 for all."
+    ),
+    ConfigProperty(
+        name="sample_by",
+        type=str,
+        default="port",
+        description="Attribute the sample is stratified by: port, service or asn."
+    ),
+    ConfigProperty(
+        name="skip_recent_hours",
+        type=int,
+        default=0,
+        description="Skip targets this processor already processed with the same config within this many hours. 0 to process all."
+    ),
+    ConfigProperty(
+        name="max_per_host",
+        type=int,
+        default=2,
+        description="Maximum concurrent probes against a single IP."
+    ),
+    ConfigProperty(
+        name="max_per_subnet",
+        type=int,
+        default=16,
+        description="Maximum concurrent probes against a single /24."
+    ),
+    ConfigProperty(
+        name="host_delay_ms",
+        type=int,
+        default=0,
+        description="Minimum delay between probes to the same IP in milliseconds."
+    ),
+    ConfigProperty(
+        name="subnet_rate",
+        type=int,
+        default=0,
+        description="Maximum probes per second against a single /24, 0 for unlimited."
+    ),
+    ConfigProperty(
+        name="max_attempts",
+        type=int,
+        default=3,
+        description="Attempts per target for connection resets. Timeouts are not retried."
+    ),
+    ConfigProperty(
+        name="retry_delay_ms",
+        type=int,
+        default=250,
+        description="Base backoff before a retry in milliseconds, doubled each attempt."
+    ),
+    ConfigProperty(
+        name="breaker_threshold",
+        type=int,
+        default=5,
+        description="Consecutive transient failures before a host is skipped, 0 to disable."
+    ),
+    ConfigProperty(
+        name="adaptive_timeouts",
+        type=bool,
+        default=True,
+        description="Derive connect timeouts from observed RTTs instead of fixed values."
+    ),
+    ConfigProperty(
+        name="timeout_factor",
+        type=int,
+        default=4,
+        description="Adaptive connect timeout as a multiple of the p95 RTT."
+    ),
+    ConfigProperty(
+        name="timeout_floor_ms",
+        type=int,
+        default=250,
+        description="Shortest adaptive connect timeout in milliseconds."
+    ),
+    ConfigProperty(
+        name="timeout_ceiling_ms",
+        type=int,
+        default=10000,
+        description="Longest adaptive connect timeout in milliseconds."
+    ),
+    ConfigProperty(
+        name="pipeline",
+        type=str,
+        default="",
+        description="Stages to run after this processor, e.g. 'Capture The Flag?success*10 > Bear Claw?banner'."
+    ),
+]
+
+
+@dataclass
+class WorkItem:
+    """A single target handed to the engine"""
+    index: int
+    target: dict
+    source: Any = None
+
+
+class ProcessingEngine:
+    """
+    Runs a processor over many targets with bounded parallelism.
+
+    A fixed pool of worker tasks pulls items from an asyncio.Queue, so at
+    most `concurrency` calls to `process` are awaiting the network at once.
+    Blocking and CPU bound processors are handed to the ExecutorPool.
+    Callbacks fire on the engine loop as each item starts and finishes.
+
+    Items can be given to `run` up front, or streamed in with `feed` while
+    the engine runs and ended with `close`, which is how pipeline stages
+    hand targets to each other.
+
+    With a PolitenessScheduler, workers skip past items whose host or /24
+    is at its limit and take the first item that may start. Failed attempts
+    are retried according to `retry_policy`, with the politeness slot
+    released during the backoff. An optional circuit breaker rejects
+    targets on hosts or subnets that keep failing transiently. A
+    RunContext, when given, is made current for the workers so processors
+    share connect outcomes and banners through it; a failed connect is
+    dropped from it before the target is retried. An AIMDController, when
+    given, caps how many of the workers may probe at once and adapts that
+    cap to the congestion errors it sees. Batch processors pace themselves
+    and are not limited by it. With a Prioritizer the queue hands out the
+    highest scoring items first, and `reprioritize` moves a queued item
+    after its source changed (e.g. the user pinned it).
+
+    A `deadline` (time.monotonic based) puts a time budget on the run: once
+    it passes, probes in flight finish but nothing is retried and every item
+    still queued is handed to `on_skipped` instead of the processor.
+
+    RunMetrics, when given, receives the latency of every attempt, the
+    outcome of every item and the number of items in flight.
+
+    When `config` is given the engine owns the processor's lifecycle: it
+    awaits `processor.setup(config)` once before the first item and
+    `processor.teardown()` after the last, so targets carry only what
+    differs per item. Without it the caller (e.g. a Pipeline) does this.
+
+    `stop` may be called from any thread. It cancels every worker task, so
+    in-flight probes are interrupted (their sockets are closed as the
+    cancellation unwinds) and reported through `on_cancelled`.
+    """
+
+    def __init__(
+        self,
+        processor: ProcessorBase,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        on_started: Optional[Callable[[WorkItem], None]] = None,
+        on_finished: Optional[Callable[[WorkItem, ProcessingResult], None]] = None,
+        on_error: Optional[Callable[[WorkItem, Exception], None]] = None,
+        on_cancelled: Optional[Callable[[WorkItem], None]] = None,
+        executors: Optional[ExecutorPool] = None,
+        scheduler: Optional[PolitenessScheduler] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        context: Optional[RunContext] = None,
+        limiter: Optional[AIMDController] = None,
+        prioritizer: Optional[Prioritizer] = None,
+        deadline: Optional[float] = None,
+        on_skipped: Optional[Callable[[WorkItem], None]] = None,
+        metrics: Optional[RunMetrics] = None,
+        config: Optional[dict] = None,
+    ):
+        self.processor = processor
+        self.config = config
+        self.concurrency = max(1, int(concurrency))
+        self.executors = executors
+        self.scheduler = scheduler
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=1)
+        self.breaker = breaker
+        self.context = context
+        self.limiter = limiter
+        self.on_started = on_started
+        self.on_finished = on_finished
+        self.on_error = on_error
+        self.on_cancelled = on_cancelled
+        self.is_running = False
+        self.in_flight: Dict[int, WorkItem] = {}
+        self._stopped = False
+        self._closed = False
+        self.prioritizer = prioritizer
+        self.deadline = deadline
+        self.on_skipped = on_skipped
+        self.metrics = metrics
+        self._queue: asyncio.Queue = PriorityWorkQueue(prioritizer) if prioritizer else asyncio.Queue()
+        if scheduler:
+            # Workers only dequeue items whose host has a free slot, already taken for them
+            self._queue = PoliteWorkQueue(scheduler, self._queue, lambda item: item.target.get("ip"))
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._workers: List[asyncio.Task] = []
+
+    def feed(self, item: WorkItem) -> None:
+        """Add an item while the engine runs. Call from the engine loop."""
+        if self._closed:
+            raise RuntimeError("Cannot feed a closed engine")
+        self._queue.put_nowait(item)
+
+    def close(self) -> None:
+        """Signal that no more items will be fed. Workers exit once the queue drains."""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            self._queue.put_nowait(None)
+
+    def reprioritize(self, index: int) -> None:
+        """Rescore a queued item. Safe to call from any thread."""
+        if not self.prioritizer:
+            return
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            self._queue.reprioritize(index)
+        else:
+            loop.call_soon_threadsafe(self._queue.reprioritize, index)
+
+    def stop(self) -> None:
+        """Stop the run and cancel everything in flight. Safe to call from any thread."""
+        self._stopped = True
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._cancel_workers()
+        else:
+            loop.call_soon_threadsafe(self._cancel_workers)
+
+    def _cancel_workers(self) -> None:
+        for task in self._workers:
+            task.cancel()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stopped
+
+    @property
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    async def run(self, items: Optional[Iterable[WorkItem]] = None) -> None:
+        """
+        Process items until the input is closed and drained.
+        If items are given they are queued and the input is closed right away.
+        """
+        if items is not None:
+            if self.scheduler:
+                items = self.scheduler.interleave(items, lambda item: item.target.get("ip"))
+            if self.prioritizer:
+                items = list(items)
+                self.prioritizer.prepare(items)
+            for item in items:
+                self.feed(item)
+            self.close()
+
+        if self.processor.supports_batch:
+            # Each worker holds a whole batch, keep roughly `concurrency` targets in flight
+            batch_size = max(1, self.processor.batch_size)
+            worker_count = max(1, self.concurrency // batch_size)
+            if self._closed:
+                worker_count = min(worker_count, -(-self._queue.qsize() // batch_size))
+            worker = self._batch_worker
+        else:
+            worker_count = self.concurrency
+            if self._closed:
+                worker_count = min(worker_count, self._queue.qsize())
+            worker = self._worker
+        if not worker_count:
+            return
+
+        owns_executors = self.executors is None
+        if owns_executors:
+            self.executors = ExecutorPool(max_threads=self.concurrency)
+
+        self._loop = asyncio.get_running_loop()
+        self.is_running = True
+        set_up = False
+        try:
+            # Workers inherit the run context and executors, processors reach them through helpers
+            with run_context(self.context), executor_pool(self.executors):
+                if self.config is not None:
+                    await self.processor.setup(self.config)
+                    set_up = True
+                self._workers = [asyncio.create_task(worker()) for _ in range(worker_count)]
+            if self._closed:
+                # Input was closed before the workers existed, one sentinel each
+                for _ in self._workers:
+                    self._queue.put_nowait(None)
+            if self._stopped:
+                # stop() landed before the workers existed
+                self._cancel_workers()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        finally:
+            self.is_running = False
+            self._workers = []
+            self._loop = None
+            if set_up:
+                await self._teardown()
+            if owns_executors:
+                self.executors.shutdown()
+                self.executors = None
+
+    async def _teardown(self) -> None:
+        try:
+            await self.processor.teardown()
+        except Exception as ex:
+            print(f"Teardown of {self.processor.name} failed: {ex}")
+
+    async def _take_slots(self, item: WorkItem) -> None:
+        """Take the slots for a retry of item: limiter first, then politeness"""
+        if self.limiter is not None:
+            await self.limiter.acquire()
+        if self.scheduler:
+            try:
+                await self.scheduler.acquire(item.target.get("ip"))
+            except BaseException:
+                if self.limiter is not None:
+                    self.limiter.cancel()
+                raise
+
+    async def _attempt(self, item: WorkItem) -> ProcessingResult:
+        """One attempt at item, giving back the slots it holds when done"""
+        result, error = None, None
+        start = time.monotonic()
+        try:
+            self._notify(self.on_started, item)
+            result = await self.executors.run(self.processor, item.target)
+            return result
+        except Exception as ex:
+            error = ex
+            raise
+        finally:
+            self._release_slot(item)
+            if self.limiter is not None:
+                self.limiter.release(self.retry_policy.error_type(result, error) in CONGESTION_ERRORS)
+            if self.metrics is not None and (result is not None or error is not None):
+                self.metrics.observe_attempt(self.processor.name, time.monotonic() - start)
+
+    async def _process_item(self, item: WorkItem) -> ProcessingResult:
+        """
+        Run one item, retrying what the retry policy allows. Raises the last error if every attempt raised.
+        The item arrives holding its politeness and limiter slots, see _next_item.
+        """
+        ip = item.target.get("ip")
+        if self.breaker and not self.breaker.allow(ip):
+            self._give_back(item)
+            return self.breaker.rejection(ip)
+
+        attempt = 0
+        while True:
+            result, error = None, None
+            try:
+                result = await self._attempt(item)
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                error = ex
+            attempt += 1
+
+            transient = self.retry_policy.is_transient(result, error)
+            if self.breaker:
+                self.breaker.record(ip, transient)
+            if self._can_retry(ip, attempt, result, error):
+                await asyncio.sleep(self.retry_policy.delay(attempt))
+                self._forget_failure(item)
+                await self._take_slots(item)
+                if not self.expired:
+                    continue
+                # The time budget ran out while waiting for the slots, report the last outcome
+                self._give_back(item)
+            if error is not None:
+                raise error
+            return result
+
+    async def _next_item(self) -> Optional[WorkItem]:
+        """
+        The next item, holding its politeness slot and, with a limiter, a
+        limiter slot. Never waits for the limiter while holding a politeness
+        slot: with a scheduler the limiter slot is taken first and given back
+        while no item is ready.
+        """
+        if self.limiter is None:
+            return await self._queue.get()
+        if not self.scheduler:
+            item = await self._queue.get()
+            if item is not None:
+                try:
+                    await self.limiter.acquire()
+                except asyncio.CancelledError:
+                    self._notify(self.on_cancelled, item)
+                    raise
+            return item
+        while True:
+            await self.limiter.acquire()
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                self.limiter.cancel()
+                await self._queue.wait()
+                continue
+            if item is None:
+                self.limiter.cancel()
+            return item
+
+    async def _worker(self) -> None:
+        while not self._stopped:
+            item = await self._next_item()
+            if item is None:
+                return
+            if self.expired:
+                self._give_back(item)
+                self._notify(self.on_skipped, item)
+                continue
+
+            self.in_flight[item.index] = item
+            if self.metrics is not None:
+                self.metrics.in_flight += 1
+            try:
+                result = await self._process_item(item)
+            except asyncio.CancelledError:
+                self._notify(self.on_cancelled, item)
+                raise
+            except Exception as ex:
+                if self.metrics is not None:
+                    self.metrics.observe_error(ex)
+                self._notify(self.on_error, item, ex)
+            else:
+                if self.metrics is not None:
+                    self.metrics.observe_result(result)
+                self._notify(self.on_finished, item, result)
+            finally:
+                self.in_flight.pop(item.index, None)
+                if self.metrics is not None:
+                    self.metrics.in_flight -= 1
+
+    async def _batch_worker(self) -> None:
+        batch_size = max(1, self.processor.batch_size)
+        closed = False
+        while not self._stopped and not closed:
+            first = await self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            while len(batch) < batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is None:
+                    # Our sentinel, finish this batch and exit
+                    closed = True
+                    break
+                batch.append(item)
+            if self.expired:
+                for item in batch:
+                    self._release_slot(item)
+                    self._notify(self.on_skipped, item)
+                continue
+
+            # Results come back keyed by the target dict they were produced for
+            pending = {id(item.target): item for item in batch}
+            for item in batch:
+                self.in_flight[item.index] = item
+                self._notify(self.on_started, item)
+            if self.metrics is not None:
+                self.metrics.in_flight += len(batch)
+            try:
+                self._reject_open_circuits(pending)
+                attempt = 0
+                while pending:
+                    attempt += 1
+                    retry = []
+                    started = time.monotonic()
+                    async for target, result in self.processor.process_batch([item.target for item in pending.values()]):
+                        item = pending.get(id(target))
+                        if item is None:
+                            continue
+                        if self.metrics is not None:
+                            self.metrics.observe_attempt(self.processor.name, time.monotonic() - started)
+                        transient = self.retry_policy.is_transient(result, None)
+                        if self.breaker:
+                            self.breaker.record(target.get("ip"), transient)
+                        if self._can_retry(target.get("ip"), attempt, result, None):
+                            retry.append(item)
+                            continue
+                        del pending[id(target)]
+                        self._finish_batch_item(item, result)
+                    if len(retry) < len(pending):
+                        raise RuntimeError(f"{self.processor.name} returned no result for this target")
+                    if retry:
+                        await asyncio.sleep(self.retry_policy.delay(attempt))
+                        for item in retry:
+                            self._forget_failure(item)
+            except asyncio.CancelledError:
+                for item in pending.values():
+                    self._notify(self.on_cancelled, item)
+                raise
+            except Exception as ex:
+                for item in pending.values():
+                    if self.metrics is not None:
+                        self.metrics.observe_error(ex)
+                    self._notify(self.on_error, item, ex)
+            finally:
+                # A batch holds its targets' politeness slots, retries included, until it is done
+                for item in batch:
+                    self.in_flight.pop(item.index, None)
+                    self._release_slot(item)
+                if self.metrics is not None:
+                    self.metrics.in_flight -= len(batch)
+
+    def _forget_failure(self, item: WorkItem) -> None:
+        """Before a retry, drop the failed connect the run context cached for the target"""
+        if self.context is not None:
+            self.context.forget_failure(item.target.get("ip"), item.target.get("port"))
+
+    def _release_slot(self, item: WorkItem) -> None:
+        """Give back the politeness slot the queue took for item"""
+        if self.scheduler:
+            self.scheduler.release(item.target.get("ip"))
+
+    def _give_back(self, item: WorkItem) -> None:
+        """Give back the slots _next_item took for an item that is not probed after all"""
+        self._release_slot(item)
+        if self.limiter is not None:
+            self.limiter.cancel()
+
+    def _finish_batch_item(self, item: WorkItem, result: ProcessingResult) -> None:
+        self.in_flight.pop(item.index, None)
+        if self.metrics is not None:
+            self.metrics.observe_result(result)
+        self._notify(self.on_finished, item, result)
+
+    def _can_retry(self, ip: str, attempt: int, result: Optional[ProcessingResult],
+                   error: Optional[BaseException]) -> bool:
+        if self._stopped or self.expired or not self.retry_policy.should_retry(attempt, result, error):
+            return False
+        # A circuit opened by this failure ends the retries, the last real outcome is reported
+        return not self.breaker or self.breaker.allow(ip)
+
+    def _reject_open_circuits(self, pending: Dict[int, WorkItem]) -> None:
+        """Finish pending batch items whose host or subnet circuit is open"""
+        if not self.breaker:
+            return
+        for key, item in list(pending.items()):
+            ip = item.target.get("ip")
+            if not self.breaker.allow(ip):
+                del pending[key]
+                self._finish_batch_item(item, self.breaker.rejection(ip))
+
+    @staticmethod
+    def _notify(callback, *args) -> None:
+        if not callback:
+            return
+        try:
+            callback(*args)
+        except Exception as ex:
+            # A broken UI callback must not take the worker down with it
+            print(f"Engine callback error: {ex}")
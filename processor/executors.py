@@ -0,0 +1,120 @@
+#processor/executors.py
+import asyncio
+import importlib.util
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional, Tuple
+from .base import ProcessorBase, ProcessingResult, ExecutionMode
+
+# Processors instantiated inside a worker process, keyed by (path, class name)
+_subprocess_processors: Dict[Tuple[str, str], ProcessorBase] = {}
+
+_current_pool: ContextVar[Optional["ExecutorPool"]] = ContextVar("dh_executor_pool", default=None)
+
+
+@contextmanager
+def executor_pool(pool: Optional["ExecutorPool"]):
+    """Make pool the one run_blocking uses for the enclosed code and any task it creates"""
+    token = _current_pool.set(pool)
+    try:
+        yield pool
+    finally:
+        _current_pool.reset(token)
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a blocking call from a processor. During a run it goes to the engine's
+    bounded thread pool, outside one to the loop's default executor.
+    """
+    pool = _current_pool.get()
+    if pool is None:
+        return await asyncio.to_thread(func, *args)
+    return await asyncio.get_running_loop().run_in_executor(pool.thread_pool, func, *args)
+
+
+def _load_processor(source_path: str, class_name: str) -> ProcessorBase:
+    """Load a processor class from its file inside a worker process"""
+    key = (source_path, class_name)
+    if key not in _subprocess_processors:
+        module_name = os.path.splitext(os.path.basename(source_path))[0]
+        spec = importlib.util.spec_from_file_location(module_name, source_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _subprocess_processors[key] = getattr(module, class_name)()
+    return _subprocess_processors[key]
+
+
+def run_in_subprocess(processor_ref, target: dict, config: Optional[dict] = None) -> ProcessingResult:
+    """
+    Entry point for process pool jobs.
+
+    Processors are loaded by file path rather than as importable modules, so
+    a (source path, class name) pair is sent instead of the instance and the
+    worker loads and caches its own copy. Processors without a source path
+    are pickled as-is. The run's config snapshot travels with each job since
+    setup only ran on the engine's copy.
+    """
+    if isinstance(processor_ref, tuple):
+        processor = _load_processor(*processor_ref)
+    else:
+        processor = processor_ref
+    if config is not None and processor.config != config:
+        processor.config = config
+    return processor.process_blocking(target)
+
+
+class ExecutorPool:
+    """
+    Runs processors according to their execution mode.
+
+    Async processors are awaited on the calling loop, blocking ones go to a
+    bounded thread pool and CPU bound ones to a process pool. Pools are only
+    created the first time they are needed.
+    """
+
+    def __init__(self, max_threads: int = 32, max_processes: Optional[int] = None):
+        self.max_threads = max(1, int(max_threads))
+        self.max_processes = max_processes or os.cpu_count() or 1
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def thread_pool(self) -> ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(max_workers=self.max_threads, thread_name_prefix="dh-proc")
+        return self._thread_pool
+
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.max_processes)
+        return self._process_pool
+
+    async def run(self, processor: ProcessorBase, target: dict) -> ProcessingResult:
+        mode = processor.execution_mode
+        if mode == ExecutionMode.ASYNC:
+            return await processor.process(target)
+
+        loop = asyncio.get_running_loop()
+        if mode == ExecutionMode.THREAD:
+            return await loop.run_in_executor(self.thread_pool, processor.process_blocking, target)
+
+        if mode == ExecutionMode.PROCESS:
+            processor_ref = processor
+            if processor.source_path:
+                processor_ref = (processor.source_path, type(processor).__name__)
+            return await loop.run_in_executor(self.process_pool, run_in_subprocess, processor_ref, target,
+                                              processor.config)
+
+        raise ValueError(f"Unsupported execution mode: {mode}")
+
+    def shutdown(self, wait: bool = False) -> None:
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=wait, cancel_futures=True)
+            self._thread_pool = None
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=wait, cancel_futures=True)
+            self._process_pool = None
@@ -50,7 +50,9 @@ class ProcessorManager:
                             if (inspect.isclass(obj) and 
                                 issubclass(obj, ProcessorBase) and 
                                 obj != ProcessorBase):
-                                self.register_processor(obj())
+                                processor = obj()
+                                processor.source_path = path
+                                self.register_processor(processor)
                 except Exception as e:
                     print(f"Error loading processor {filename}: {e}")
 
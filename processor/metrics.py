@@ -0,0 +1,201 @@
+#processor/metrics.py
+import math
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+from .base import ProcessingResult
+
+
+class LatencyHistogram:
+    """
+    Log-linear latency histogram in the spirit of HdrHistogram.
+
+    Each power of two above `lowest` is split into `sub_buckets` linear
+    buckets, so any recorded value is reported within about 1/sub_buckets
+    of its true size while memory stays fixed no matter how many samples
+    are recorded.
+    """
+
+    def __init__(self, lowest: float = 1e-5, highest: float = 300.0, sub_buckets: int = 16):
+        self.lowest = lowest
+        self.sub_buckets = sub_buckets
+        self.magnitudes = math.ceil(math.log2(highest / lowest)) + 1
+        self.counts = [0] * (self.magnitudes * sub_buckets)
+        self.total = 0
+        self.max = 0.0
+
+    def _index(self, value: float) -> int:
+        mantissa, exponent = math.frexp(max(value / self.lowest, 1.0))
+        # frexp gives mantissa in [0.5, 1), scale it to a linear position in [0, sub_buckets)
+        sub = int((mantissa * 2 - 1) * self.sub_buckets)
+        return min(len(self.counts) - 1, (exponent - 1) * self.sub_buckets + sub)
+
+    def _upper(self, index: int) -> float:
+        magnitude, sub = divmod(index, self.sub_buckets)
+        return self.lowest * (2 ** magnitude) * (1 + (sub + 1) / self.sub_buckets)
+
+    def record(self, value: float) -> None:
+        self.counts[self._index(value)] += 1
+        self.total += 1
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the p-th percentile, 0 when empty"""
+        if not self.total:
+            return 0.0
+        rank = max(1, math.ceil(self.total * p / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                # The last bucket also holds everything above `highest`
+                if index == len(self.counts) - 1:
+                    return self.max
+                return min(self._upper(index), self.max)
+        return self.max
+
+
+class RollingCounter:
+    """
+    Events per time slot kept in a fixed ring buffer.
+
+    Slots are stamped with the time slot they hold and recycled once that
+    slot falls out of the window, so there is no pruning or locking: the
+    engine loop is the only writer and readers just sum the live slots.
+    """
+
+    def __init__(self, slots: int = 60, slot_seconds: float = 1.0):
+        self.slots = slots
+        self.slot_seconds = slot_seconds
+        self._counts = [0] * slots
+        self._stamps = [-1] * slots
+
+    def add(self, amount: int = 1, now: Optional[float] = None) -> None:
+        stamp = int((now or time.monotonic()) / self.slot_seconds)
+        i = stamp % self.slots
+        if self._stamps[i] != stamp:
+            self._stamps[i] = stamp
+            self._counts[i] = 0
+        self._counts[i] += amount
+
+    def sum(self, seconds: float, now: Optional[float] = None) -> int:
+        current = int((now or time.monotonic()) / self.slot_seconds)
+        oldest = current - int(seconds / self.slot_seconds)
+        return sum(count for count, stamp in zip(self._counts, self._stamps) if oldest < stamp <= current)
+
+
+class RunMetrics:
+    """
+    Throughput, latency and outcome counters for one processing run.
+
+    The engine reports each attempt's `process` latency and each item's
+    outcome. The owner of the run reports items leaving the run with
+    `item_done`, which drives throughput and the ETA. Outcomes are counted
+    over the whole run and, for the live view, over the rolling window.
+    """
+
+    def __init__(self, expected: int = 0, window: float = 10.0):
+        self.expected = expected
+        self.window = window
+        self.started = time.monotonic()
+        self.done = 0
+        self.in_flight = 0
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.colors: Counter = Counter()
+        self.errors: Counter = Counter()
+        self._throughput = RollingCounter()
+        self._recent_colors: Dict[str, RollingCounter] = {}
+        self._recent_errors: Dict[str, RollingCounter] = {}
+
+    def observe_attempt(self, processor_name: str, seconds: float) -> None:
+        histogram = self.latency.get(processor_name)
+        if histogram is None:
+            histogram = self.latency[processor_name] = LatencyHistogram()
+        histogram.record(seconds)
+
+    @staticmethod
+    def _count(totals: Counter, recent: Dict[str, RollingCounter], key: str) -> None:
+        totals[key] += 1
+        counter = recent.get(key)
+        if counter is None:
+            counter = recent[key] = RollingCounter()
+        counter.add()
+
+    def observe_result(self, result: ProcessingResult) -> None:
+        self._count(self.colors, self._recent_colors, result.color)
+        if result.error_type:
+            self._count(self.errors, self._recent_errors, result.error_type)
+
+    def observe_error(self, ex: BaseException) -> None:
+        self._count(self.colors, self._recent_colors, "red")
+        self._count(self.errors, self._recent_errors, type(ex).__name__)
+
+    def _recent(self, recent: Dict[str, RollingCounter]) -> Counter:
+        counts = Counter({key: counter.sum(self.window) for key, counter in recent.items()})
+        return +counts
+
+    @property
+    def recent_colors(self) -> Counter:
+        """Outcome colors over the rolling window"""
+        return self._recent(self._recent_colors)
+
+    @property
+    def recent_errors(self) -> Counter:
+        """Error types over the rolling window"""
+        return self._recent(self._recent_errors)
+
+    def item_done(self) -> None:
+        self.done += 1
+        self._throughput.add()
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self) -> float:
+        """Items per second over the rolling window"""
+        span = min(self.window, max(self.elapsed, 1.0))
+        return self._throughput.sum(span) / span
+
+    @property
+    def eta(self) -> Optional[float]:
+        rate = self.rate
+        remaining = self.expected - self.done
+        if remaining <= 0:
+            return 0.0
+        return remaining / rate if rate else None
+
+    def percentiles(self, processor_name: str) -> List[float]:
+        histogram = self.latency.get(processor_name)
+        if histogram is None:
+            return [0.0, 0.0, 0.0]
+        return [histogram.percentile(p) for p in (50, 95, 99)]
+
+    @staticmethod
+    def format_seconds(seconds: Optional[float]) -> str:
+        if seconds is None:
+            return "--"
+        if seconds < 1:
+            return f"{seconds * 1000:.0f}ms"
+        if seconds < 120:
+            return f"{seconds:.1f}s"
+        return f"{int(seconds // 60)}m{int(seconds % 60):02d}s"
+
+    def summary_lines(self) -> List[str]:
+        elapsed = self.elapsed
+        lines = [
+            f"Processed {self.done} of {self.expected} in {self.format_seconds(elapsed)} "
+            f"({self.done / elapsed if elapsed else 0:.1f} items/s)"
+        ]
+        for name, histogram in self.latency.items():
+            p50, p95, p99 = self.percentiles(name)
+            lines.append(
+                f"{name}: p50 {self.format_seconds(p50)}, p95 {self.format_seconds(p95)}, "
+                f"p99 {self.format_seconds(p99)} over {histogram.total} attempts")
+        if self.colors:
+            lines.append("Outcomes: " + ", ".join(f"{color} {count}" for color, count in self.colors.most_common()))
+        if self.errors:
+            lines.append("Errors: " + ", ".join(f"{error} {count}" for error, count in self.errors.most_common()))
+        return lines
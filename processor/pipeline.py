@@ -0,0 +1,220 @@
+#processor/pipeline.py
+import asyncio
+import copy
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from .base import ProcessorBase, ProcessingResult
+from .engine import ProcessingEngine, WorkItem, DEFAULT_CONCURRENCY
+from .executors import ExecutorPool
+from .scheduler import PolitenessScheduler
+from .resilience import RetryPolicy, CircuitBreaker
+from .context import RunContext
+from .concurrency import AIMDController
+from .priority import Prioritizer
+from .metrics import RunMetrics
+
+
+def _has_banner(result: ProcessingResult) -> bool:
+    details = result.details or {}
+    return bool(details.get("banners") or details.get("response"))
+
+
+# Conditions a result must meet to be handed to the next stage
+STAGE_CONDITIONS: Dict[str, Callable[[ProcessingResult], bool]] = {
+    "always": lambda result: True,
+    "success": lambda result: result.success,
+    "green": lambda result: result.color == "green",
+    "failed": lambda result: not result.success,
+    "banner": _has_banner,
+}
+
+
+@dataclass
+class PipelineStage:
+    """One processor in a pipeline and the condition for feeding it"""
+    processor: ProcessorBase
+    condition: str = "always"
+    concurrency: int = DEFAULT_CONCURRENCY
+    config: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if self.condition not in STAGE_CONDITIONS:
+            raise ValueError(f"Unknown stage condition: {self.condition}")
+
+    def accepts(self, result: ProcessingResult) -> bool:
+        return STAGE_CONDITIONS[self.condition](result)
+
+
+class Pipeline:
+    """
+    Chains processors so results stream from one stage into the next.
+
+    Every stage runs its own ProcessingEngine at the same time. As soon as a
+    target finishes in stage i and passes the condition of stage i + 1, it is
+    fed to that stage, so fast targets reach the end of the chain while slow
+    ones are still being probed upstream. A stage's input is closed once the
+    stage before it has drained. All stages share one politeness
+    scheduler, retry policy, circuit breaker and run context, so a later
+    stage reuses the connects and banners of the earlier ones. A shared
+    AIMDController caps the probes in flight across all stages.
+
+    The pipeline sets up each distinct processor once, with the config of
+    the first stage using it, and tears it down after every stage drained.
+
+    Callbacks receive the stage index first. `on_finished` also receives a
+    `final` flag, true when the item will not go any further down the chain.
+    """
+
+    def __init__(
+        self,
+        stages: List[PipelineStage],
+        on_started: Optional[Callable[[int, WorkItem], None]] = None,
+        on_finished: Optional[Callable[[int, WorkItem, ProcessingResult, bool], None]] = None,
+        on_error: Optional[Callable[[int, WorkItem, Exception], None]] = None,
+        on_cancelled: Optional[Callable[[int, WorkItem], None]] = None,
+        executors: Optional[ExecutorPool] = None,
+        scheduler: Optional[PolitenessScheduler] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        context: Optional[RunContext] = None,
+        limiter: Optional[AIMDController] = None,
+        prioritizer: Optional[Prioritizer] = None,
+        deadline: Optional[float] = None,
+        on_skipped: Optional[Callable[[int, WorkItem], None]] = None,
+        metrics: Optional[RunMetrics] = None,
+    ):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = stages
+        self.on_started = on_started
+        self.on_finished = on_finished
+        self.on_error = on_error
+        self.on_cancelled = on_cancelled
+        self.on_skipped = on_skipped
+        self.scheduler = scheduler
+        self.engines = [
+            ProcessingEngine(
+                stage.processor,
+                concurrency=stage.concurrency,
+                on_started=self._stage_callback(self.on_started, i),
+                on_finished=self._make_forwarder(i),
+                on_error=self._stage_callback(self.on_error, i),
+                on_cancelled=self._stage_callback(self.on_cancelled, i),
+                executors=executors,
+                scheduler=scheduler,
+                retry_policy=retry_policy,
+                breaker=breaker,
+                context=context,
+                limiter=limiter,
+                prioritizer=prioritizer,
+                deadline=deadline,
+                on_skipped=self._stage_callback(self.on_skipped, i),
+                metrics=metrics,
+            )
+            for i, stage in enumerate(stages)
+        ]
+
+    @staticmethod
+    def _stage_callback(callback, stage_index: int):
+        if not callback:
+            return None
+        return lambda *args: callback(stage_index, *args)
+
+    def _make_forwarder(self, stage_index: int):
+        next_index = stage_index + 1
+
+        def forward(item: WorkItem, result: ProcessingResult):
+            final = True
+            if next_index < len(self.stages) and not self.stopped:
+                stage = self.stages[next_index]
+                if stage.accepts(result):
+                    final = False
+                    target = {
+                        "ip": item.target.get("ip"),
+                        "port": item.target.get("port"),
+                        "upstream": result.details or {},
+                    }
+                    self.engines[next_index].feed(WorkItem(index=item.index, target=target, source=item.source))
+            if self.on_finished:
+                self.on_finished(stage_index, item, result, final)
+
+        return forward
+
+    @property
+    def stopped(self) -> bool:
+        return any(engine.stopped for engine in self.engines)
+
+    def reprioritize(self, index: int) -> None:
+        """Rescore an item in whichever stage queues it. Safe to call from any thread."""
+        for engine in self.engines:
+            engine.reprioritize(index)
+
+    def stop(self) -> None:
+        """Stop every stage. Safe to call from any thread."""
+        for engine in self.engines:
+            engine.stop()
+
+    async def _run_stage(self, index: int, items: Optional[Iterable[WorkItem]]) -> None:
+        try:
+            await self.engines[index].run(items)
+        finally:
+            if index + 1 < len(self.engines):
+                self.engines[index + 1].close()
+
+    async def run(self, items: Iterable[WorkItem]) -> None:
+        """Feed items into the first stage and run until every stage has drained"""
+        items = list(items)
+        if self.scheduler:
+            items = self.scheduler.interleave(items, lambda item: item.target.get("ip"))
+        processors: Dict[int, PipelineStage] = {}
+        for stage in self.stages:
+            processors.setdefault(id(stage.processor), stage)
+        ready = []
+        try:
+            for stage in processors.values():
+                await stage.processor.setup(stage.config)
+                ready.append(stage.processor)
+            runs = [self._run_stage(0, items)]
+            runs += [self._run_stage(i, None) for i in range(1, len(self.engines))]
+            await asyncio.gather(*runs)
+        finally:
+            for processor in ready:
+                try:
+                    await processor.teardown()
+                except Exception as ex:
+                    print(f"Teardown of {processor.name} failed: {ex}")
+
+
+_STAGE_PATTERN = re.compile(r"^(?P<name>[^?*]+?)\s*(?:\?\s*(?P<condition>\w+))?\s*(?:\*\s*(?P<concurrency>\d+))?$")
+
+
+def parse_pipeline(spec: str, lookup: Callable[[str], Optional[ProcessorBase]],
+                   concurrency: int = DEFAULT_CONCURRENCY) -> List[PipelineStage]:
+    """
+    Parse a pipeline spec such as
+    "Port Knocker*50 > Capture The Flag?success*10 > Bear Claw?banner".
+    Each stage is a processor name with an optional ?condition and *concurrency.
+    Stages after the first use their processor's default config. Each stage
+    gets its own copy of the processor looked up, so setting it up for the
+    run leaves the shared instance alone.
+    """
+    stages = []
+    for part in spec.split(">"):
+        part = part.strip()
+        match = _STAGE_PATTERN.match(part)
+        if not match:
+            raise ValueError(f"Invalid pipeline stage: '{part}'")
+        name = match.group("name").strip()
+        processor = lookup(name)
+        if processor is None:
+            raise ValueError(f"Processor '{name}' not found")
+        stages.append(PipelineStage(
+            processor=copy.copy(processor),
+            condition=match.group("condition") or "always",
+            concurrency=int(match.group("concurrency") or concurrency),
+            config=processor.get_config_defaults(),
+        ))
+    if not stages:
+        raise ValueError("Empty pipeline")
+    return stages
@@ -0,0 +1,178 @@
+#processor/priority.py
+import asyncio
+import heapq
+from abc import ABC, abstractmethod
+from collections import Counter
+from itertools import count
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class PriorityScorer(ABC):
+    """Scores work items, higher scores are processed first"""
+
+    def prepare(self, items: List[Any]) -> None:
+        """Look at the whole queue before scoring, e.g. to count ports per host"""
+        pass
+
+    @abstractmethod
+    def score(self, item) -> float:
+        pass
+
+
+class PinnedScorer(PriorityScorer):
+    """Items the user pinned in the queue"""
+
+    def score(self, item) -> float:
+        return 1 if getattr(item.source, 'pinned', False) else 0
+
+
+class UnseenScorer(PriorityScorer):
+    """Results not seen in earlier searches"""
+
+    def score(self, item) -> float:
+        return 1 if getattr(item.source, 'isUnseen', False) else 0
+
+
+class PortsScorer(PriorityScorer):
+    """Listed ports, in the order given"""
+
+    def __init__(self, ports: List[int]):
+        self.ranks = {port: len(ports) - i for i, port in enumerate(ports)}
+
+    def score(self, item) -> float:
+        try:
+            return self.ranks.get(int(item.target.get("port")), 0)
+        except (TypeError, ValueError):
+            return 0
+
+
+class OpenPortsScorer(PriorityScorer):
+    """Hosts with the most open ports in the queue"""
+
+    def __init__(self):
+        self.ports_per_host: Counter = Counter()
+
+    def prepare(self, items: List[Any]) -> None:
+        self.ports_per_host = Counter(item.target.get("ip") for item in items)
+
+    def score(self, item) -> float:
+        return self.ports_per_host.get(item.target.get("ip"), 0)
+
+
+def parse_ports(spec: str) -> List[int]:
+    return [int(port) for port in str(spec).replace(" ", "").split(",") if port.isdigit()]
+
+
+SCORERS: Dict[str, Callable[[Dict[str, Any]], PriorityScorer]] = {
+    "pinned": lambda options: PinnedScorer(),
+    "unseen": lambda options: UnseenScorer(),
+    "ports": lambda options: PortsScorer(parse_ports(options.get("priority_ports", ""))),
+    "open_ports": lambda options: OpenPortsScorer(),
+}
+
+
+def register_scorer(name: str, factory: Callable[[Dict[str, Any]], PriorityScorer]) -> None:
+    SCORERS[name] = factory
+
+
+class Prioritizer:
+    """Orders items by several scorers, the first one deciding and the rest breaking ties"""
+
+    def __init__(self, scorers: List[PriorityScorer]):
+        self.scorers = scorers
+
+    @classmethod
+    def from_spec(cls, spec: str, options: Optional[Dict[str, Any]] = None) -> "Prioritizer":
+        """Build from a comma separated list of scorer names such as "pinned,unseen,ports" """
+        scorers = []
+        for name in filter(None, (part.strip() for part in spec.split(","))):
+            if name not in SCORERS:
+                raise ValueError(f"Unknown priority scorer: {name}")
+            scorers.append(SCORERS[name](options or {}))
+        return cls(scorers)
+
+    def prepare(self, items: List[Any]) -> None:
+        for scorer in self.scorers:
+            scorer.prepare(items)
+
+    def key(self, item) -> Tuple[float, ...]:
+        # heapq pops the smallest key first
+        return tuple(-scorer.score(item) for scorer in self.scorers)
+
+
+class _LazyHeap:
+    """
+    Heap of work items supporting reprioritization in O(log n).
+
+    A reprioritized item is pushed again with its new key and its old entry
+    is only marked dead, to be discarded when it reaches the top. len()
+    counts live entries so asyncio.Queue sees the right size.
+    """
+
+    def __init__(self):
+        self._heap: List[list] = []
+        self._entries: Dict[int, list] = {}
+        self._seq = count()
+        self._live = 0
+
+    def __len__(self) -> int:
+        return self._live
+
+    def __iter__(self):
+        return (entry[2] for entry in sorted(self._heap) if entry[3])
+
+    def push(self, key: Tuple, item) -> None:
+        entry = [key, next(self._seq), item, True]
+        if item is not None:
+            previous = self._entries.get(item.index)
+            if previous is not None:
+                previous[3] = False
+                self._live -= 1
+            self._entries[item.index] = entry
+        heapq.heappush(self._heap, entry)
+        self._live += 1
+
+    def pop(self):
+        while self._heap:
+            _, _, item, alive = heapq.heappop(self._heap)
+            if not alive:
+                continue
+            if item is not None:
+                self._entries.pop(item.index, None)
+            self._live -= 1
+            return item
+        raise IndexError("pop from an empty heap")
+
+    def get(self, index: int):
+        entry = self._entries.get(index)
+        return entry[2] if entry is not None else None
+
+
+class PriorityWorkQueue(asyncio.Queue):
+    """
+    asyncio.Queue handing out the highest priority WorkItem first.
+    Items of equal priority keep their insertion order, and the None
+    sentinels used to shut workers down always come last.
+    """
+
+    def __init__(self, prioritizer: Prioritizer):
+        self.prioritizer = prioritizer
+        super().__init__()
+
+    def _init(self, maxsize):
+        self._queue = _LazyHeap()
+
+    def _put(self, item):
+        key = (1,) if item is None else (0,) + self.prioritizer.key(item)
+        self._queue.push(key, item)
+
+    def _get(self):
+        return self._queue.pop()
+
+    def reprioritize(self, index: int) -> bool:
+        """Rescore a queued item after its attributes changed, False if it is not queued"""
+        item = self._queue.get(index)
+        if item is None:
+            return False
+        self._put(item)
+        return True
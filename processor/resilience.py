@@ -0,0 +1,136 @@
+#processor/resilience.py
+import asyncio
+import random
+import time
+from typing import Dict, Optional, Set, Tuple
+from .base import ProcessingResult, classify_error
+from .scheduler import subnet_of
+
+# Failures that say something about the destination rather than the target, counted by the breaker
+TRANSIENT_ERRORS = {"timeout", "reset"}
+# Failures worth another attempt. A timeout usually means a filtered port, retrying it only costs time
+RETRY_ERRORS = {"reset"}
+# Results the engine reports for targets it never probed
+REJECTION_ERRORS = {"circuit_open"}
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed attempt is worth repeating and how long to wait.
+
+    Only failures whose error type is in `retry_on` are retried, by default
+    connection resets: results with that error_type, or socket level
+    exceptions that classify as one. Delays use
+    exponential backoff with full jitter so retries against a struggling
+    host do not arrive in lockstep.
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.25,
+                 max_delay: float = 5.0, retry_on: Optional[Set[str]] = None):
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay = max(0.0, float(base_delay))
+        self.max_delay = max(self.base_delay, float(max_delay))
+        self.retry_on = set(retry_on) if retry_on is not None else set(RETRY_ERRORS)
+
+    def error_type(self, result: Optional[ProcessingResult], error: Optional[BaseException]) -> Optional[str]:
+        """The error type of an attempt, or None if it did not fail at the network level"""
+        if error is not None:
+            if isinstance(error, (OSError, asyncio.TimeoutError)):
+                return classify_error(error)
+            return None
+        if result is not None and not result.success:
+            return result.error_type
+        return None
+
+    def is_transient(self, result: Optional[ProcessingResult], error: Optional[BaseException]) -> bool:
+        """Whether the attempt failed transiently, which is what a circuit breaker counts"""
+        return self.error_type(result, error) in TRANSIENT_ERRORS
+
+    def should_retry(self, attempt: int, result: Optional[ProcessingResult],
+                     error: Optional[BaseException]) -> bool:
+        """attempt is the number of attempts made so far"""
+        return attempt < self.max_attempts and self.error_type(result, error) in self.retry_on
+
+    def delay(self, attempt: int) -> float:
+        """Backoff before the next attempt, attempt being the number made so far"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """
+    Stops probing hosts and subnets that keep failing transiently.
+
+    Consecutive transient failures are counted per host and per /24. Once a
+    count reaches its threshold the circuit opens and targets behind it are
+    rejected straight away for `cooldown` seconds. After that the circuit
+    is half-open: `allow` lets a single trial probe through and keeps
+    rejecting until it is recorded. A success closes the circuit, a failure
+    opens it for another cooldown. A trial that is never recorded (e.g.
+    cancelled) is given up on after a cooldown.
+    """
+
+    def __init__(self, threshold: int = 5, subnet_threshold: Optional[int] = None,
+                 cooldown: float = 30.0):
+        self.threshold = max(1, int(threshold))
+        self.subnet_threshold = max(1, int(subnet_threshold or self.threshold * 4))
+        self.cooldown = max(0.0, float(cooldown))
+        self._failures: Dict[Tuple[str, str], int] = {}
+        self._opened: Dict[Tuple[str, str], float] = {}
+        # Half-open circuits with their trial probe in flight, and when it was let through
+        self._trials: Dict[Tuple[str, str], float] = {}
+
+    def _keys(self, ip: str):
+        return ((("host", str(ip)), self.threshold),
+                (("subnet", subnet_of(ip)), self.subnet_threshold))
+
+    def _rejects(self, key: Tuple[str, str], now: float) -> bool:
+        opened = self._opened.get(key)
+        if opened is None:
+            return False
+        if now - opened < self.cooldown:
+            return True
+        trial = self._trials.get(key)
+        return trial is not None and now - trial < self.cooldown
+
+    def open_key(self, ip: str) -> Optional[str]:
+        """The host or subnet whose circuit rejects ip, None if ip may be probed"""
+        now = time.monotonic()
+        for key, _ in self._keys(ip):
+            if self._rejects(key, now):
+                return key[1]
+        return None
+
+    def allow(self, ip: str) -> bool:
+        """Whether ip may be probed now. Letting a probe through a half-open circuit makes it the trial."""
+        now = time.monotonic()
+        keys = [key for key, _ in self._keys(ip)]
+        if any(self._rejects(key, now) for key in keys):
+            return False
+        for key in keys:
+            if key in self._opened:
+                self._trials[key] = now
+        return True
+
+    def record(self, ip: str, failed: bool) -> None:
+        """Record the outcome of a probe against ip"""
+        now = time.monotonic()
+        for key, threshold in self._keys(ip):
+            trial = self._trials.pop(key, None)
+            if failed:
+                count = self._failures.get(key, 0) + 1
+                self._failures[key] = count
+                if count >= threshold or trial is not None:
+                    self._opened[key] = now
+            else:
+                self._failures.pop(key, None)
+                self._opened.pop(key, None)
+
+    def rejection(self, ip: str) -> ProcessingResult:
+        """Result reported for a target skipped because its circuit is open"""
+        return ProcessingResult(
+            success=False,
+            message=f"Skipped, circuit open for {self.open_key(ip) or ip}",
+            color="grey",
+            error_type="circuit_open"
+        )
@@ -0,0 +1,131 @@
+#processor/runner.py
+import copy
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Union
+from .base import ProcessorBase
+from .engine import ProcessingEngine
+from .executors import ExecutorPool
+from .pipeline import Pipeline, PipelineStage, parse_pipeline
+from .scheduler import PolitenessScheduler
+from .resilience import RetryPolicy, CircuitBreaker
+from .context import RunContext
+from .timeouts import RttTracker
+from .concurrency import AIMDController
+from .priority import Prioritizer
+from .metrics import RunMetrics
+
+
+@dataclass
+class ProcessingRun:
+    """An engine (or pipeline of engines) ready to run, with what it was built from"""
+    engine: Union[ProcessingEngine, Pipeline]
+    stages: List[PipelineStage]
+    context: RunContext
+
+
+def configure_rtt(rtt: RttTracker, options: Mapping[str, Any]) -> RttTracker:
+    """Apply the adaptive timeout run options to an RTT tracker"""
+    rtt.k = max(1, options["timeout_factor"])
+    rtt.floor = options["timeout_floor_ms"] / 1000
+    rtt.ceiling = max(rtt.floor, options["timeout_ceiling_ms"] / 1000)
+    return rtt
+
+
+def create_limiter(options: Mapping[str, Any], maximum: int,
+                   on_change: Optional[Callable[[int, float], None]] = None) -> Optional[AIMDController]:
+    """AIMD limiter for the run, None when adaptive concurrency is off"""
+    if not options["adaptive_concurrency"]:
+        return None
+    return AIMDController(maximum=maximum, on_change=on_change)
+
+
+def build_stages(processor: ProcessorBase, config: Mapping[str, Any], options: Mapping[str, Any],
+                 lookup: Callable[[str], Optional[ProcessorBase]]) -> List[PipelineStage]:
+    """
+    The selected processor as the first stage, followed by the stages of the
+    pipeline option. Every stage gets its own copy of its processor, so its
+    setup never changes the config of another stage or of another run using
+    the same processor.
+    """
+    stages = [PipelineStage(copy.copy(processor), concurrency=options["concurrency"], config=dict(config))]
+    if options["pipeline"].strip():
+        stages += parse_pipeline(options["pipeline"], lookup, concurrency=options["concurrency"])
+    return stages
+
+
+def build_run(
+    processor: ProcessorBase,
+    config: Mapping[str, Any],
+    options: Mapping[str, Any],
+    lookup: Callable[[str], Optional[ProcessorBase]],
+    on_started: Optional[Callable] = None,
+    on_finished: Optional[Callable] = None,
+    on_error: Optional[Callable] = None,
+    on_cancelled: Optional[Callable] = None,
+    on_skipped: Optional[Callable] = None,
+    executors: Optional[ExecutorPool] = None,
+    metrics: Optional[RunMetrics] = None,
+    rtt: Optional[RttTracker] = None,
+    on_concurrency_changed: Optional[Callable[[int, float], None]] = None,
+) -> ProcessingRun:
+    """
+    Build the engine for a run from typed run options, the same way for the
+    GUI and the CLI. Callbacks take the stage index first, `on_finished`
+    also gets a `final` flag, whether or not a pipeline is configured.
+    """
+    deadline = None
+    if options["time_budget_min"] > 0:
+        deadline = time.monotonic() + options["time_budget_min"] * 60
+    breaker = None
+    if options["breaker_threshold"] > 0:
+        breaker = CircuitBreaker(threshold=options["breaker_threshold"])
+    context = RunContext(rtt=rtt)
+    shared = dict(
+        executors=executors,
+        scheduler=PolitenessScheduler(
+            max_per_host=options["max_per_host"],
+            max_per_subnet=options["max_per_subnet"],
+            host_delay=options["host_delay_ms"] / 1000,
+            subnet_rate=options["subnet_rate"],
+        ),
+        retry_policy=RetryPolicy(
+            max_attempts=options["max_attempts"],
+            base_delay=options["retry_delay_ms"] / 1000,
+        ),
+        breaker=breaker,
+        context=context,
+        prioritizer=Prioritizer.from_spec(options["priority"], options) if options["priority"].strip() else None,
+        deadline=deadline,
+        metrics=metrics,
+    )
+
+    stages = build_stages(processor, config, options, lookup)
+    if len(stages) > 1:
+        limiter = create_limiter(options, sum(stage.concurrency for stage in stages), on_concurrency_changed)
+        engine = Pipeline(
+            stages,
+            on_started=on_started,
+            on_finished=on_finished,
+            on_error=on_error,
+            on_cancelled=on_cancelled,
+            on_skipped=on_skipped,
+            limiter=limiter,
+            **shared,
+        )
+    else:
+        limiter = create_limiter(options, options["concurrency"], on_concurrency_changed)
+        stage = lambda callback: (lambda *args: callback(0, *args)) if callback else None
+        engine = ProcessingEngine(
+            stages[0].processor,
+            concurrency=options["concurrency"],
+            on_started=stage(on_started),
+            on_finished=(lambda item, result: on_finished(0, item, result, True)) if on_finished else None,
+            on_error=stage(on_error),
+            on_cancelled=stage(on_cancelled),
+            on_skipped=stage(on_skipped),
+            limiter=limiter,
+            config=config,
+            **shared,
+        )
+    return ProcessingRun(engine=engine, stages=stages, context=context)
@@ -0,0 +1,85 @@
+#processor/runtime.py
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Coroutine, Dict, Optional
+from .executors import ExecutorPool
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+class ProcessingRuntime:
+    """
+    A long-lived event loop running in a background thread.
+
+    Processing runs are submitted to it as tasks instead of each getting a
+    fresh thread and `asyncio.run`. The loop, its executor pools and any
+    resources registered with `get_resource` stay alive between runs, so
+    connection pools, caches and resolvers are reused.
+    """
+
+    def __init__(self, use_uvloop: bool = True, max_threads: int = 64):
+        self.use_uvloop = use_uvloop and uvloop is not None
+        self.executors = ExecutorPool(max_threads=max_threads)
+        self.resources: Dict[str, Any] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        self.start()
+        return self._loop
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the loop thread if it is not already running"""
+        with self._lock:
+            if self.is_running:
+                return
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._run_loop, name="dh-processing-loop", daemon=True)
+            self._thread.start()
+        self._ready.wait()
+
+    def _run_loop(self) -> None:
+        loop = uvloop.new_event_loop() if self.use_uvloop else asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def submit(self, coro: Coroutine) -> Future:
+        """Schedule a coroutine on the runtime loop from any thread"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call_soon(self, callback: Callable, *args) -> None:
+        """Run a plain callback on the runtime loop from any thread"""
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def get_resource(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Return a shared resource, creating it with factory on first use"""
+        if name not in self.resources:
+            self.resources[name] = factory()
+        return self.resources[name]
+
+    def shutdown(self) -> None:
+        """Stop the loop and release the executor pools"""
+        with self._lock:
+            if self._loop is not None and self.is_running:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join(timeout=5)
+            self._loop = None
+            self._thread = None
+        self.executors.shutdown()
@@ -0,0 +1,162 @@
+#processor/sampling.py
+import math
+import random
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+# Attributes of a queued result that a sample can be stratified by
+STRATA_ATTRIBUTES = {
+    "port": "port",
+    "service": "service",
+    "asn": "asn",
+}
+
+
+def wilson_interval(hits: int, n: int, z: float = 1.96) -> Tuple[float, float]:
+    """Wilson score interval for a proportion, (0, 1) when nothing was observed"""
+    if n <= 0:
+        return 0.0, 1.0
+    p = hits / n
+    denominator = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def stratified_sample(items: List[Any], size: int, key: Callable[[Any], Hashable],
+                      rng: Optional[random.Random] = None) -> List[Any]:
+    """
+    Draw a random sample of size items, allocated to strata in proportion to
+    their share of the population (largest remainder), with at least one
+    item from every stratum when size allows.
+    """
+    rng = rng or random.Random()
+    if size >= len(items):
+        return list(items)
+
+    strata: Dict[Hashable, List[Any]] = {}
+    for item in items:
+        strata.setdefault(key(item), []).append(item)
+
+    total = len(items)
+    quotas = {name: size * len(members) / total for name, members in strata.items()}
+    allocation = {name: int(quota) for name, quota in quotas.items()}
+    if size >= len(strata):
+        for name in allocation:
+            allocation[name] = max(1, allocation[name])
+        # Giving small strata their one item may overshoot, take it back from the largest
+        while sum(allocation.values()) > size:
+            largest = max(allocation, key=allocation.get)
+            allocation[largest] -= 1
+    remaining = size - sum(allocation.values())
+    by_remainder = sorted(strata, key=lambda name: quotas[name] - int(quotas[name]), reverse=True)
+    for name in by_remainder:
+        if remaining <= 0:
+            break
+        if allocation[name] < len(strata[name]):
+            allocation[name] += 1
+            remaining -= 1
+
+    sample = []
+    for name, members in strata.items():
+        sample.extend(rng.sample(members, min(allocation[name], len(members))))
+    return sample
+
+
+@dataclass
+class StratumStats:
+    population: int = 0
+    sampled: int = 0
+    completed: int = 0
+    hits: int = 0
+    # Part of completed: items whose processor raised, counted as misses
+    errors: int = 0
+    # Sampled items never probed (circuit open), left out of the rates
+    unprobed: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.completed if self.completed else 0.0
+
+    @property
+    def interval(self) -> Tuple[float, float]:
+        return wilson_interval(self.hits, self.completed)
+
+
+class SampleReport:
+    """
+    Hit rates observed on a stratified sample, extrapolated to the population.
+
+    Each stratum gets a Wilson interval. The overall rate weights strata by
+    their population share, with a normal interval from the stratified
+    variance. Items that raised count as misses; items a circuit breaker
+    rejected were never probed and are left out of the rates.
+    """
+
+    def __init__(self, population: List[Any], sample: List[Any], key: Callable[[Any], Hashable]):
+        self.key = key
+        self.strata: Dict[Hashable, StratumStats] = {}
+        for item in population:
+            self.strata.setdefault(key(item), StratumStats()).population += 1
+        for item in sample:
+            self.strata[key(item)].sampled += 1
+        self.population = len(population)
+
+    def record(self, item: Any, hit: bool) -> None:
+        stats = self.strata.get(self.key(item))
+        if stats is None:
+            return
+        stats.completed += 1
+        stats.hits += bool(hit)
+
+    def record_error(self, item: Any) -> None:
+        """The processor raised for item, a miss"""
+        stats = self.strata.get(self.key(item))
+        if stats is None:
+            return
+        stats.completed += 1
+        stats.errors += 1
+
+    def record_unprobed(self, item: Any) -> None:
+        """item was never probed, e.g. its circuit was open, so it says nothing about the hit rate"""
+        stats = self.strata.get(self.key(item))
+        if stats is not None:
+            stats.unprobed += 1
+
+    def estimate(self, z: float = 1.96) -> Tuple[float, float, float]:
+        """Estimated population hit rate with its interval, over strata with results"""
+        observed = [s for s in self.strata.values() if s.completed]
+        weight_total = sum(s.population for s in observed)
+        if not weight_total:
+            return 0.0, 0.0, 1.0
+        rate = sum(s.population / weight_total * s.hit_rate for s in observed)
+        variance = 0.0
+        for s in observed:
+            weight = s.population / weight_total
+            # Finite population correction, strata are often small
+            fpc = (s.population - s.completed) / (s.population - 1) if s.population > 1 else 0.0
+            variance += weight * weight * s.hit_rate * (1 - s.hit_rate) / s.completed * fpc
+        margin = z * math.sqrt(variance)
+        return rate, max(0.0, rate - margin), min(1.0, rate + margin)
+
+    def lines(self, limit: int = 10) -> List[str]:
+        """Human readable summary, overall first then the largest strata"""
+        rate, low, high = self.estimate()
+        completed = sum(s.completed for s in self.strata.values())
+        lines = [
+            f"Sample: {completed} of {self.population} processed, estimated hit rate "
+            f"{rate:.1%} ({low:.1%} - {high:.1%}), about {round(rate * self.population)} hits overall"
+        ]
+        errors = sum(s.errors for s in self.strata.values())
+        unprobed = sum(s.unprobed for s in self.strata.values())
+        if errors or unprobed:
+            lines.append(f"  {errors} errors counted as misses, {unprobed} not probed (circuit open) left out")
+        largest = sorted(self.strata.items(), key=lambda entry: entry[1].population, reverse=True)
+        for name, stats in largest[:limit]:
+            if not stats.completed:
+                continue
+            low, high = stats.interval
+            lines.append(
+                f"  {name}: {stats.hits}/{stats.completed} hits, {stats.hit_rate:.1%} "
+                f"({low:.1%} - {high:.1%}) of {stats.population}")
+        return lines
@@ -0,0 +1,299 @@
+#processor/scheduler.py
+import asyncio
+import time
+from collections import OrderedDict, defaultdict, deque
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+PRUNE_EVERY = 1000
+
+
+def subnet_of(ip: str) -> str:
+    """Group key for politeness limits: the /24 for IPv4, the address otherwise"""
+    parts = str(ip).split(".")
+    if len(parts) == 4 and all(p.isdigit() for p in parts):
+        return ".".join(parts[:3])
+    return str(ip)
+
+
+class TokenBucket:
+    """Classic token bucket, refilled continuously at `rate` tokens per second"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def is_full(self, now: Optional[float] = None) -> bool:
+        self._refill(now or time.monotonic())
+        return self.tokens >= self.capacity
+
+    def try_take(self, now: Optional[float] = None) -> bool:
+        """Consume a token if one is available, without waiting"""
+        self._refill(now or time.monotonic())
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def wait_time(self, now: Optional[float] = None) -> float:
+        """Seconds until a token is available"""
+        self._refill(now or time.monotonic())
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class PolitenessScheduler:
+    """
+    Keeps a processing run polite towards each destination.
+
+    Limits how many probes are in flight per host and per /24, and spaces
+    probes out with token buckets: one per host for a minimum delay between
+    probes and one per subnet for a maximum probe rate. Targets are also
+    interleaved across subnets so workers rarely wait on the same network.
+    Everything runs on one event loop, so `try_acquire` and `release` need
+    no locking; waiters are woken whenever a slot is released.
+    """
+
+    def __init__(self, max_per_host: int = 2, max_per_subnet: int = 16,
+                 host_delay: float = 0.0, subnet_rate: float = 0.0):
+        self.max_per_host = max(1, int(max_per_host))
+        self.max_per_subnet = max(1, int(max_per_subnet))
+        self.host_delay = max(0.0, float(host_delay))
+        self.subnet_rate = max(0.0, float(subnet_rate))
+        self._host_active: Dict[str, int] = defaultdict(int)
+        self._subnet_active: Dict[str, int] = defaultdict(int)
+        self._host_buckets: Dict[str, TokenBucket] = {}
+        self._subnet_buckets: Dict[str, TokenBucket] = {}
+        self._waiters: List[asyncio.Future] = []
+        self._acquired = 0
+
+    @staticmethod
+    def interleave(items: Iterable[T], ip_of: Callable[[T], str]) -> List[T]:
+        """Reorder items round-robin across subnets, keeping order within each subnet"""
+        groups: "OrderedDict[str, List[T]]" = OrderedDict()
+        for item in items:
+            groups.setdefault(subnet_of(ip_of(item)), []).append(item)
+
+        ordered = []
+        queues = [iter(group) for group in groups.values()]
+        while queues:
+            remaining = []
+            for queue in queues:
+                item = next(queue, None)
+                if item is not None:
+                    ordered.append(item)
+                    remaining.append(queue)
+            queues = remaining
+        return ordered
+
+    def _can_start(self, ip: str, subnet: str) -> bool:
+        return (self._host_active.get(ip, 0) < self.max_per_host
+                and self._subnet_active.get(subnet, 0) < self.max_per_subnet)
+
+    def _buckets(self, ip: str, subnet: str) -> List[TokenBucket]:
+        buckets = []
+        if self.host_delay:
+            bucket = self._host_buckets.get(ip)
+            if bucket is None:
+                bucket = self._host_buckets[ip] = TokenBucket(1.0 / self.host_delay)
+            buckets.append(bucket)
+        if self.subnet_rate:
+            bucket = self._subnet_buckets.get(subnet)
+            if bucket is None:
+                bucket = self._subnet_buckets[subnet] = TokenBucket(
+                    self.subnet_rate, capacity=max(1.0, self.subnet_rate))
+            buckets.append(bucket)
+        return buckets
+
+    def subnet_ready(self, subnet: str) -> bool:
+        """Whether the /24 has room for another probe, so its hosts are worth checking"""
+        if self._subnet_active.get(subnet, 0) >= self.max_per_subnet:
+            return False
+        bucket = self._subnet_buckets.get(subnet) if self.subnet_rate else None
+        return bucket is None or bucket.wait_time() == 0
+
+    def try_acquire(self, ip: str) -> bool:
+        """Take a slot for a probe against ip if one is free right now, without waiting"""
+        subnet = subnet_of(ip)
+        if not self._can_start(ip, subnet):
+            return False
+        now = time.monotonic()
+        buckets = self._buckets(ip, subnet)
+        if any(bucket.wait_time(now) > 0 for bucket in buckets):
+            return False
+        for bucket in buckets:
+            bucket.try_take(now)
+        self._host_active[ip] += 1
+        self._subnet_active[subnet] += 1
+        self._acquired += 1
+        if self._acquired % PRUNE_EVERY == 0:
+            self._prune()
+        return True
+
+    def wait_time(self, ip: str) -> Optional[float]:
+        """
+        Seconds until ip may be probed if only rate limits are in the way,
+        None when it waits for another probe to release its slot.
+        """
+        subnet = subnet_of(ip)
+        if not self._can_start(ip, subnet):
+            return None
+        now = time.monotonic()
+        return max((bucket.wait_time(now) for bucket in self._buckets(ip, subnet)), default=0.0)
+
+    async def wait_for_change(self, timeout: Optional[float] = None) -> None:
+        """Wait until a slot is released or notify is called, or timeout seconds passed"""
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def notify(self) -> None:
+        """Wake everyone in wait_for_change, e.g. because new work arrived"""
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def acquire(self, ip: str) -> None:
+        """Wait for a slot for a probe against ip"""
+        while not self.try_acquire(ip):
+            await self.wait_for_change(self.wait_time(ip))
+
+    def release(self, ip: str) -> None:
+        subnet = subnet_of(ip)
+        for active, key in ((self._host_active, ip), (self._subnet_active, subnet)):
+            active[key] -= 1
+            if active[key] <= 0:
+                del active[key]
+        self.notify()
+
+    @asynccontextmanager
+    async def slot(self, ip: str):
+        """Hold a politeness slot for one probe against ip"""
+        await self.acquire(ip)
+        try:
+            yield
+        finally:
+            self.release(ip)
+
+    def _prune(self) -> None:
+        """Drop buckets of idle destinations that have fully refilled"""
+        now = time.monotonic()
+        for buckets, active in ((self._host_buckets, self._host_active),
+                                (self._subnet_buckets, self._subnet_active)):
+            for key in [k for k, b in buckets.items() if k not in active and b.is_full(now)]:
+                del buckets[key]
+
+
+class PoliteWorkQueue:
+    """
+    Hands out work items whose host may be probed right now.
+
+    Wraps the engine's queue (FIFO or priority). An item whose host or /24
+    is at its politeness limit is parked, per host and in the order it came
+    out of the queue, while workers move on to items on other hosts, so one
+    busy host does not hold every worker up behind it. `get` returns an item
+    with its politeness slot already taken, the caller releases it after the
+    probe. None sentinels are handed out only once everything else is gone.
+    """
+
+    # Items looked past before workers wait for a parked host instead
+    PARK_LIMIT = 1000
+
+    def __init__(self, scheduler: PolitenessScheduler, queue: asyncio.Queue, ip_of: Callable[[Any], str]):
+        self.scheduler = scheduler
+        self._queue = queue
+        self._ip_of = ip_of
+        # subnet -> ip -> parked items, both in the order they were first parked
+        self._parked: Dict[str, Dict[str, Deque[Any]]] = {}
+        self._parked_count = 0
+        self._sentinels = 0
+
+    def qsize(self) -> int:
+        return self._queue.qsize() + self._parked_count + self._sentinels
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def put_nowait(self, item: Any) -> None:
+        self._queue.put_nowait(item)
+        self.scheduler.notify()
+
+    def reprioritize(self, index: int) -> bool:
+        """Rescore a queued item, parked items keep their place"""
+        reprioritize = getattr(self._queue, "reprioritize", None)
+        return bool(reprioritize and reprioritize(index))
+
+    def get_nowait(self) -> Any:
+        """An item whose slot is now taken, or None once drained, raises QueueEmpty when nothing is ready"""
+        item = self._take_parked()
+        if item is not None:
+            return item
+        while self._parked_count < self.PARK_LIMIT and not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is None:
+                self._sentinels += 1
+                continue
+            ip = self._ip_of(item)
+            if not self._is_parked(ip) and self.scheduler.try_acquire(ip):
+                return item
+            self._park(ip, item)
+        if self._sentinels and not self._parked_count and self._queue.empty():
+            self._sentinels -= 1
+            return None
+        raise asyncio.QueueEmpty
+
+    async def get(self) -> Any:
+        while True:
+            try:
+                return self.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+            await self.wait()
+
+    async def wait(self) -> None:
+        """Wait until get_nowait may have something new: an item arrived, a slot was freed or a rate limit passed"""
+        await self.scheduler.wait_for_change(self._wait_time())
+
+    def _is_parked(self, ip: str) -> bool:
+        return ip in self._parked.get(subnet_of(ip), ())
+
+    def _park(self, ip: str, item: Any) -> None:
+        self._parked.setdefault(subnet_of(ip), {}).setdefault(ip, deque()).append(item)
+        self._parked_count += 1
+
+    def _take_parked(self) -> Any:
+        for subnet, hosts in self._parked.items():
+            if not self.scheduler.subnet_ready(subnet):
+                continue
+            for ip, items in hosts.items():
+                if self.scheduler.try_acquire(ip):
+                    item = items.popleft()
+                    if not items:
+                        del hosts[ip]
+                        if not hosts:
+                            del self._parked[subnet]
+                    self._parked_count -= 1
+                    return item
+        return None
+
+    def _wait_time(self) -> Optional[float]:
+        """How long until a rate limited parked host may be probed, None to wait for a release"""
+        if not self._parked or not (self.scheduler.host_delay or self.scheduler.subnet_rate):
+            return None
+        waits = [wait for hosts in self._parked.values() for ip in hosts
+                 if (wait := self.scheduler.wait_time(ip)) is not None]
+        return min(waits, default=None)
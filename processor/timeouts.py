@@ -0,0 +1,62 @@
+#processor/timeouts.py
+import math
+from collections import OrderedDict, deque
+from typing import Deque, Optional
+from .scheduler import subnet_of
+
+
+class RttTracker:
+    """
+    Keeps recent handshake round trip times per host and per /24.
+
+    Timeouts are derived as k times the p95 RTT of the host, falling back to
+    its subnet and then to the caller's default when too few samples exist,
+    and clamped between floor and ceiling. The default is the processor's
+    configured timeout and is never exceeded. Fast networks then stop paying
+    the full user timeout per dead port while slow links still get enough
+    time to answer.
+
+    A tracker lives as long as the runtime or API server, so at most
+    `max_hosts` hosts and `max_subnets` subnets are kept, the ones observed
+    least recently are dropped first.
+    """
+
+    def __init__(self, k: float = 4.0, floor: float = 0.25, ceiling: float = 10.0,
+                 window: int = 64, min_samples: int = 3, max_hosts: int = 65536, max_subnets: int = 16384):
+        self.k = k
+        self.floor = floor
+        self.ceiling = ceiling
+        self.window = window
+        self.min_samples = min_samples
+        self.max_hosts = max_hosts
+        self.max_subnets = max_subnets
+        self._hosts: "OrderedDict[str, Deque[float]]" = OrderedDict()
+        self._subnets: "OrderedDict[str, Deque[float]]" = OrderedDict()
+
+    def observe(self, ip: str, rtt: float) -> None:
+        """Record the RTT of a successful connect to ip"""
+        for samples, key, limit in ((self._hosts, str(ip), self.max_hosts),
+                                    (self._subnets, subnet_of(ip), self.max_subnets)):
+            window = samples.get(key)
+            if window is None:
+                window = samples[key] = deque(maxlen=self.window)
+                while len(samples) > limit:
+                    samples.popitem(last=False)
+            else:
+                samples.move_to_end(key)
+            window.append(rtt)
+
+    def p95(self, ip: str) -> Optional[float]:
+        """The p95 RTT for ip, from its own samples or its subnet's, None if unknown"""
+        for samples, key in ((self._hosts, str(ip)), (self._subnets, subnet_of(ip))):
+            window = samples.get(key)
+            if window is not None and len(window) >= self.min_samples:
+                ordered = sorted(window)
+                return ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+        return None
+
+    def timeout_for(self, ip: str, default: float) -> float:
+        p95 = self.p95(ip)
+        if p95 is None:
+            return default
+        return min(default, self.ceiling, max(self.floor, self.k * p95))
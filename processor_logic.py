@@ -1,13 +1,48 @@
 import flet as ft
 import asyncio
-import threading
-from typing import List, Dict, Any
-from processor.base import ProcessorBase
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple
+from processor.base import ProcessorBase, ProcessingResult, ProcessorConfig
 from processor.manager import ProcessorManager
+from processor.engine import WorkItem, ENGINE_CONFIG_PROPERTIES
+from processor.pipeline import Pipeline
+from processor.runner import build_run, configure_rtt
+from processor.timeouts import RttTracker
+from processor.sampling import STRATA_ATTRIBUTES, SampleReport, stratified_sample
+from processor.metrics import RunMetrics
+from interface.ui_dispatcher import UIDispatcher
+from processor.runtime import ProcessingRuntime
 from data.ResultQueueManager import ResultQueueManager
+from data.outcome_history import OutcomeHistory, config_hash
+from data.blob_store import BlobStore
 from console import DHConsole
 from page_manager import PageManager
 
+@dataclass
+class GuiRun:
+    """
+    Everything one GUI processing run owns. Callbacks and cleanup use the
+    run they belong to, so a stopped run that is still unwinding never
+    touches the run started after it.
+    """
+    ui: UIDispatcher
+    metrics_panel: Any = None
+    engine: Any = None
+    metrics: Optional[RunMetrics] = None
+    sample_report: Optional[SampleReport] = None
+    # (processor name, config hash) of each stage, outcomes are recorded under it
+    history_keys: List[Tuple[str, str]] = field(default_factory=list)
+    skipped: int = 0
+    stop_requested: bool = False
+    # Items shown as processing that have not reached a final state yet
+    open_items: Dict[int, Any] = field(default_factory=dict)
+
+    def stop(self) -> None:
+        self.stop_requested = True
+        if self.engine:
+            self.engine.stop()
+
+
 class ProcessorLogicManager:
     def __init__(self):
         self._page_manager = PageManager()
@@ -15,6 +50,12 @@ class ProcessorLogicManager:
         self.processor_manager = ProcessorManager()
         self.is_processing = False
         self.current_processor = None
+        self.runtime = ProcessingRuntime()
+        # The run the Process / Stop button controls, None when idle
+        self._active: Optional[GuiRun] = None
+        self._config_controls: Dict[str, ft.Control] = {}
+        self._run_option_controls: Dict[str, ft.Control] = {}
+        ResultQueueManager().get_proc_queue().on_pin_changed = self._on_pin_changed
         self.on_processor_changed = self._bind_handler(self._on_processor_changed)
         self.start_processor = self._bind_handler(self._start_processor)
         self.stop_processor = self._bind_handler(self._stop_processor)
@@ -55,9 +96,29 @@ class ProcessorLogicManager:
             )
             
             
+            self._config_controls = {}
             for prop in processor.config_properties:
                 control = self._create_config_control(prop)
                 if control:
+                    self._config_controls[prop.name] = control
+                    container.content_list.controls.append(
+                        ft.Row(
+                            controls=[
+                                ft.Text(f"{prop.name} ({prop.type.__name__})", expand=1),
+                                control
+                            ],
+                            spacing=0
+                        )
+                    )
+
+            container.content_list.controls.append(
+                ft.Row([ft.Text("Run options", size=14, color=ft.Colors.GREY_400)])
+            )
+            self._run_option_controls = {}
+            for prop in ENGINE_CONFIG_PROPERTIES:
+                control = self._create_config_control(prop)
+                if control:
+                    self._run_option_controls[prop.name] = control
                     container.content_list.controls.append(
                         ft.Row(
                             controls=[
@@ -97,84 +158,200 @@ class ProcessorLogicManager:
             self.console.print(f"Error creating config control: {ex}", "error")
             return None
 
-    def _extract_config_values(self, config_container: ft.Container) -> Dict[str, Any]:
-        """Extract configuration values from UI controls"""
-        config = {}
-        try:
-            for row in config_container.content_list.controls[1:]:  
-                if isinstance(row, ft.Row) and len(row.controls) == 2:
-                    name = row.controls[0].value.split(" (")[0]
-                    control = row.controls[1]
-                    
-                    if isinstance(control, ft.Checkbox):
-                        config[name] = control.value
-                    else:
-                        config[name] = control.value
-                        
-            return config
-            
-        except Exception as ex:
-            self.console.print(f"Error extracting config values: {ex}", "error")
-            raise
-    async def _process_items(self, processor: ProcessorBase, items: List[ft.Control],
-                            config: Dict[str, Any]):
-        queue_manager = ResultQueueManager()
-        proc_queue = queue_manager.get_proc_queue()
-        
-        idx = 1
-        for result in proc_queue.results:
-            if not self.is_processing:
-                self.console.print("Processing interrupted by user")
-                break
+    def _extract_config_values(self, processor: ProcessorBase) -> ProcessorConfig:
+        """Typed processor config from the UI controls, raises ConfigValueError"""
+        raw = {name: control.value for name, control in self._config_controls.items()}
+        return processor.build_config(raw)
+
+    def _extract_run_options(self) -> ProcessorConfig:
+        """Typed engine run options, falling back to their defaults"""
+        raw = {name: control.value for name, control in self._run_option_controls.items()}
+        return ProcessorConfig(ENGINE_CONFIG_PROPERTIES, raw)
+
+    def _redraw_items(self, indices):
+        ResultQueueManager().get_proc_queue().refresh_items(indices)
+
+    def _on_item_started(self, run: GuiRun, item: WorkItem):
+        run.open_items[item.index] = item.source
+        run.ui.post(item.index, item.source, processing=True)
+
+    @staticmethod
+    def _stage_name(run: GuiRun, stage_index: int) -> str:
+        if isinstance(run.engine, Pipeline):
+            return run.engine.stages[stage_index].processor.name
+        return run.engine.processor.name
+
+    def _on_item_finished(self, run: GuiRun, item: WorkItem, process_result: ProcessingResult,
+                          stage_index: int = 0, final: bool = True):
+        processor_name = self._stage_name(run, stage_index)
+        if stage_index == 0 and run.sample_report:
+            if process_result.error_type == "circuit_open":
+                run.sample_report.record_unprobed(item)
+            else:
+                run.sample_report.record(item, process_result.success)
+        if stage_index < len(run.history_keys):
+            name, key = run.history_keys[stage_index]
+            OutcomeHistory().record(name, item.target.get("ip"), item.target.get("port"), key, process_result)
+        if final:
+            run.open_items.pop(item.index, None)
+            if run.metrics:
+                run.metrics.item_done()
+        else:
+            run.open_items[item.index] = item.source
+        message = process_result.message
+        if isinstance(run.engine, Pipeline):
+            message = f"[{processor_name}] {process_result.message}"
 
+        run.ui.post(
+            item.index, item.source,
+            processed=process_result.success,
+            failed=not process_result.success,
+            processing=not final,
+            message=message,
+            color=process_result.color,
+            cancelled=False,
+        )
+        # Large responses are compressed and written on the dispatcher thread, never on the engine loop
+        run.ui.call(self._store_details, run, item, process_result.details)
+        run.ui.call(self.console.print, f"[{processor_name}] {process_result.message}")
+
+    def _store_details(self, run: GuiRun, item: WorkItem, details):
+        """Set details with large raw responses moved to the blob store, kept inline if that fails"""
+        if details:
             try:
-                
-                setattr(result, 'processing', True)
-                if proc_queue.attached_list and idx - 1 < len(proc_queue.attached_list.items):
-                    list_item = proc_queue.attached_list.items[idx - 1]
-                    list_item.content.controls[0].trailing = ft.ProgressRing(width=16, height=16)
-                    list_item.update()
-                
-                process_result = await processor.process({
-                    "ip": result.ip,
-                    "port": result.port,
-                    **config
-                })
-                
-                setattr(result, 'processed', process_result.success)
-                setattr(result, 'failed', not process_result.success)
-                setattr(result, 'processing', False)
-                setattr(result, 'message', process_result.message)
-                setattr(result, 'details', process_result.details)
-                setattr(result, 'color', process_result.color)
-                
-                
-                if proc_queue.attached_list and idx - 1 < len(proc_queue.attached_list.items):
-                    list_item = proc_queue.attached_list.items[idx - 1]
-                    
-                    list_item.bgcolor = process_result.color
-                    list_item.content.bgcolor = process_result.color
-                    list_item.content.controls[0].bgcolor = process_result.color 
-                    list_item.content.controls[0].trailing = list_item.checkbox
-                    list_item.update()
-                
-                self.console.print(f"[{processor.name}] {process_result.message}")
-                
-            except Exception as ex:
-                self.console.print(f"Error processing item {idx}: {ex}", "error")
-                setattr(result, 'failed', True)
-                setattr(result, 'processing', False)
-                setattr(result, 'color', 'red')
-                
-                if proc_queue.attached_list and idx - 1 < len(proc_queue.attached_list.items):
-                    list_item = proc_queue.attached_list.items[idx - 1]
-                    list_item.content.controls[0].trailing = list_item.checkbox
-                    list_item.update()
-            
-            finally:
-                proc_queue.sync_list()
-                idx += 1
-    def _start_processor(self, e, processor_name, config_container, proc_list):
+                details = BlobStore().externalize(details)
+            except OSError as ex:
+                print(f"Failed to store response blobs: {ex}")
+        run.ui.post(item.index, item.source, details=details)
+
+    def _on_item_cancelled(self, run: GuiRun, item: WorkItem):
+        run.open_items.pop(item.index, None)
+        run.ui.post(item.index, item.source, processing=False, cancelled=True, message="cancelled", color='grey')
+
+    def _on_item_skipped(self, run: GuiRun, item: WorkItem):
+        run.open_items.pop(item.index, None)
+        run.skipped += 1
+        if run.metrics:
+            run.metrics.item_done()
+        run.ui.post(item.index, item.source, processing=False, message="skipped, time budget spent", color='grey')
+
+    def _on_item_failed(self, run: GuiRun, item: WorkItem, ex: Exception, stage_index: int = 0):
+        run.open_items.pop(item.index, None)
+        if stage_index == 0 and run.sample_report:
+            run.sample_report.record_error(item)
+        if run.metrics:
+            run.metrics.item_done()
+        run.ui.call(self.console.print, f"Error processing item {item.index + 1}: {ex}", "error")
+        run.ui.post(item.index, item.source, failed=True, processing=False, color='red')
+
+    def _cancel_open_items(self, run: GuiRun):
+        """Items a stopped run left between stages or in a retry, shown as cancelled like in-flight ones"""
+        for index, source in run.open_items.items():
+            run.ui.post(index, source, processing=False, cancelled=True, message="cancelled", color='grey')
+        run.open_items.clear()
+
+    def _on_pin_changed(self, index: int):
+        # Pinning mid-run moves the item up in the queue of the running engine
+        run = self._active
+        if run and run.engine:
+            run.engine.reprioritize(index)
+
+    def _on_concurrency_changed(self, run: GuiRun, limit: int, error_rate: float):
+        run.ui.call(self.console.print,
+                    f"Concurrency set to d[<f=ffffff, b>, <{limit}>] ({error_rate * 100:.0f}% congestion errors)")
+
+    async def _refresh_metrics(self, run: GuiRun, metrics: RunMetrics, interval: float = 1.0):
+        """Redraw the metrics panel through the run's dispatcher while the run is active"""
+        while True:
+            run.ui.call(run.metrics_panel.show_metrics, metrics)
+            await asyncio.sleep(interval)
+
+    async def _process_items(self, run: GuiRun, processor: ProcessorBase, config: ProcessorConfig,
+                             options: ProcessorConfig):
+        proc_queue = ResultQueueManager().get_proc_queue()
+        items = [
+            WorkItem(index=i, target={"ip": result.ip, "port": result.port}, source=result)
+            for i, result in enumerate(proc_queue.results)
+        ]
+
+        history = OutcomeHistory()
+        first_key = config_hash(config)
+        if options["skip_recent_hours"] > 0:
+            before = len(items)
+            items = history.exclude_recent(items, processor.name, first_key,
+                                           options["skip_recent_hours"] * 3600)
+            if len(items) < before:
+                self.console.print(
+                    f"Skipping {before - len(items)} targets processed by {processor.name} "
+                    f"in the last {options['skip_recent_hours']}h")
+            if not items:
+                self.console.print("Nothing left to process")
+                return
+        if 0 < options["sample_size"] < len(items):
+            attribute = STRATA_ATTRIBUTES.get(options["sample_by"].strip().lower())
+            if attribute is None:
+                raise ValueError(f"Cannot stratify by '{options['sample_by']}', use one of: {', '.join(STRATA_ATTRIBUTES)}")
+            stratum = lambda item: getattr(item.source, attribute, None)
+            sample = stratified_sample(items, options["sample_size"], stratum)
+            run.sample_report = SampleReport(items, sample, stratum)
+            self.console.print(
+                f"Sampling {len(sample)} of {len(items)} targets across "
+                f"{len(run.sample_report.strata)} {attribute} strata")
+            items = sample
+
+        metrics = run.metrics = RunMetrics(expected=len(items))
+        rtt = None
+        if options["adaptive_timeouts"]:
+            # RTTs stay with the runtime so the next run starts with what this one learned
+            rtt = configure_rtt(self.runtime.get_resource("rtt", RttTracker), options)
+        built = build_run(
+            processor, config, options, self.processor_manager.get_processor,
+            on_started=lambda stage_index, item: self._on_item_started(run, item),
+            on_finished=lambda stage_index, item, result, final: self._on_item_finished(
+                run, item, result, stage_index, final),
+            on_error=lambda stage_index, item, ex: self._on_item_failed(run, item, ex, stage_index),
+            on_cancelled=lambda stage_index, item: self._on_item_cancelled(run, item),
+            on_skipped=lambda stage_index, item: self._on_item_skipped(run, item),
+            executors=self.runtime.executors,
+            metrics=metrics,
+            rtt=rtt,
+            on_concurrency_changed=lambda limit, error_rate: self._on_concurrency_changed(run, limit, error_rate),
+        )
+        engine = run.engine = built.engine
+        context = built.context
+        run.history_keys = [(stage.processor.name, config_hash(stage.config)) for stage in built.stages]
+        if isinstance(engine, Pipeline):
+            self.console.print("Pipeline: " + " > ".join(stage.processor.name for stage in built.stages))
+        if run.stop_requested:
+            # Stop was pressed while the run was being built
+            engine.stop()
+        panel = run.metrics_panel
+        refresher = asyncio.create_task(self._refresh_metrics(run, metrics)) if panel else None
+        run.ui.start()
+        try:
+            await engine.run(items)
+        finally:
+            if engine.stopped:
+                self._cancel_open_items(run)
+            if refresher:
+                refresher.cancel()
+                run.ui.call(panel.show_metrics, metrics, False)
+            # The dispatcher thread applies what is left (blob writes, redraws), wait for it off the loop
+            await asyncio.to_thread(run.ui.stop)
+            history.flush()
+        for line in metrics.summary_lines():
+            self.console.print(line)
+        if engine.stopped:
+            self.console.print("Processing interrupted by user")
+        if context.hits:
+            self.console.print(f"Connection cache: {context.hits} hits, {context.misses} probes")
+        if run.skipped:
+            self.console.print(f"Time budget spent, {run.skipped} items skipped", "warning")
+        if run.sample_report:
+            for line in run.sample_report.lines():
+                self.console.print(line)
+
+    def _start_processor(self, e, processor_name, config_container, proc_list, metrics_panel=None):
         """Start processing items"""
         if self.is_processing:
             self.stop_processor(e)
@@ -197,7 +374,8 @@ class ProcessorLogicManager:
                 return
                     
             try:
-                config = self._extract_config_values(config_container)
+                config = self._extract_config_values(processor)
+                options = self._extract_run_options()
             except Exception as ex:
                 self.console.print(f"Error extracting config values: {ex}", "error")
                 return
@@ -209,32 +387,56 @@ class ProcessorLogicManager:
                     
             
             self.is_processing = True
+            # Engine callbacks only post changes, tiles are redrawn in batches off the engine loop
+            run = self._active = GuiRun(
+                ui=UIDispatcher(self._redraw_items, hz=15),
+                metrics_panel=metrics_panel,
+            )
             e.control.text = "Stop"
             self._page_manager.get_page().update()
 
             
             async def process_async():
                 try:
-                    await self._process_items(processor, proc_list.items, config)
+                    await self._process_items(run, processor, config, options)
                 finally:
-                    self.is_processing = False
-                    e.control.text = "Process"
-                    self._page_manager.get_page().update()
+                    # A stopped run may finish unwinding after a new one started
+                    if run is self._active:
+                        self._active = None
+                        self.is_processing = False
+                        e.control.text = "Process"
+                        self._page_manager.get_page().update()
                     
             
-            self.console.print(f"Starting processing with '{processor.name}' for {len(proc_list.items)} items")
-            threading.Thread(target=lambda: asyncio.run(process_async())).start()
+            self.console.print(
+                f"Starting processing with '{processor.name}' for {len(proc_list.items)} items "
+                f"({'up to ' if options['adaptive_concurrency'] else ''}{options['concurrency']} at once)")
+            future = self.runtime.submit(process_async())
+            future.add_done_callback(self._on_run_done)
                 
         except Exception as ex:
             self.console.print(f"Error starting processor: {ex}", "error")
             self.is_processing = False
+            self._active = None
             e.control.text = "Process"
             self._page_manager.get_page().update()
 
+    def _on_run_done(self, future):
+        """Report runs that died with an unexpected error"""
+        if future.cancelled():
+            return
+        ex = future.exception()
+        if ex:
+            self.console.print(f"Processing run failed: {ex}", "error")
+
     def _stop_processor(self, e):
         """Stop current processing"""
         try:
             self.is_processing = False
+            run, self._active = self._active, None
+            if run:
+                # Cancels in-flight probes, they report back as cancelled
+                run.stop()
             e.control.text = "Process"
             self._page_manager.get_page().update()
             self.console.print("Processing stopped by user")
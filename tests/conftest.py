@@ -0,0 +1,32 @@
+# tests/conftest.py
+import sys
+from pathlib import Path
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from console import DHConsole
+
+# No Flet page exists under pytest, print to stderr like the CLI does
+DHConsole.headless = True
+
+# Singletons that open files relative to the working directory
+SINGLETONS = (
+    "data.db_manager.DBManager",
+    "data.outcome_history.OutcomeHistory",
+    "data.search_index.SearchIndex",
+    "data.blob_store.BlobStore",
+    "data.ResultQueueManager.ResultQueueManager",
+)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run in an empty directory with fresh singletons, so tests never touch the real data files"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    for name in SINGLETONS:
+        monkeypatch.setattr(f"{name}._instance", None)
+    return tmp_path
@@ -0,0 +1,60 @@
+# tests/helpers.py
+import asyncio
+from typing import Callable, List, Optional
+from processor.base import ProcessorBase, ProcessingResult, ConfigProperty
+from processor.engine import WorkItem
+
+
+class FakeProcessor(ProcessorBase):
+    """Processor driven by a callback, records what it was asked to do"""
+
+    def __init__(self, handler: Optional[Callable] = None, name: str = "Fake", delay: float = 0.0,
+                 properties: Optional[List[ConfigProperty]] = None):
+        self._name = name
+        self._properties = properties or []
+        super().__init__()
+        self.handler = handler
+        self.delay = delay
+        self.calls: List[dict] = []
+        self.active = 0
+        self.peak = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def description(self) -> str:
+        return "Test processor"
+
+    @property
+    def config_properties(self) -> List[ConfigProperty]:
+        return self._properties
+
+    async def process(self, target: dict) -> ProcessingResult:
+        self.calls.append(target)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            if self.handler:
+                result = self.handler(target)
+                if asyncio.iscoroutine(result):
+                    result = await result
+                return result
+            return ProcessingResult(success=True, message="ok", color="green")
+        finally:
+            self.active -= 1
+
+
+def make_items(count: int, ip: Optional[str] = None, port: int = 80) -> List[WorkItem]:
+    """count items on distinct hosts, or all on ip"""
+    return [
+        WorkItem(index=i, target={"ip": ip or f"10.0.{i // 250}.{i % 250 + 1}", "port": port})
+        for i in range(count)
+    ]
+
+
+def run(coro):
+    return asyncio.run(coro)
@@ -0,0 +1,92 @@
+# tests/test_batch.py
+import threading
+from typing import List
+from processor.base import ProcessingResult
+from processor.engine import ProcessingEngine
+from processor.executors import run_blocking
+from processor.manager import ProcessorManager
+from tests.helpers import FakeProcessor, make_items, run
+
+
+class BatchProcessor(FakeProcessor):
+    """Answers whole batches, remembering their sizes"""
+
+    def __init__(self, batch_size: int = 4, drop: bool = False):
+        super().__init__(name="Batch")
+        self._batch_size = batch_size
+        self.drop = drop
+        self.batches: List[int] = []
+
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size
+
+    async def process_batch(self, targets):
+        self.batches.append(len(targets))
+        for target in targets[1:] if self.drop else targets:
+            yield target, ProcessingResult(success=True, message=target["ip"], color="green")
+
+
+def test_supports_batch_only_when_overridden():
+    assert not FakeProcessor().supports_batch
+    assert BatchProcessor().supports_batch
+
+
+def test_default_process_batch_calls_process():
+    processor = FakeProcessor()
+
+    async def collect():
+        return [target async for target, _ in processor.process_batch([{"ip": "a"}, {"ip": "b"}])]
+
+    assert run(collect()) == [{"ip": "a"}, {"ip": "b"}]
+    assert processor.calls == [{"ip": "a"}, {"ip": "b"}]
+
+
+def test_engine_hands_out_batches():
+    processor = BatchProcessor(batch_size=4)
+    finished = []
+    engine = ProcessingEngine(processor, concurrency=8,
+                              on_finished=lambda item, result: finished.append(result.message))
+    items = make_items(10)
+    run(engine.run(items))
+    assert sorted(finished) == sorted(item.target["ip"] for item in items)
+    assert sum(processor.batches) == 10 and max(processor.batches) <= 4
+
+
+def test_missing_batch_result_is_an_error():
+    errors = []
+    engine = ProcessingEngine(BatchProcessor(batch_size=4, drop=True), concurrency=4,
+                              on_error=lambda item, ex: errors.append(item.index))
+    run(engine.run(make_items(4)))
+    assert errors == [0]
+
+
+def test_run_blocking_uses_the_engine_thread_pool():
+    seen = []
+
+    async def handler(target):
+        seen.append(await run_blocking(lambda: threading.current_thread().name))
+        return ProcessingResult(success=True, message="ok")
+
+    run(ProcessingEngine(FakeProcessor(handler), concurrency=2).run(make_items(2)))
+    assert seen and all(name.startswith("dh-proc") for name in seen)
+
+
+def test_dns_resolver_batch_resolves_each_hostname_once_in_the_engine_pool(monkeypatch):
+    resolver = ProcessorManager().get_processor("DNS Resolver")
+    lookups = []
+
+    def gethostbyname(hostname):
+        lookups.append((hostname, threading.current_thread().name))
+        return "127.0.0.1"
+
+    monkeypatch.setattr("socket.gethostbyname", gethostbyname)
+    results = []
+    engine = ProcessingEngine(resolver, concurrency=64,
+                              on_finished=lambda item, result: results.append(result))
+    items = make_items(4, ip="example.test")
+    items[3].target["ip"] = "other.test"
+    run(engine.run(items))
+    assert len(results) == 4 and all(result.success for result in results)
+    assert sorted(hostname for hostname, _ in lookups) == ["example.test", "other.test"]
+    assert all(thread.startswith("dh-proc") for _, thread in lookups)
@@ -0,0 +1,33 @@
+# tests/test_blob_store.py
+import pytest
+from data.blob_store import BLOB_KEY, PREVIEW_LENGTH
+
+
+@pytest.fixture
+def store(workdir):
+    from data.blob_store import BlobStore
+    return BlobStore()
+
+
+def test_identical_payloads_share_one_blob(store):
+    body = "<html>" + "x" * 5000
+    first = store.externalize({"response": body, "banners": ["short", body]})
+    second = store.externalize({"response": body})
+    reference = first["response"]
+    assert reference == {BLOB_KEY: reference[BLOB_KEY], "size": len(body), "preview": body[:PREVIEW_LENGTH]}
+    assert first["banners"] == ["short", reference] and second["response"] == reference
+    assert len([path for path in store.root.rglob("*") if path.is_file()]) == 1
+    # Stored compressed
+    assert store._path(reference[BLOB_KEY]).stat().st_size < len(body)
+
+
+def test_resolve_round_trips(store):
+    details = {"response": "y" * 3000, "status": 200}
+    assert store.resolve(store.externalize(details)) == details
+
+
+def test_missing_blob_falls_back_to_preview(store):
+    reference = store.externalize("z" * 3000)
+    store._path(reference[BLOB_KEY]).unlink()
+    assert store.get(reference[BLOB_KEY]) is None
+    assert store.resolve({"response": reference}) == {"response": "z" * PREVIEW_LENGTH}
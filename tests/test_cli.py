@@ -0,0 +1,119 @@
+# tests/test_cli.py
+import json
+import pytest
+from processor.base import ConfigProperty, ProcessingResult
+from processor.manager import ProcessorManager
+from tests.helpers import FakeProcessor
+
+ROWS = [
+    {"ip": "10.0.0.1", "port": 80, "product": "nginx"},
+    {"ip": "10.0.0.2", "port": 22, "product": "OpenSSH"},
+    {"ip": "10.0.0.3", "port": 443, "product": "Apache"},
+]
+
+
+def handler(target):
+    if target["port"] == 443:
+        raise ValueError("broken")
+    success = target["port"] == 80
+    return ProcessingResult(success=success, message=f"probed {target['ip']}",
+                            color="green" if success else "red", error_type=None if success else "refused")
+
+
+@pytest.fixture
+def cli(workdir, monkeypatch):
+    import doghouse
+    processor = FakeProcessor(handler, name="Echo", properties=[ConfigProperty("timeout", float, 2.0, "Timeout")])
+    monkeypatch.setitem(ProcessorManager().processors, "Echo", processor)
+    targets = workdir / "targets.ndjson"
+    targets.write_text("\n".join(json.dumps(row) for row in ROWS) + "\n\n", encoding="utf-8")
+
+    def main(*argv):
+        output = workdir / "out.ndjson"
+        code = doghouse.main([*argv, "-o", str(output)])
+        rows = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()] if output.exists() else []
+        output.unlink(missing_ok=True)
+        return code, rows
+
+    return main, str(targets), processor
+
+
+def test_process_writes_one_row_per_target(cli):
+    main, targets, processor = cli
+    code, rows = main("process", "Echo", "-i", targets, "-c", "timeout=0.5", "-O", "concurrency=2",
+                      "-O", "adaptive_timeouts=false")
+    assert code == 0
+    by_ip = {row["ip"]: row for row in rows}
+    assert by_ip["10.0.0.1"] == {**ROWS[0], "stage": 0, "processor": "Echo", "success": True, "color": "green",
+                                 "message": "probed 10.0.0.1", "error_type": None, "details": None}
+    assert (by_ip["10.0.0.2"]["success"], by_ip["10.0.0.2"]["error_type"]) == (False, "refused")
+    assert (by_ip["10.0.0.3"]["error_type"], by_ip["10.0.0.3"]["message"]) == ("ValueError", "broken")
+    # The registered processor keeps its own config, the run used a copy
+    assert processor.config.timeout == 2.0
+
+
+def test_pipeline_writes_every_stage_on_request(cli):
+    main, targets, _ = cli
+    code, rows = main("pipeline", "Echo*2 > Echo?success", "-i", targets, "--all-stages")
+    assert code == 0
+    assert sorted((row["ip"], row["stage"]) for row in rows) == [
+        ("10.0.0.1", 0), ("10.0.0.1", 1), ("10.0.0.2", 0), ("10.0.0.3", 0)]
+    code, rows = main("pipeline", "Echo > Echo?success", "-i", targets)
+    assert sorted((row["ip"], row["stage"]) for row in rows) == [("10.0.0.1", 1), ("10.0.0.2", 0), ("10.0.0.3", 0)]
+
+
+def test_recently_processed_targets_are_skipped(cli):
+    main, targets, processor = cli
+    assert main("process", "Echo", "-i", targets)[0] == 0
+    code, rows = main("process", "Echo", "-i", targets, "-O", "skip_recent_hours=1")
+    # Targets that raised have no outcome on record and are tried again
+    assert code == 0 and [row["ip"] for row in rows] == ["10.0.0.3"]
+    assert len(processor.calls) == 4
+    # Another config is another history key
+    assert len(main("process", "Echo", "-i", targets, "-c", "timeout=9", "-O", "skip_recent_hours=1")[1]) == 3
+
+
+@pytest.mark.parametrize("argv", [
+    ("process", "Missing"),
+    ("process", "Echo", "-c", "timeout=soon"),
+    ("process", "Echo", "-c", "timeout"),
+    ("pipeline", "Echo > Missing"),
+])
+def test_bad_arguments_exit_with_2(cli, argv):
+    main, targets, _ = cli
+    assert main(*argv, "-i", targets)[0] == 2
+
+
+def test_bad_input_exits_with_2(cli, workdir):
+    main, _, _ = cli
+    bad = workdir / "bad.ndjson"
+    bad.write_text('{"ip": "10.0.0.1"}\n', encoding="utf-8")
+    assert main("process", "Echo", "-i", str(bad)) == (2, [])
+
+
+def test_dedupe_drops_targets_seen_before(cli):
+    main, targets, _ = cli
+    assert main("dedupe", "-i", targets, "--check-only") == (0, ROWS)
+    assert main("dedupe", "-i", targets) == (0, ROWS)
+    assert main("dedupe", "-i", targets) == (0, [])
+
+
+def test_circuit_rejections_are_not_skipped_later(cli, workdir):
+    main, _, processor = cli
+    processor.handler = lambda target: ProcessingResult(success=False, message="slow", error_type="timeout")
+    targets = workdir / "one_host.ndjson"
+    targets.write_text("\n".join(json.dumps({"ip": "10.0.0.1", "port": port}) for port in range(1, 7)),
+                       encoding="utf-8")
+    code, rows = main("process", "Echo", "-i", str(targets), "-O", "concurrency=1", "-O", "breaker_threshold=2")
+    assert code == 0 and [row["error_type"] for row in rows].count("circuit_open") == 4
+    code, rows = main("process", "Echo", "-i", str(targets), "-O", "skip_recent_hours=1",
+                      "-O", "breaker_threshold=0")
+    # Only the two probed targets are skipped, the rejected ones are scanned now
+    assert sorted(row["port"] for row in rows) == [3, 4, 5, 6]
+
+
+def test_condition_on_the_first_stage_is_refused(cli, capsys):
+    main, targets, processor = cli
+    assert main("pipeline", "Echo?success > Echo", "-i", targets) == (2, [])
+    assert "the first stage gets every target" in capsys.readouterr().err
+    assert processor.calls == []
@@ -0,0 +1,114 @@
+# tests/test_concurrency.py
+import asyncio
+import errno
+from processor.base import ProcessingResult, classify_error
+from processor.concurrency import AIMDController, CONGESTION_ERRORS
+from processor.engine import ProcessingEngine, ENGINE_CONFIG_PROPERTIES
+from processor.base import ProcessorConfig
+from processor.pipeline import Pipeline, PipelineStage
+from processor.runner import create_limiter
+from processor.scheduler import PolitenessScheduler
+from tests.helpers import FakeProcessor, make_items, run
+
+
+def complete(limiter, count, congested=False):
+    for _ in range(count):
+        limiter.active += 1
+        limiter.release(congested)
+
+
+def test_timeouts_and_unreachable_hosts_are_not_congestion():
+    assert {"reset", "resource"} <= CONGESTION_ERRORS
+    assert not {"timeout", "oserror", "refused"} & CONGESTION_ERRORS
+    assert classify_error(OSError(errno.EHOSTUNREACH, "No route to host")) not in CONGESTION_ERRORS
+    assert classify_error(OSError(errno.ENETUNREACH, "Network is unreachable")) not in CONGESTION_ERRORS
+    assert classify_error(OSError(errno.EMFILE, "Too many open files")) in CONGESTION_ERRORS
+
+
+def test_starts_at_the_configured_concurrency():
+    assert AIMDController(maximum=50).limit == 50
+    assert AIMDController(maximum=50, initial=10).limit == 10
+    options = ProcessorConfig(ENGINE_CONFIG_PROPERTIES, {"concurrency": 80})
+    assert create_limiter(options, options["concurrency"]).limit == 80
+    assert create_limiter(ProcessorConfig(ENGINE_CONFIG_PROPERTIES, {"adaptive_concurrency": False}), 80) is None
+
+
+def test_backs_off_then_grows_additively():
+    changes = []
+    limiter = AIMDController(maximum=40, min_window=10, on_change=lambda limit, rate: changes.append(limit))
+    complete(limiter, 40, congested=True)
+    assert limiter.limit == 20
+    complete(limiter, 20)
+    assert limiter.limit == 21
+    assert changes == [20, 21]
+
+
+def test_slow_start_doubles():
+    limiter = AIMDController(maximum=100, initial=5, min_window=5)
+    complete(limiter, 5)
+    assert limiter.limit == 10
+
+
+def test_cancel_is_not_counted():
+    limiter = AIMDController(maximum=10, min_window=1)
+    limiter.active = 1
+    limiter.cancel()
+    assert limiter.active == 0 and limiter.limit == 10 and limiter._completed == 0
+
+
+def test_acquire_waits_for_a_free_slot():
+    limiter = AIMDController(maximum=1)
+
+    async def scenario():
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        limiter.cancel()
+        await asyncio.wait_for(waiter, 1)
+
+    run(scenario())
+
+
+class CheckedLimiter(AIMDController):
+    """Records how many politeness slots were held whenever a worker waits for this limiter"""
+
+    def __init__(self, scheduler, **kwargs):
+        super().__init__(**kwargs)
+        self.scheduler = scheduler
+        self.excess = []
+
+    async def acquire(self):
+        held = sum(self.scheduler._host_active.values())
+        # Slots held by probes in flight are fine, any more belong to a worker waiting here
+        self.excess.append(held - self.active)
+        await super().acquire()
+
+
+def test_workers_never_wait_for_the_limiter_holding_a_politeness_slot():
+    scheduler = PolitenessScheduler(max_per_host=1)
+    limiter = CheckedLimiter(scheduler, maximum=2)
+    processor = FakeProcessor(lambda target: ProcessingResult(success=False, message="reset", error_type="reset"),
+                              delay=0.01)
+    items = make_items(6) + make_items(6, ip="10.0.9.1")
+    for i, item in enumerate(items):
+        item.index = i
+    run(ProcessingEngine(processor, concurrency=6, scheduler=scheduler, limiter=limiter).run(items))
+    assert len(processor.calls) == 12
+    assert max(limiter.excess) <= 0
+    assert processor.peak <= 2
+
+
+def test_shared_limiter_does_not_starve_a_pipeline():
+    scheduler = PolitenessScheduler(max_per_host=1)
+    limiter = AIMDController(maximum=2)
+    finished = []
+    pipeline = Pipeline(
+        [PipelineStage(FakeProcessor(delay=0.01), concurrency=4),
+         PipelineStage(FakeProcessor(delay=0.01, name="Second"), concurrency=4)],
+        scheduler=scheduler, limiter=limiter,
+        on_finished=lambda stage, item, result, final: final and finished.append(item.index),
+    )
+    run(asyncio.wait_for(pipeline.run(make_items(8)), 5))
+    assert sorted(finished) == list(range(8))
+    assert limiter.active == 0
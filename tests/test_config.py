@@ -0,0 +1,64 @@
+# tests/test_config.py
+import copy
+import pytest
+from processor.base import ConfigProperty, ConfigValueError, ProcessorConfig, convert_value
+from tests.helpers import FakeProcessor, run
+
+PROPERTIES = [
+    ConfigProperty("timeout", float, 2.0, "Timeout"),
+    ConfigProperty("verbose", bool, False, "Verbose"),
+    ConfigProperty("ports", list, [], "Ports"),
+    ConfigProperty("name", str, "", "Name"),
+]
+
+
+@pytest.mark.parametrize("value, target_type, expected", [
+    ("1.5", float, 1.5), ("7", int, 7), ("yes", bool, True), ("off", bool, False), (True, bool, True),
+    ("80, 443", list, ["80", "443"]), ([1], list, [1]),
+])
+def test_convert_value(value, target_type, expected):
+    assert convert_value(value, target_type) == expected
+
+
+def test_values_are_typed_once_and_read_as_attributes():
+    config = ProcessorConfig(PROPERTIES, {"timeout": "0.5", "verbose": "true", "extra": "kept"})
+    assert (config.timeout, config.verbose, config.ports, config.name) == (0.5, True, [], "")
+    assert config["extra"] == "kept" and len(config) == 5
+    with pytest.raises(AttributeError):
+        config.missing
+
+
+def test_empty_values_fall_back_to_defaults():
+    config = ProcessorConfig(PROPERTIES, {"timeout": "", "name": ""})
+    assert config.timeout == 2.0 and config.name == ""
+
+
+def test_every_error_is_reported_together():
+    properties = PROPERTIES + [ConfigProperty("key", str, None, "Key", required=True)]
+    with pytest.raises(ConfigValueError) as raised:
+        ProcessorConfig(properties, {"timeout": "soon"})
+    assert str(raised.value).splitlines() == [
+        "Error in timeout: Cannot convert 'soon' to float: could not convert string to float: 'soon'",
+        "key is required"]
+
+
+def test_config_survives_copy():
+    config = ProcessorConfig(PROPERTIES, {"timeout": 3})
+    assert copy.copy(config).timeout == 3.0
+
+
+def test_processor_builds_config_at_init_and_setup():
+    processor = FakeProcessor(properties=PROPERTIES)
+    assert processor.config.timeout == 2.0
+    run(processor.setup({"timeout": "4"}))
+    assert processor.config.timeout == 4.0
+    built = processor.build_config({"verbose": "1"})
+    run(processor.setup(built))
+    assert processor.config is built
+    assert processor.get_config_values("timeout", {"timeout": 9}) == 9
+
+
+def test_config_defaults_are_a_copy():
+    processor = FakeProcessor(properties=PROPERTIES)
+    processor.get_config_defaults()["timeout"] = 99
+    assert processor.get_config_defaults()["timeout"] == 2.0
@@ -0,0 +1,118 @@
+# tests/test_context.py
+import asyncio
+import pytest
+from processor.base import ConnectOutcome, ProcessingResult, exchange, probe_port
+from processor.context import RunContext, current_run_context, run_context
+from processor.engine import ProcessingEngine
+from processor.resilience import RetryPolicy
+from tests.helpers import FakeProcessor, make_items, run
+
+
+def test_run_context_is_current_inside_the_block():
+    context = RunContext()
+    assert current_run_context() is None
+    with run_context(context):
+        assert current_run_context() is context
+    assert current_run_context() is None
+
+
+def test_timeouts_only_answer_shorter_probes():
+    context = RunContext()
+    context.record_connect("10.0.0.1", 80, ConnectOutcome(status="timeout", timeout=2))
+    assert context.known_connect("10.0.0.1", 80, 1).status == "timeout"
+    assert context.known_connect("10.0.0.1", 80, 5) is None
+
+
+def test_open_ports_stay_open():
+    context = RunContext()
+    context.record_connect("10.0.0.1", 80, ConnectOutcome(status="open", rtt=0.01))
+    context.record_connect("10.0.0.1", 80, ConnectOutcome(status="timeout", timeout=1))
+    assert context.known_connect("10.0.0.1", 80, 1).is_open
+
+
+def test_forget_failure_keeps_open_outcomes():
+    context = RunContext()
+    context.record_connect("10.0.0.1", 80, ConnectOutcome(status="open", rtt=0.01))
+    context.record_connect("10.0.0.2", 80, ConnectOutcome(status="reset"))
+    context.forget_failure("10.0.0.1", 80)
+    context.forget_failure("10.0.0.2", "80")
+    assert context.known_connect("10.0.0.1", 80, 1).is_open
+    assert context.known_connect("10.0.0.2", 80, 1) is None
+
+
+def test_concurrent_callers_share_one_probe():
+    context = RunContext()
+    probes = []
+
+    async def probe():
+        probes.append(1)
+        await asyncio.sleep(0.01)
+        return ConnectOutcome(status="open", rtt=0.01)
+
+    async def scenario():
+        return await asyncio.gather(*(context.connect("10.0.0.1", 80, 1, probe) for _ in range(5)))
+
+    outcomes = run(scenario())
+    assert len(probes) == 1 and all(outcome.is_open for outcome in outcomes)
+    assert context.misses == 1 and context.hits == 4
+
+
+class _Writer:
+    def close(self):
+        pass
+
+    async def wait_closed(self):
+        pass
+
+
+class _Reader:
+    async def read(self, size):
+        return b"SSH-2.0-test"
+
+
+@pytest.fixture
+def flaky_network(monkeypatch):
+    """open_connection resets the first handshake to each target and accepts the next ones"""
+    connects = []
+
+    async def open_connection(host, port, timeout):
+        connects.append((host, port))
+        if connects.count((host, port)) == 1:
+            raise ConnectionResetError("reset by peer")
+        return _Reader(), _Writer()
+
+    monkeypatch.setattr("processor.base.open_connection", open_connection)
+    return connects
+
+
+def _retry_engine(handler, context):
+    results = []
+    engine = ProcessingEngine(FakeProcessor(handler), context=context,
+                              retry_policy=RetryPolicy(max_attempts=2, base_delay=0),
+                              on_finished=lambda item, result: results.append(result))
+    return engine, results
+
+
+def test_retry_really_reconnects_after_a_cached_failure(flaky_network):
+    async def handler(target):
+        outcome = await probe_port(target["ip"], target["port"], 1)
+        if outcome.is_open:
+            return ProcessingResult(success=True, message="open", color="green")
+        return ProcessingResult(success=False, message=outcome.status, error_type=outcome.status)
+
+    context = RunContext()
+    engine, results = _retry_engine(handler, context)
+    run(engine.run(make_items(1)))
+    assert len(flaky_network) == 2
+    assert results[0].success and context.connects[("10.0.0.1", 80)].is_open
+
+
+def test_exchange_retry_reconnects(flaky_network):
+    async def handler(target):
+        banner = await exchange(target["ip"], target["port"], None, 1)
+        return ProcessingResult(success=True, message=banner, color="green")
+
+    engine, results = _retry_engine(handler, RunContext())
+    run(engine.run(make_items(1)))
+    assert len(flaky_network) == 2
+    assert results[0].message == "SSH-2.0-test"
@@ -0,0 +1,119 @@
+# tests/test_control_api.py
+import asyncio
+import time
+import pytest
+from fastapi import WebSocketDisconnect
+from fastapi.testclient import TestClient
+from processor.base import ConfigProperty, ProcessingResult
+from processor.manager import ProcessorManager
+from tests.helpers import FakeProcessor
+
+TARGETS = [{"ip": "10.0.0.1", "port": 80, "product": "nginx"}, {"ip": "10.0.0.2", "port": 22}]
+
+
+def handler(target):
+    if target["port"] == 22:
+        raise ValueError("broken")
+    return ProcessingResult(success=True, message="open", color="green")
+
+
+@pytest.fixture
+def api(workdir, monkeypatch):
+    import control_api
+    # TestClient connects from "testclient", treat it like a local address
+    monkeypatch.setattr(control_api, "LOCAL_HOSTS", control_api.LOCAL_HOSTS | {"testclient"})
+    processor = FakeProcessor(handler, name="Echo", properties=[ConfigProperty("timeout", float, 2.0, "Timeout")])
+    slow = FakeProcessor(lambda target: asyncio.sleep(3600), name="Slow")
+    monkeypatch.setitem(ProcessorManager().processors, "Echo", processor)
+    monkeypatch.setitem(ProcessorManager().processors, "Slow", slow)
+    with TestClient(control_api.create_app(), base_url="http://127.0.0.1") as client:
+        yield client, processor
+
+
+def wait_until_idle(client):
+    deadline = time.monotonic() + 5
+    while client.get("/runs/current").json()["running"]:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    return client.get("/runs/current").json()
+
+
+@pytest.mark.parametrize("client, headers, local", [
+    ("127.0.0.1", {"host": "127.0.0.1:8765"}, True),
+    ("::1", {"host": "[::1]:8765", "origin": "http://localhost:3000"}, True),
+    ("10.0.0.5", {"host": "127.0.0.1:8765"}, False),
+    ("127.0.0.1", {"host": "dns-rebind.example:8765"}, False),
+    ("127.0.0.1", {"host": "127.0.0.1:8765", "origin": "https://evil.example"}, False),
+    (None, {"host": "127.0.0.1"}, False),
+])
+def test_local_request(client, headers, local):
+    from control_api import _local_request
+    assert _local_request(client, headers) is local
+
+
+def test_remote_pages_are_refused(api):
+    client, _ = api
+    assert client.get("/options", headers={"origin": "https://evil.example"}).status_code == 403
+    assert client.get("/options", headers={"host": "evil.example"}).status_code == 403
+    assert any(option["name"] == "concurrency" for option in client.get("/options").json())
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect("ws://127.0.0.1/ws/results", headers={"origin": "https://evil.example"}):
+            pass
+    assert closed.value.code == 1008
+
+
+def test_processors_are_listed_with_their_config(api):
+    client, _ = api
+    echo = next(entry for entry in client.get("/processors").json() if entry["name"] == "Echo")
+    assert echo["config"] == [{"name": "timeout", "type": "float", "default": 2.0, "description": "Timeout"}]
+
+
+def test_targets_queue(api):
+    client, _ = api
+    assert client.post("/targets", json=TARGETS).json() == {"added": 2, "queued": 2}
+    assert client.get("/targets").json() == TARGETS
+    assert client.post("/targets", json=[{"ip": "10.0.0.3"}]).status_code == 422
+    assert client.delete("/targets").json() == {"removed": 2}
+
+
+def test_run_streams_results_to_subscribers(api):
+    client, processor = api
+    client.post("/targets", json=TARGETS)
+    with client.websocket_connect("ws://127.0.0.1/ws/results") as websocket:
+        response = client.post("/runs", json={"processor": "Echo", "config": {"timeout": "0.5"},
+                                              "options": {"adaptive_timeouts": False}})
+        assert response.json() == {"run": 1}
+        events = [websocket.receive_json() for _ in range(4)]
+    assert events[0] == {"type": "run_started", "run": 1, "stages": ["Echo"], "targets": 2}
+    assert events[-1]["type"] == "run_finished" and events[-1]["stopped"] is False
+    by_type = {event["type"]: event for event in events[1:3]}
+    assert by_type["result"]["target"] == TARGETS[0] and by_type["result"]["success"]
+    assert by_type["error"]["error_type"] == "ValueError"
+    status = wait_until_idle(client)
+    assert (status["done"], status["queued"], status["colors"]) == (2, 0, {"green": 1, "red": 1})
+    assert processor.config.timeout == 2.0
+
+
+def test_stop_and_conflicts(api):
+    client, _ = api
+    assert client.delete("/runs/current").status_code == 409
+    assert client.post("/runs", json={"processor": "Echo"}).status_code == 400
+    client.post("/targets", json=TARGETS)
+    assert client.post("/runs", json={"processor": "Missing"}).status_code == 404
+    assert client.post("/runs", json={"processor": "Echo", "config": {"timeout": "soon"}}).status_code == 400
+    assert client.post("/runs", json={"processor": "Slow", "consume": False}).json() == {"run": 1}
+    assert client.post("/runs", json={"processor": "Slow"}).status_code == 409
+    assert client.delete("/runs/current").json() == {"stopped": 1}
+    status = wait_until_idle(client)
+    assert status["queued"] == 2 and status["done"] == 0
+
+
+def test_skip_recent_targets(api):
+    client, processor = api
+    client.post("/targets", json=TARGETS)
+    client.post("/runs", json={"processor": "Echo", "consume": False})
+    wait_until_idle(client)
+    client.post("/runs", json={"processor": "Echo", "options": {"skip_recent_hours": 1}})
+    status = wait_until_idle(client)
+    # Only the target that raised has no outcome on record
+    assert status["expected"] == 1 and len(processor.calls) == 3
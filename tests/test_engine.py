@@ -0,0 +1,68 @@
+import asyncio
+import pytest
+from processor.base import ProcessingResult
+from processor.engine import ProcessingEngine, WorkItem
+from tests.helpers import FakeProcessor, make_items, run
+
+
+def test_processes_every_item_with_bounded_parallelism():
+    processor = FakeProcessor(delay=0.01)
+    finished = []
+    engine = ProcessingEngine(processor, concurrency=5,
+                              on_finished=lambda item, result: finished.append(item.index))
+    run(engine.run(make_items(40)))
+    assert sorted(finished) == list(range(40))
+    assert processor.peak == 5
+
+
+def test_callbacks_report_start_finish_and_errors():
+    def handler(target):
+        if target["port"] == 0:
+            raise ValueError("bad target")
+        return ProcessingResult(success=True, message="ok")
+
+    events = []
+    engine = ProcessingEngine(
+        FakeProcessor(handler),
+        on_started=lambda item: events.append(("started", item.index)),
+        on_finished=lambda item, result: events.append(("finished", item.index)),
+        on_error=lambda item, ex: events.append(("error", item.index, str(ex))),
+    )
+    items = [WorkItem(0, {"ip": "10.0.0.1", "port": 80}), WorkItem(1, {"ip": "10.0.0.2", "port": 0})]
+    run(engine.run(items))
+    assert ("finished", 0) in events
+    assert ("error", 1, "bad target") in events
+    assert events.count(("started", 0)) == 1
+
+
+def test_broken_callback_does_not_stop_the_run():
+    finished = []
+
+    def on_finished(item, result):
+        finished.append(item.index)
+        raise RuntimeError("ui gone")
+
+    run(ProcessingEngine(FakeProcessor(), on_finished=on_finished).run(make_items(5)))
+    assert sorted(finished) == list(range(5))
+
+
+def test_feed_and_close_while_running():
+    processor = FakeProcessor()
+    engine = ProcessingEngine(processor, concurrency=3)
+
+    async def main():
+        task = asyncio.create_task(engine.run())
+        await asyncio.sleep(0)
+        for item in make_items(10):
+            engine.feed(item)
+        engine.close()
+        await task
+        with pytest.raises(RuntimeError):
+            engine.feed(make_items(1)[0])
+
+    run(main())
+    assert len(processor.calls) == 10
+
+
+def test_empty_run_returns_at_once():
+    run(ProcessingEngine(FakeProcessor()).run([]))
@@ -0,0 +1,89 @@
+# tests/test_executors.py
+import os
+import threading
+import pytest
+from processor.base import ProcessorBase, ProcessingResult, ExecutionMode
+from processor.executors import ExecutorPool
+from tests.helpers import FakeProcessor, run
+
+
+class _Named(ProcessorBase):
+    @property
+    def name(self) -> str:
+        return type(self).__name__
+
+    @property
+    def description(self) -> str:
+        return "Test processor"
+
+
+class BlockingProcessor(_Named):
+    """Reports where process_blocking ran"""
+
+    def __init__(self, mode: ExecutionMode):
+        super().__init__()
+        self.mode = mode
+
+    @property
+    def execution_mode(self) -> ExecutionMode:
+        return self.mode
+
+    def process_blocking(self, target: dict) -> ProcessingResult:
+        return ProcessingResult(success=True, message=threading.current_thread().name,
+                                details={"pid": os.getpid(), "timeout": self.config.get("timeout")})
+
+
+class AsyncOnlyProcessor(_Named):
+    async def process(self, target: dict) -> ProcessingResult:
+        return ProcessingResult(success=True, message=f"async {target['ip']}", color="green")
+
+
+class EmptyProcessor(_Named):
+    pass
+
+
+def test_processor_without_process_is_refused():
+    with pytest.raises(TypeError, match="process or process_blocking"):
+        EmptyProcessor()
+
+
+def test_blocking_only_processor_runs_through_process():
+    processor = BlockingProcessor(ExecutionMode.ASYNC)
+    result = run(processor.process({"ip": "10.0.0.1", "port": 80}))
+    assert result.success
+    assert result.message != threading.current_thread().name
+
+
+def test_async_only_processor_runs_through_process_blocking():
+    result = AsyncOnlyProcessor().process_blocking({"ip": "10.0.0.1", "port": 80})
+    assert result.message == "async 10.0.0.1"
+
+
+def test_async_mode_awaits_on_the_loop():
+    pool = ExecutorPool()
+    processor = FakeProcessor()
+    result = run(pool.run(processor, {"ip": "10.0.0.1", "port": 80}))
+    assert result.success and processor.calls == [{"ip": "10.0.0.1", "port": 80}]
+    assert pool._thread_pool is None and pool._process_pool is None
+
+
+def test_thread_mode_uses_the_bounded_pool():
+    pool = ExecutorPool(max_threads=2)
+    try:
+        result = run(pool.run(BlockingProcessor(ExecutionMode.THREAD), {"ip": "10.0.0.1", "port": 80}))
+    finally:
+        pool.shutdown(wait=True)
+    assert result.message.startswith("dh-proc")
+    assert pool._thread_pool is None
+
+
+def test_process_mode_runs_in_another_process_with_the_run_config():
+    processor = BlockingProcessor(ExecutionMode.PROCESS)
+    processor.config = {"timeout": 7}
+    pool = ExecutorPool(max_processes=1)
+    try:
+        result = run(pool.run(processor, {"ip": "10.0.0.1", "port": 80}))
+    finally:
+        pool.shutdown(wait=True)
+    assert result.details["pid"] != os.getpid()
+    assert result.details["timeout"] == 7
@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+from data.Models import AggResult
+from data.exporters import EXPORT_COLUMNS, get_exporter, split_row
+from data.json_storage import JsonStorageManager
+
+
+def queue_item(ip, port, **status):
+    result = AggResult(ip=ip, port=port, service="http")
+    for name, value in status.items():
+        setattr(result, name, value)
+    return result
+
+
+ITEMS = [
+    queue_item("10.0.0.1", 80, processed=True, color="green", message="ok | fine", isSelected=True),
+    queue_item("10.0.0.2", 22, failed=True, color="red", message="refused", details={"error": "refused"}),
+    queue_item("10.0.0.3", 21),
+]
+
+
+def export(name, rows=ITEMS, **kwargs):
+    out = io.StringIO()
+    summary = get_exporter(name).export(iter(rows), out, total=len(rows), **kwargs)
+    return out.getvalue(), summary
+
+
+def test_summary_counts_outcomes():
+    _, summary = export("NDJSON")
+    assert (summary.total, summary.processed, summary.failed, summary.pending) == (3, 1, 1, 1)
+    assert summary.colors == {"green": 1, "red": 1}
+
+
+def test_csv_has_header_and_details():
+    text, _ = export("CSV")
+    rows = list(csv.reader(io.StringIO(text)))
+    assert rows[0] == EXPORT_COLUMNS + ["details"]
+    assert len(rows) == 4
+    assert json.loads(rows[2][-1]) == {"error": "refused"}
+
+
+def test_ndjson_round_trips():
+    text, _ = export("NDJSON")
+    lines = [json.loads(line) for line in text.splitlines()]
+    assert [line["ip"] for line in lines] == ["10.0.0.1", "10.0.0.2", "10.0.0.3"]
+    # UI-only attributes stay out of exports
+    assert "isSelected" not in lines[0]
+
+
+def test_markdown_pages_and_escapes():
+    exporter = get_exporter("Markdown")
+    out = io.StringIO()
+    exporter.__class__(page_size=2).export(ITEMS, out, total=3)
+    text = out.getvalue()
+    assert text.count("## Page") == 2
+    assert "ok \\| fine" in text
+    assert "- Processed: 1" in text
+
+
+def test_html_escapes_values():
+    item = queue_item("10.0.0.4", 80, message="<script>")
+    text, _ = export("HTML", rows=[item])
+    assert "&lt;script&gt;" in text and "<script>" not in text
+
+
+def test_exports_resolve_stored_responses(workdir):
+    from data.blob_store import BlobStore
+    body = "HTTP/1.1 200 OK\r\n" + "a" * 4000
+    item = queue_item("10.0.0.5", 80, details=BlobStore().externalize({"response": body}))
+    attrs, details = split_row(item)
+    assert details == {"response": body}
+
+
+def test_storage_export_writes_file(workdir):
+    from console import DHConsole
+    storage = JsonStorageManager(workdir / "saved_results", DHConsole())
+    path = storage.export(ITEMS, "processing", "CSV")
+    assert path.suffix == ".csv" and path.exists()
+    assert storage.export(ITEMS, "processing", "Nope") is None
@@ -0,0 +1,103 @@
+# tests/test_metrics.py
+import pytest
+from types import SimpleNamespace
+from processor.base import ProcessingResult
+from processor.engine import ProcessingEngine
+from processor.metrics import LatencyHistogram, RollingCounter, RunMetrics
+from tests.helpers import FakeProcessor, make_items, run
+
+
+def test_histogram_percentiles_within_bucket_precision():
+    histogram = LatencyHistogram()
+    for ms in range(1, 101):
+        histogram.record(ms / 1000)
+    assert histogram.total == 100 and histogram.max == 0.1
+    assert histogram.percentile(50) == pytest.approx(0.05, rel=1 / 16)
+    assert histogram.percentile(99) == pytest.approx(0.099, rel=1 / 16)
+    assert histogram.percentile(100) == 0.1
+
+
+def test_histogram_empty_and_out_of_range():
+    histogram = LatencyHistogram(highest=1.0)
+    assert histogram.percentile(50) == 0.0
+    histogram.record(0.0)
+    histogram.record(50.0)
+    assert histogram.percentile(100) == 50.0
+    assert histogram.percentile(1) <= 2 * histogram.lowest
+
+
+def test_rolling_counter_forgets_old_slots():
+    counter = RollingCounter(slots=5)
+    counter.add(now=100.0)
+    counter.add(2, now=101.5)
+    assert counter.sum(5, now=102.0) == 3
+    assert counter.sum(1, now=102.0) == 0
+    # Slot 105 reuses the ring position of slot 100
+    counter.add(now=105.0)
+    assert counter.sum(5, now=105.0) == 3
+
+
+def test_outcomes_and_eta():
+    metrics = RunMetrics(expected=4)
+    metrics.observe_result(ProcessingResult(success=True, message="ok", color="green"))
+    metrics.observe_result(ProcessingResult(success=False, message="slow", color="red", error_type="timeout"))
+    metrics.observe_error(ValueError("broken"))
+    assert metrics.colors == {"green": 1, "red": 2}
+    assert metrics.errors == {"timeout": 1, "ValueError": 1}
+    assert metrics.eta is None
+    for _ in range(2):
+        metrics.item_done()
+    assert metrics.rate > 0 and metrics.eta > 0
+    for _ in range(2):
+        metrics.item_done()
+    assert metrics.eta == 0.0
+
+
+@pytest.mark.parametrize("seconds, text", [(None, "--"), (0.0123, "12ms"), (4.25, "4.2s"), (185, "3m05s")])
+def test_format_seconds(seconds, text):
+    assert RunMetrics.format_seconds(seconds) == text
+
+
+def test_engine_reports_attempts_and_outcomes():
+    def handler(target):
+        if target["ip"].endswith(".3"):
+            raise ValueError("broken")
+        return ProcessingResult(success=True, message="ok", color="green")
+
+    metrics = RunMetrics(expected=3)
+    run(ProcessingEngine(FakeProcessor(handler), concurrency=2, metrics=metrics).run(make_items(3)))
+    assert metrics.latency["Fake"].total == 3
+    assert metrics.colors == {"green": 2, "red": 1}
+    assert metrics.errors == {"ValueError": 1}
+    assert metrics.in_flight == 0
+    lines = metrics.summary_lines()
+    assert lines[0].startswith("Processed 0 of 3") and any(line.startswith("Fake: p50") for line in lines)
+
+
+def test_live_outcomes_cover_the_rolling_window(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr("processor.metrics.time", SimpleNamespace(monotonic=lambda: clock.now))
+    metrics = RunMetrics(window=10)
+    metrics.observe_result(ProcessingResult(success=False, message="slow", error_type="timeout"))
+    clock.now += 30
+    metrics.observe_result(ProcessingResult(success=True, message="ok", color="green"))
+    metrics.observe_error(ValueError("broken"))
+    assert metrics.recent_colors == {"green": 1, "red": 1}
+    assert metrics.recent_errors == {"ValueError": 1}
+    assert metrics.colors == {"green": 1, "red": 2}
+    assert metrics.errors == {"timeout": 1, "ValueError": 1}
+
+
+def test_panel_shows_window_while_running_and_totals_when_finished(monkeypatch):
+    from interface.elements.metrics_panel import MetricsPanel
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr("processor.metrics.time", SimpleNamespace(monotonic=lambda: clock.now))
+    metrics = RunMetrics(window=10)
+    metrics.observe_result(ProcessingResult(success=True, message="ok", color="green"))
+    clock.now += 30
+    metrics.observe_result(ProcessingResult(success=False, message="closed", error_type="refused"))
+    panel = MetricsPanel()
+    panel.show_metrics(metrics)
+    assert panel._txt_outcomes.value == "Last 10s: red 1, refused 1"
+    panel.show_metrics(metrics, running=False)
+    assert panel._txt_outcomes.value == "Total: green 1, red 1, refused 1"
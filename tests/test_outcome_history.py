@@ -0,0 +1,102 @@
+# tests/test_outcome_history.py
+from types import SimpleNamespace
+import pytest
+from processor.base import ProcessingResult
+from processor.engine import WorkItem
+
+
+@pytest.fixture
+def history(workdir, monkeypatch):
+    from data import outcome_history
+    clock = SimpleNamespace(now=1_000_000.0)
+    monkeypatch.setattr(outcome_history, "time", SimpleNamespace(time=lambda: clock.now))
+    return outcome_history, outcome_history.OutcomeHistory(), clock
+
+
+def result(success=True, message="ok", color="green", **details):
+    return ProcessingResult(success=success, message=message, color=color, details=details or None)
+
+
+def test_config_hash_ignores_key_order():
+    from data.outcome_history import config_hash
+    assert config_hash({"a": 1, "b": [2]}) == config_hash({"b": [2], "a": 1})
+    assert config_hash({"a": 1}) != config_hash({"a": 2})
+    assert config_hash(None) == config_hash({})
+
+
+def test_recent_matches_processor_config_and_age(history):
+    _, store, clock = history
+    store.record("Knock", "10.0.0.1", 80, "cfg", result())
+    store.record("Knock", "10.0.0.2", "443", "other", result())
+    store.record("Claw", "10.0.0.3", 22, "cfg", result())
+    clock.now += 3600
+    store.record("Knock", "10.0.0.4", 8080, "cfg", result())
+    assert store.recent("Knock", "cfg", 7200) == {("10.0.0.1", 80), ("10.0.0.4", 8080)}
+    assert store.recent("Knock", "cfg", 60) == {("10.0.0.4", 8080)}
+    assert store.recent("Knock", "other", 7200) == {("10.0.0.2", 443)}
+
+
+def test_exclude_recent_keeps_unseen_targets(history):
+    _, store, _ = history
+    store.record("Knock", "10.0.0.1", 80, "cfg", result())
+    items = [WorkItem(index=i, target={"ip": f"10.0.0.{i + 1}", "port": "80"}) for i in range(3)]
+    assert [item.index for item in store.exclude_recent(items, "Knock", "cfg", 60)] == [1, 2]
+    assert store.exclude_recent(items, "Knock", "new", 60) == items
+
+
+def test_latest_takes_the_newest_outcome_of_any_processor(history):
+    _, store, clock = history
+    store.record("Knock", "10.0.0.1", 80, "cfg", result(message="open"))
+    clock.now += 10
+    store.record("Claw", "10.0.0.1", 80, "cfg", result(success=False, message="no banner", color="red"))
+    store.record("Knock", "10.0.0.2", 80, "cfg", result(message="open"))
+    latest = store.latest([("10.0.0.1", "80"), ("10.0.0.9", 80)])
+    assert list(latest) == [("10.0.0.1", 80)]
+    assert latest[("10.0.0.1", 80)] == {"processor": "Claw", "ts": clock.now, "success": False,
+                                       "color": "red", "message": "no banner", "error_type": None}
+    assert store.latest([]) == {}
+
+
+def test_outcomes_are_written_in_batches(history, monkeypatch):
+    module, store, _ = history
+    monkeypatch.setattr(module, "HISTORY_BATCH_SIZE", 3)
+    count = lambda: store.conn.execute("SELECT count(*) FROM outcomes").fetchone()[0]
+    for port in range(1, 6):
+        store.record("Knock", "10.0.0.1", port, "cfg", result())
+    assert count() == 3
+    store.flush()
+    assert count() == 5
+
+
+def test_details_are_trimmed(history):
+    module, store, _ = history
+    store.record("Claw", "10.0.0.1", 80, "cfg", result(response="x" * 500, banners=list(range(20))))
+    store.flush()
+    details = store.conn.execute("SELECT details FROM outcomes").fetchone()[0]
+    assert '"x' + "x" * (module.DETAIL_PREVIEW_LENGTH - 1) + '..."' in details
+    assert "[0, 1, 2, 3, 4, 5, 6, 7, 8, 9]" in details
+
+
+def test_format_age(history):
+    module, _, clock = history
+    assert module.OutcomeHistory.format_age(clock.now - 120) == "2m ago"
+    assert module.OutcomeHistory.format_age(clock.now - 7200) == "2h ago"
+    assert module.OutcomeHistory.format_age(clock.now - 3 * 86400) == "3d ago"
+
+
+def test_targets_never_probed_are_not_recorded(history):
+    from processor.resilience import CircuitBreaker
+    _, store, _ = history
+    store.record("Knock", "10.0.0.1", 80, "cfg", result(success=False, color="red"))
+    store.record("Knock", "10.0.0.2", 80, "cfg", CircuitBreaker().rejection("10.0.0.2"))
+    assert store.recent("Knock", "cfg", 60) == {("10.0.0.1", 80)}
+    assert list(store.latest([("10.0.0.2", 80)])) == []
+
+
+def test_ports_that_are_not_numbers(history):
+    _, store, _ = history
+    store.record("Knock", "10.0.0.1", "http", "cfg", result())
+    items = [WorkItem(index=0, target={"ip": "10.0.0.1", "port": "http"}),
+             WorkItem(index=1, target={"ip": "10.0.0.1", "port": " 80"})]
+    assert [item.index for item in store.exclude_recent(items, "Knock", "cfg", 60)] == [1]
+    assert list(store.latest([("10.0.0.1", "http"), ("10.0.0.1", "n/a")])) == [("10.0.0.1", "http")]
@@ -0,0 +1,120 @@
+# tests/test_pipeline.py
+import asyncio
+import pytest
+from processor.base import ConfigProperty, ProcessingResult, ProcessorConfig
+from processor.engine import ENGINE_CONFIG_PROPERTIES
+from processor.pipeline import Pipeline, PipelineStage, parse_pipeline
+from processor.runner import build_run
+from tests.helpers import FakeProcessor, make_items, run
+
+
+def test_parse_pipeline():
+    first, second = FakeProcessor(name="First"), FakeProcessor(name="Second")
+    stages = parse_pipeline("First*5 > Second ? success", {"First": first, "Second": second}.get, concurrency=7)
+    assert [(stage.processor.name, stage.condition, stage.concurrency) for stage in stages] == [
+        ("First", "always", 5), ("Second", "success", 7)]
+    # Stages get their own copy, setting one up leaves the looked up instance alone
+    assert stages[0].processor is not first and stages[1].processor is not second
+
+
+@pytest.mark.parametrize("spec, error", [
+    ("Missing", "not found"),
+    ("First?sometimes", "Unknown stage condition"),
+    ("First > ", "Invalid pipeline stage"),
+])
+def test_parse_pipeline_errors(spec, error):
+    with pytest.raises(ValueError, match=error):
+        parse_pipeline(spec, {"First": FakeProcessor(name="First")}.get)
+
+
+def test_results_flow_through_conditions():
+    first = FakeProcessor(lambda target: ProcessingResult(
+        success=target["port"] == 22, message="first", details={"banners": ["SSH"]}), name="First")
+    second = FakeProcessor(name="Second")
+    events = []
+    pipeline = Pipeline(
+        [PipelineStage(first), PipelineStage(second, condition="success")],
+        on_finished=lambda stage, item, result, final: events.append((stage, item.index, final)),
+    )
+    items = make_items(2)
+    items[0].target["port"] = 22
+    run(pipeline.run(items))
+    assert sorted(events) == [(0, 0, False), (0, 1, True), (1, 0, True)]
+    # The next stage sees the upstream details
+    assert second.calls == [{"ip": items[0].target["ip"], "port": 22, "upstream": {"banners": ["SSH"]}}]
+
+
+def test_fast_targets_reach_the_next_stage_while_slow_ones_are_probed():
+    gate = []
+
+    def first_handler(target):
+        if target["ip"].endswith(".1"):
+            return asyncio.sleep(0.2, ProcessingResult(success=True, message="slow"))
+        return ProcessingResult(success=True, message="fast")
+
+    second = FakeProcessor(lambda target: gate.append(target["ip"]) or ProcessingResult(success=True, message="ok"),
+                           name="Second")
+    finished_first = []
+    pipeline = Pipeline(
+        [PipelineStage(FakeProcessor(first_handler), concurrency=2), PipelineStage(second)],
+        on_finished=lambda stage, item, result, final: stage == 0 and finished_first.append(item.index),
+    )
+
+    async def scenario():
+        task = asyncio.create_task(pipeline.run(make_items(2)))
+        await asyncio.sleep(0.1)
+        assert gate == ["10.0.0.2"] and finished_first == [1]
+        await task
+
+    run(scenario())
+    assert sorted(gate) == ["10.0.0.1", "10.0.0.2"]
+
+
+class SetupCounter(FakeProcessor):
+    def __init__(self, name):
+        super().__init__(name=name)
+        self.setups = 0
+        self.teardowns = 0
+
+    async def setup(self, config=None):
+        await super().setup(config)
+        self.setups += 1
+
+    async def teardown(self):
+        self.teardowns += 1
+
+
+def test_each_processor_is_set_up_once():
+    shared, other = SetupCounter("Shared"), SetupCounter("Other")
+    pipeline = Pipeline([PipelineStage(shared), PipelineStage(other), PipelineStage(shared)])
+    run(pipeline.run(make_items(3)))
+    assert (shared.setups, shared.teardowns, other.setups, other.teardowns) == (1, 1, 1, 1)
+    assert len(shared.calls) == 6
+
+
+def test_stop_ends_every_stage():
+    pipeline = Pipeline([
+        PipelineStage(FakeProcessor()),
+        PipelineStage(FakeProcessor(lambda target: asyncio.sleep(3600), name="Slow")),
+    ])
+    cancelled = []
+    pipeline.engines[1].on_cancelled = lambda item: cancelled.append(item.index)
+
+    async def scenario():
+        task = asyncio.create_task(pipeline.run(make_items(3)))
+        await asyncio.sleep(0.05)
+        pipeline.stop()
+        await asyncio.wait_for(task, 1)
+
+    run(scenario())
+    assert pipeline.stopped and sorted(cancelled) == [0, 1, 2]
+
+
+def test_stages_of_one_processor_keep_their_own_config():
+    shared = FakeProcessor(name="Shared", properties=[ConfigProperty("word", str, "default", "Word")])
+    options = ProcessorConfig(ENGINE_CONFIG_PROPERTIES, {"pipeline": "Shared", "adaptive_timeouts": False})
+    built = build_run(shared, shared.build_config({"word": "first"}), options, {"Shared": shared}.get)
+    run(built.engine.run(make_items(1)))
+    assert [stage.processor.config.word for stage in built.stages] == ["first", "default"]
+    # The registered instance is never set up, so other runs do not see this run's config
+    assert shared.config.word == "default"
@@ -0,0 +1,99 @@
+# tests/test_priority.py
+import asyncio
+import pytest
+from types import SimpleNamespace
+from processor.engine import ProcessingEngine, WorkItem
+from processor.priority import SCORERS, Prioritizer, PriorityWorkQueue, PriorityScorer, register_scorer
+from tests.helpers import FakeProcessor, run
+
+
+def item(index, port=80, ip=None, **source):
+    return WorkItem(index=index, target={"ip": ip or f"10.0.0.{index + 1}", "port": port},
+                    source=SimpleNamespace(**source))
+
+
+def order(spec, items, options=None):
+    prioritizer = Prioritizer.from_spec(spec, options)
+    prioritizer.prepare(items)
+    queue = PriorityWorkQueue(prioritizer)
+    for entry in items:
+        queue.put_nowait(entry)
+    return [queue.get_nowait().index for _ in items]
+
+
+def test_pinned_first_then_insertion_order():
+    items = [item(0), item(1, pinned=True), item(2), item(3, pinned=True)]
+    assert order("pinned", items) == [1, 3, 0, 2]
+
+
+def test_later_scorers_break_ties():
+    items = [item(0, port=8080, pinned=True), item(1, port=22), item(2, port=443, pinned=True), item(3, port=443)]
+    assert order("pinned,ports", items, {"priority_ports": "22,443"}) == [2, 0, 1, 3]
+
+
+def test_open_ports_counts_ports_per_host():
+    items = [item(0, ip="10.0.0.1"), item(1, ip="10.0.0.2"), item(2, ip="10.0.0.2")]
+    assert order("open_ports", items) == [1, 2, 0]
+
+
+def test_unseen():
+    assert order("unseen", [item(0, isUnseen=False), item(1, isUnseen=True)]) == [1, 0]
+
+
+def test_unknown_scorer():
+    with pytest.raises(ValueError, match="Unknown priority scorer"):
+        Prioritizer.from_spec("pinned,loudest")
+
+
+def test_register_scorer(monkeypatch):
+    monkeypatch.setattr("processor.priority.SCORERS", dict(SCORERS))
+
+    class Odd(PriorityScorer):
+        def score(self, entry):
+            return entry.index % 2
+
+    register_scorer("odd", lambda options: Odd())
+    assert order("odd", [item(0), item(1), item(2)]) == [1, 0, 2]
+
+
+def test_sentinels_come_last():
+    queue = PriorityWorkQueue(Prioritizer.from_spec("pinned"))
+    queue.put_nowait(None)
+    queue.put_nowait(item(0))
+    assert queue.get_nowait().index == 0
+    assert queue.get_nowait() is None
+
+
+def test_reprioritize_moves_a_queued_item():
+    queue = PriorityWorkQueue(Prioritizer.from_spec("pinned"))
+    entries = [item(i) for i in range(3)]
+    for entry in entries:
+        queue.put_nowait(entry)
+    entries[2].source.pinned = True
+    assert queue.reprioritize(2)
+    assert not queue.reprioritize(9)
+    assert queue.qsize() == 3
+    assert [queue.get_nowait().index for _ in range(3)] == [2, 0, 1]
+
+
+def test_engine_processes_in_priority_order():
+    processor = FakeProcessor()
+    items = [item(i, pinned=i == 3) for i in range(4)]
+    run(ProcessingEngine(processor, concurrency=1, prioritizer=Prioritizer.from_spec("pinned")).run(items))
+    assert [call["ip"] for call in processor.calls] == ["10.0.0.4", "10.0.0.1", "10.0.0.2", "10.0.0.3"]
+
+
+def test_pinning_mid_run_takes_effect():
+    processor = FakeProcessor(delay=0.01)
+    items = [item(i) for i in range(5)]
+    engine = ProcessingEngine(processor, concurrency=1, prioritizer=Prioritizer.from_spec("pinned"))
+
+    async def scenario():
+        task = asyncio.create_task(engine.run(items))
+        await asyncio.sleep(0)
+        items[4].source.pinned = True
+        engine.reprioritize(4)
+        await task
+
+    run(scenario())
+    assert processor.calls[1]["ip"] == "10.0.0.5"
@@ -0,0 +1,139 @@
+# tests/test_processor_logic.py
+import asyncio
+import threading
+import pytest
+from data.Models import AggResult
+from data.ResultQueueManager import ResultQueueManager
+from interface.ui_dispatcher import UIDispatcher
+from processor.base import ProcessorConfig, ProcessingResult
+from processor.engine import ENGINE_CONFIG_PROPERTIES
+from tests.helpers import FakeProcessor, run
+
+
+@pytest.fixture
+def logic(workdir):
+    import processor_logic
+    manager = processor_logic.ProcessorLogicManager()
+    queue = ResultQueueManager().get_proc_queue()
+    queue.results = [AggResult(ip=f"10.0.0.{i + 1}", port=80) for i in range(2)]
+    return manager, processor_logic.GuiRun, queue.results
+
+
+def options(**values):
+    return ProcessorConfig(ENGINE_CONFIG_PROPERTIES, {"adaptive_timeouts": False, "priority": "", **values})
+
+
+def test_stop_cancels_items_waiting_between_stages(logic, monkeypatch):
+    manager, GuiRun, results = logic
+    first = FakeProcessor(name="First")
+    second = FakeProcessor(lambda target: asyncio.sleep(3600), name="Second")
+    monkeypatch.setattr(manager.processor_manager, "get_processor", {"Second": second}.get)
+    gui_run = GuiRun(ui=UIDispatcher(lambda indices: None))
+
+    async def scenario():
+        task = asyncio.create_task(manager._process_items(
+            gui_run, first, first.build_config({}), options(pipeline="Second*1")))
+        while not second.calls:
+            await asyncio.sleep(0.01)
+        gui_run.stop()
+        await task
+
+    run(scenario())
+    # One item was in flight in the second stage, the other still queued for it
+    assert all(result.cancelled and not result.processing for result in results)
+
+
+def test_stopped_run_leaves_the_next_run_alone(logic):
+    manager, GuiRun, results = logic
+    old = GuiRun(ui=UIDispatcher(lambda indices: None))
+    new = GuiRun(ui=UIDispatcher(lambda indices: None))
+    slow = FakeProcessor(lambda target: asyncio.sleep(3600, ProcessingResult(success=True, message="late")))
+
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def gated(target):
+            await gate.wait()
+            return ProcessingResult(success=True, message="done", color="green")
+
+        fresh = FakeProcessor(gated)
+        old_task = asyncio.create_task(manager._process_items(old, slow, slow.build_config({}), options()))
+        new_task = asyncio.create_task(manager._process_items(new, fresh, fresh.build_config({}), options()))
+        while not slow.calls or not fresh.calls:
+            await asyncio.sleep(0.01)
+        old.stop()
+        await old_task
+        # The old run's cleanup stopped its own dispatcher only
+        assert old.ui._thread is None
+        assert new.ui._thread is not None and not new.engine.stopped
+        gate.set()
+        await new_task
+
+    run(scenario())
+    assert new.metrics.done == 2
+    assert all(result.message == "done" for result in results)
+
+
+def test_sample_counts_errors_and_circuit_rejections(logic):
+    manager, GuiRun, results = logic
+    results.append(AggResult(ip="10.0.0.1", port=443))
+
+    def handler(target):
+        if target["port"] == 443:
+            raise ValueError("broken")
+        return ProcessingResult(success=False, message="skipped", error_type="circuit_open")
+
+    gui_run = GuiRun(ui=UIDispatcher(lambda indices: None))
+    processor = FakeProcessor(handler)
+    run(manager._process_items(gui_run, processor, processor.build_config({}),
+                               options(sample_size=2, sample_by="port")))
+    strata = gui_run.sample_report.strata
+    assert (strata[443].completed, strata[443].errors) == (1, 1)
+    assert (strata[80].completed, strata[80].unprobed) == (0, 1)
+
+
+def test_metrics_panel_is_drawn_by_the_dispatcher(logic):
+    manager, GuiRun, results = logic
+    draws = []
+
+    class Panel:
+        def show_metrics(self, metrics, running=True):
+            draws.append((threading.current_thread().name, running))
+
+    gui_run = GuiRun(ui=UIDispatcher(lambda indices: None), metrics_panel=Panel())
+    processor = FakeProcessor(delay=0.2)
+    run(manager._process_items(gui_run, processor, processor.build_config({}), options()))
+    assert {thread for thread, _ in draws} == {"dh-ui-dispatcher"}
+    # The final draw is queued behind the live ones and applied when the dispatcher stops
+    assert draws[0][1] is True and draws[-1][1] is False and [running for _, running in draws].count(False) == 1
+
+
+def test_large_responses_are_stored_off_the_engine_loop(logic, monkeypatch):
+    from data.blob_store import BLOB_KEY, BlobStore
+    manager, GuiRun, results = logic
+    threads = []
+    externalize = BlobStore.externalize
+
+    def recording(store, value, *args):
+        threads.append(threading.current_thread().name)
+        return externalize(store, value, *args)
+
+    monkeypatch.setattr(BlobStore, "externalize", recording)
+    processor = FakeProcessor(lambda target: asyncio.sleep(
+        0.1, ProcessingResult(success=True, message="ok", details={"response": "x" * 5000})))
+    gui_run = GuiRun(ui=UIDispatcher(lambda indices: None))
+    run(manager._process_items(gui_run, processor, processor.build_config({}), options(concurrency=1)))
+    # Items finished while the run goes on and the ones left when it ends are all stored by the dispatcher
+    assert threads and set(threads) == {"dh-ui-dispatcher"}
+    assert all(BLOB_KEY in result.details["response"] for result in results)
+
+
+def test_concurrency_changes_are_printed_by_the_dispatcher(logic, monkeypatch):
+    manager, GuiRun, results = logic
+    printed = []
+    monkeypatch.setattr(manager.console, "print", lambda *args: printed.append(args[0]))
+    gui_run = GuiRun(ui=UIDispatcher(lambda indices: None))
+    manager._on_concurrency_changed(gui_run, 12, 0.25)
+    assert printed == []
+    gui_run.ui.flush()
+    assert len(printed) == 1 and "25% congestion errors" in printed[0]
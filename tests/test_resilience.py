@@ -0,0 +1,133 @@
+# tests/test_resilience.py
+import asyncio
+import pytest
+from processor.base import ProcessingResult
+from processor.engine import ProcessingEngine
+from processor.resilience import RetryPolicy, CircuitBreaker
+from tests.helpers import FakeProcessor, make_items, run
+
+
+def failure(error_type):
+    return ProcessingResult(success=False, message=error_type, error_type=error_type)
+
+
+def test_only_resets_are_retried_by_default():
+    policy = RetryPolicy(max_attempts=3)
+    assert policy.should_retry(1, failure("reset"), None)
+    assert policy.should_retry(1, None, ConnectionResetError())
+    assert not policy.should_retry(1, failure("timeout"), None)
+    assert not policy.should_retry(1, None, asyncio.TimeoutError())
+    assert not policy.should_retry(1, failure("refused"), None)
+    assert not policy.should_retry(3, failure("reset"), None)
+
+
+def test_timeouts_still_count_as_transient():
+    policy = RetryPolicy()
+    assert policy.is_transient(failure("timeout"), None)
+    assert not policy.is_transient(failure("refused"), None)
+    assert not policy.is_transient(ProcessingResult(success=True, message="ok"), None)
+
+
+def test_retry_on_can_include_timeouts():
+    assert RetryPolicy(max_attempts=2, retry_on={"timeout"}).should_retry(1, failure("timeout"), None)
+
+
+def test_delay_is_jittered_exponential_backoff():
+    policy = RetryPolicy(base_delay=0.1, max_delay=0.3)
+    for attempt, ceiling in ((1, 0.1), (2, 0.2), (3, 0.3), (6, 0.3)):
+        assert all(0 <= policy.delay(attempt) <= ceiling for _ in range(50))
+
+
+def test_engine_retries_resets_but_not_timeouts():
+    outcomes = {"10.0.0.1": ["reset", "reset", None], "10.0.0.2": ["timeout", None]}
+
+    def handler(target):
+        error_type = outcomes[target["ip"]].pop(0)
+        return failure(error_type) if error_type else ProcessingResult(success=True, message="ok")
+
+    processor = FakeProcessor(handler)
+    results = {}
+    items = make_items(2)
+    items[1].target["ip"] = "10.0.0.2"
+    run(ProcessingEngine(processor, retry_policy=RetryPolicy(max_attempts=3, base_delay=0),
+                         on_finished=lambda item, result: results.update({item.target["ip"]: result})).run(items))
+    assert results["10.0.0.1"].success
+    assert results["10.0.0.2"].error_type == "timeout"
+    assert len(processor.calls) == 4
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(threshold=2, cooldown=60)
+    breaker.record("10.0.0.1", True)
+    assert breaker.allow("10.0.0.1")
+    breaker.record("10.0.0.1", True)
+    assert not breaker.allow("10.0.0.1")
+    assert breaker.rejection("10.0.0.1").error_type == "circuit_open"
+    assert breaker.allow("10.0.0.2")
+
+
+def test_subnet_circuit():
+    breaker = CircuitBreaker(threshold=10, subnet_threshold=3, cooldown=60)
+    for host in range(3):
+        breaker.record(f"10.0.0.{host + 1}", True)
+    assert breaker.open_key("10.0.0.99") == "10.0.0"
+    assert breaker.allow("10.0.1.1")
+
+
+def test_success_resets_the_count():
+    breaker = CircuitBreaker(threshold=2)
+    breaker.record("10.0.0.1", True)
+    breaker.record("10.0.0.1", False)
+    breaker.record("10.0.0.1", True)
+    assert breaker.allow("10.0.0.1")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("processor.resilience.time.monotonic", lambda: now[0])
+    return now
+
+
+def test_half_open_lets_a_single_trial_through(clock):
+    breaker = CircuitBreaker(threshold=1, cooldown=30)
+    breaker.record("10.0.0.1", True)
+    clock[0] += 31
+    assert breaker.allow("10.0.0.1")
+    # Further probes wait for the trial's outcome
+    assert not breaker.allow("10.0.0.1")
+    breaker.record("10.0.0.1", False)
+    assert breaker.allow("10.0.0.1") and breaker.allow("10.0.0.1")
+
+
+def test_failed_trial_opens_the_circuit_again(clock):
+    breaker = CircuitBreaker(threshold=3, cooldown=30)
+    for _ in range(3):
+        breaker.record("10.0.0.1", True)
+    clock[0] += 31
+    assert breaker.allow("10.0.0.1")
+    breaker.record("10.0.0.1", True)
+    assert not breaker.allow("10.0.0.1")
+    clock[0] += 29
+    assert not breaker.allow("10.0.0.1")
+    clock[0] += 2
+    assert breaker.allow("10.0.0.1")
+
+
+def test_abandoned_trial_is_given_up_on(clock):
+    breaker = CircuitBreaker(threshold=1, cooldown=30)
+    breaker.record("10.0.0.1", True)
+    clock[0] += 31
+    assert breaker.allow("10.0.0.1")
+    clock[0] += 31
+    assert breaker.allow("10.0.0.1")
+
+
+def test_engine_rejects_targets_behind_an_open_circuit():
+    processor = FakeProcessor(lambda target: failure("timeout"))
+    results = []
+    run(ProcessingEngine(processor, concurrency=1, breaker=CircuitBreaker(threshold=2),
+                         on_finished=lambda item, result: results.append(result.error_type)).run(
+        make_items(4, ip="10.0.0.1")))
+    assert results == ["timeout", "timeout", "circuit_open", "circuit_open"]
+    assert len(processor.calls) == 2
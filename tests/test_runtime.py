@@ -0,0 +1,53 @@
+# tests/test_runtime.py
+import asyncio
+import threading
+import pytest
+from processor.runtime import ProcessingRuntime
+
+
+@pytest.fixture
+def runtime():
+    runtime = ProcessingRuntime(use_uvloop=False, max_threads=2)
+    yield runtime
+    runtime.shutdown()
+
+
+def test_runs_share_one_loop_thread(runtime):
+    async def where():
+        return threading.current_thread().name, asyncio.get_running_loop()
+
+    first = runtime.submit(where()).result(timeout=5)
+    second = runtime.submit(where()).result(timeout=5)
+    assert first == second
+    assert first[0] == "dh-processing-loop"
+
+
+def test_call_soon_runs_on_the_loop(runtime):
+    done = threading.Event()
+    names = []
+    runtime.call_soon(lambda: (names.append(threading.current_thread().name), done.set()))
+    assert done.wait(5)
+    assert names == ["dh-processing-loop"]
+
+
+def test_resources_are_created_once(runtime):
+    calls = []
+    factory = lambda: calls.append(1) or object()
+    assert runtime.get_resource("rtt", factory) is runtime.get_resource("rtt", factory)
+    assert calls == [1]
+
+
+def test_shutdown_stops_the_loop_and_can_restart(runtime):
+    runtime.start()
+    thread = runtime._thread
+    runtime.shutdown()
+    assert not thread.is_alive() and not runtime.is_running
+    assert runtime.submit(asyncio.sleep(0, "again")).result(timeout=5) == "again"
+
+
+def test_errors_surface_on_the_future(runtime):
+    async def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        runtime.submit(fail()).result(timeout=5)
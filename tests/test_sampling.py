@@ -0,0 +1,87 @@
+# tests/test_sampling.py
+import asyncio
+import random
+import time
+from collections import Counter
+from processor.base import ProcessingResult
+from processor.engine import ProcessingEngine, WorkItem
+from processor.resilience import RetryPolicy
+from processor.sampling import SampleReport, stratified_sample, wilson_interval
+from processor.scheduler import PolitenessScheduler
+from tests.helpers import FakeProcessor, make_items, run
+
+
+def test_wilson_interval():
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+    low, high = wilson_interval(50, 100)
+    assert low < 0.5 < high and abs((0.5 - low) - (high - 0.5)) < 1e-9
+    assert wilson_interval(0, 10)[0] == 0.0 and wilson_interval(10, 10)[1] == 1.0
+
+
+def test_sample_is_proportional_and_covers_every_stratum():
+    population = [("a", i) for i in range(80)] + [("b", i) for i in range(19)] + [("c", 0)]
+    sample = stratified_sample(population, 10, lambda item: item[0], rng=random.Random(1))
+    assert Counter(item[0] for item in sample) == {"a": 8, "b": 1, "c": 1}
+    assert len(set(sample)) == 10
+
+
+def test_sample_larger_than_population():
+    population = list(range(5))
+    assert stratified_sample(population, 10, lambda item: item % 2) == population
+
+
+def report(population):
+    return SampleReport(population, population, lambda item: item[0])
+
+
+def test_report_weights_strata_by_population():
+    population = [("a", i) for i in range(4)] + [("b", i) for i in range(4)]
+    sample_report = SampleReport(population, population[:2] + population[4:6], lambda item: item[0])
+    sample_report.record(population[0], True)
+    sample_report.record(population[1], False)
+    for item in population[4:6]:
+        sample_report.record(item, False)
+    rate, low, high = sample_report.estimate()
+    assert rate == 0.25 and low < rate < high
+    assert sample_report.lines()[0].startswith("Sample: 4 of 8 processed")
+
+
+def test_errors_are_misses_and_unprobed_items_are_left_out():
+    population = [("a", i) for i in range(4)]
+    sample_report = report(population)
+    sample_report.record(population[0], True)
+    sample_report.record_error(population[1])
+    sample_report.record_unprobed(population[2])
+    sample_report.record_unprobed(population[3])
+    stats = sample_report.strata["a"]
+    assert (stats.completed, stats.hits, stats.errors, stats.unprobed) == (2, 1, 1, 2)
+    assert sample_report.estimate()[0] == 0.5
+    assert "1 errors counted as misses, 2 not probed" in sample_report.lines()[1]
+
+
+def test_deadline_skips_queued_items():
+    skipped = []
+    engine = ProcessingEngine(FakeProcessor(delay=0.05), concurrency=1, deadline=time.monotonic() + 0.02,
+                              on_skipped=lambda item: skipped.append(item.index))
+    run(engine.run(make_items(3)))
+    assert skipped == [1, 2]
+
+
+def test_deadline_is_checked_again_after_waiting_for_a_retry_slot():
+    # The first item fails with a reset, by the time the host is free for its retry the budget is spent
+    def handler(target):
+        if target["port"] == 1:
+            return ProcessingResult(success=False, message="reset", error_type="reset")
+        return asyncio.sleep(0.2, ProcessingResult(success=True, message="slow"))
+
+    processor = FakeProcessor(handler)
+    finished = {}
+    items = [WorkItem(index=0, target={"ip": "10.0.0.1", "port": 1}),
+             WorkItem(index=1, target={"ip": "10.0.0.1", "port": 2})]
+    engine = ProcessingEngine(processor, concurrency=2, scheduler=PolitenessScheduler(max_per_host=1),
+                              retry_policy=RetryPolicy(max_attempts=3, base_delay=0.05),
+                              deadline=time.monotonic() + 0.1,
+                              on_finished=lambda item, result: finished.update({item.index: result}))
+    run(engine.run(items))
+    assert len(processor.calls) == 2
+    assert finished[0].error_type == "reset" and finished[1].success
@@ -0,0 +1,154 @@
+# tests/test_scheduler.py
+import asyncio
+import time
+from collections import Counter
+from processor.base import ProcessingResult
+from processor.engine import ProcessingEngine, WorkItem
+from processor.scheduler import PolitenessScheduler, PoliteWorkQueue, TokenBucket, subnet_of
+from tests.helpers import FakeProcessor, make_items, run
+
+
+def test_subnet_of():
+    assert subnet_of("192.168.1.20") == "192.168.1"
+    assert subnet_of("example.com") == "example.com"
+    assert subnet_of("::1") == "::1"
+
+
+def test_interleave_round_robins_subnets():
+    ips = ["10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.1.1", "10.0.1.2", "10.0.2.1"]
+    assert PolitenessScheduler.interleave(ips, lambda ip: ip) == [
+        "10.0.0.1", "10.0.1.1", "10.0.2.1", "10.0.0.2", "10.0.1.2", "10.0.0.3"]
+
+
+def test_token_bucket_never_waits():
+    bucket = TokenBucket(rate=10)
+    assert bucket.try_take()
+    assert not bucket.try_take()
+    assert 0 < bucket.wait_time() <= 0.1
+
+
+def test_try_acquire_respects_host_and_subnet_limits():
+    scheduler = PolitenessScheduler(max_per_host=1, max_per_subnet=2)
+    assert scheduler.try_acquire("10.0.0.1")
+    assert not scheduler.try_acquire("10.0.0.1")
+    assert scheduler.wait_time("10.0.0.1") is None
+    assert scheduler.try_acquire("10.0.0.2")
+    assert not scheduler.try_acquire("10.0.0.3")
+    assert scheduler.try_acquire("10.0.1.1")
+    scheduler.release("10.0.0.1")
+    assert scheduler.try_acquire("10.0.0.3")
+
+
+def test_acquire_waits_for_release():
+    scheduler = PolitenessScheduler(max_per_host=1)
+
+    async def scenario():
+        scheduler.try_acquire("10.0.0.1")
+        waiter = asyncio.create_task(scheduler.acquire("10.0.0.1"))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        scheduler.release("10.0.0.1")
+        await asyncio.wait_for(waiter, 1)
+
+    run(scenario())
+
+
+def test_queue_skips_busy_hosts():
+    scheduler = PolitenessScheduler(max_per_host=1)
+    queue = asyncio.Queue()
+    for ip in ("10.0.0.1", "10.0.0.1", "10.0.1.1"):
+        queue.put_nowait(ip)
+    polite = PoliteWorkQueue(scheduler, queue, lambda ip: ip)
+    queue.put_nowait(None)
+
+    async def scenario():
+        assert await polite.get() == "10.0.0.1"
+        # The second item on the busy host is parked, the other host goes ahead of it
+        assert await polite.get() == "10.0.1.1"
+        waiter = asyncio.create_task(polite.get())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        scheduler.release("10.0.0.1")
+        assert await asyncio.wait_for(waiter, 1) == "10.0.0.1"
+        assert await polite.get() is None
+
+    run(scenario())
+
+
+def test_slow_host_does_not_block_other_hosts():
+    def handler(target):
+        if target["ip"] == "10.0.0.1":
+            return asyncio.sleep(0.3, ProcessingResult(success=True, message="slow"))
+        return ProcessingResult(success=True, message="fast")
+
+    finished = []
+    items = make_items(4, ip="10.0.0.1") + [
+        WorkItem(index=4 + i, target={"ip": f"10.0.{i + 1}.1", "port": 80}) for i in range(8)]
+    engine = ProcessingEngine(FakeProcessor(handler), concurrency=4,
+                              scheduler=PolitenessScheduler(max_per_host=1),
+                              on_finished=lambda item, result: finished.append(result.message))
+
+    async def scenario():
+        task = asyncio.create_task(engine.run(items))
+        await asyncio.sleep(0.2)
+        # Only one probe may run against the slow host, the other workers keep going
+        assert finished.count("fast") == 8
+        await task
+
+    run(scenario())
+    assert finished.count("slow") == 4
+
+
+def test_engine_never_exceeds_per_host_limit():
+    active, peak = Counter(), Counter()
+
+    async def handler(target):
+        active[target["ip"]] += 1
+        peak[target["ip"]] = max(peak[target["ip"]], active[target["ip"]])
+        await asyncio.sleep(0.01)
+        active[target["ip"]] -= 1
+        return ProcessingResult(success=True, message="ok")
+
+    items = [WorkItem(index=i, target={"ip": f"10.0.0.{i % 3 + 1}", "port": 80}) for i in range(30)]
+    run(ProcessingEngine(FakeProcessor(handler), concurrency=10,
+                         scheduler=PolitenessScheduler(max_per_host=2)).run(items))
+    assert max(peak.values()) == 2
+
+
+def test_host_delay_spaces_probes():
+    starts = []
+
+    def handler(target):
+        starts.append(time.monotonic())
+        return ProcessingResult(success=True, message="ok")
+
+    run(ProcessingEngine(FakeProcessor(handler), concurrency=4,
+                         scheduler=PolitenessScheduler(max_per_host=4, host_delay=0.05)).run(
+        make_items(4, ip="10.0.0.1")))
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    assert len(gaps) == 3 and min(gaps) >= 0.04
+
+
+class _BatchProcessor(FakeProcessor):
+    def __init__(self):
+        super().__init__(name="Batch")
+        self.batches = []
+
+    @property
+    def batch_size(self) -> int:
+        return 8
+
+    async def process_batch(self, targets):
+        self.batches.append([target["ip"] for target in targets])
+        for target in targets:
+            yield target, ProcessingResult(success=True, message="ok")
+
+
+def test_batch_worker_respects_per_host_limit():
+    processor = _BatchProcessor()
+    finished = []
+    run(ProcessingEngine(processor, concurrency=8, scheduler=PolitenessScheduler(max_per_host=2),
+                         on_finished=lambda item, result: finished.append(item.index)).run(
+        make_items(6, ip="10.0.0.1")))
+    assert sorted(finished) == list(range(6))
+    assert all(len(batch) <= 2 for batch in processor.batches)
@@ -0,0 +1,79 @@
+import json
+from data.Models import AggResult
+from data.search_index import SearchIndex
+
+
+def make_index(workdir):
+    results_dir = workdir / "saved_results"
+    results_dir.mkdir(exist_ok=True)
+    return SearchIndex(db_path=str(workdir / "data" / "index.db"), results_dir=results_dir), results_dir
+
+
+def test_snapshots_are_indexed_incrementally(workdir):
+    index, results_dir = make_index(workdir)
+    (results_dir / "results_1.json").write_text(json.dumps([
+        {"ip": "10.0.0.1", "port": 80, "banner": "Server: Apache/2.4.49 (Unix)", "asn": "AS1"},
+        {"ip": "10.0.0.2", "port": 22, "banner": "SSH-2.0-OpenSSH_7.2p2"},
+    ]))
+    assert index.refresh() == 2
+    assert index.refresh() == 0
+
+    hits = index.search("Apache/2.4.49")
+    assert [(r.ip, r.port, r.asn) for r in hits] == [("10.0.0.1", 80, "AS1")]
+    assert [r.ip for r in index.search("OpenSSH_7.2")] == ["10.0.0.2"]
+
+
+def test_index_stores_no_row_json(workdir):
+    index, _ = make_index(workdir)
+    columns = [row[1] for row in index.conn.execute("PRAGMA table_info(results_fts)")]
+    assert "row" not in columns
+
+
+def test_old_schema_is_rebuilt(workdir):
+    import sqlite3
+    path = workdir / "data" / "index.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE VIRTUAL TABLE results_fts USING fts5(banner, source UNINDEXED, row UNINDEXED)")
+    conn.commit()
+    conn.close()
+    index, _ = make_index(workdir)
+    columns = [row[1] for row in index.conn.execute("PRAGMA table_info(results_fts)")]
+    assert "details" in columns and "row" not in columns
+
+
+def test_live_rows_are_synced_incrementally(workdir):
+    index, _ = make_index(workdir)
+    first = AggResult(ip="10.0.0.1", port=80, banner="nginx/1.18")
+    second = AggResult(ip="10.0.0.2", port=80, banner="nginx/1.20")
+    assert index.index_live({"results": [first, second]}) == 2
+    # Nothing changed, nothing is indexed again
+    assert index.index_live({"results": [first, second]}) == 0
+
+    setattr(second, "message", "banner grabbed")
+    assert index.index_live({"results": [second]}) == 1
+    assert [r.ip for r in index.search("nginx", include_live=True)] == ["10.0.0.2"]
+    assert index.search("nginx", include_live=False) == []
+
+
+def test_live_rows_index_resolved_details(workdir):
+    from data.blob_store import BlobStore
+    index, _ = make_index(workdir)
+    result = AggResult(ip="10.0.0.3", port=8080)
+    setattr(result, "details", BlobStore().externalize({"response": "x" * 2000 + " JBossWeb/2.1"}))
+    index.index_live({"processing": [result]})
+    assert [r.port for r in index.search("JBossWeb")] == [8080]
+
+
+def test_resyncing_many_changed_live_rows_stays_linear(workdir):
+    import time
+    index, _ = make_index(workdir)
+    results = [AggResult(ip=f"10.{i // 65536}.{i // 256 % 256}.{i % 256}", port=80, banner="nginx")
+               for i in range(20000)]
+    index.index_live({"results": results})
+    for result in results[::2]:
+        setattr(result, "message", "probed")
+    started = time.monotonic()
+    assert index.index_live({"results": results}) == 10000
+    # A list of stale keys made this quadratic, tens of seconds at this size
+    assert time.monotonic() - started < 5
+    assert len(index.search("probed", limit=None)) == 10000
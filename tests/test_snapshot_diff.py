@@ -0,0 +1,125 @@
+import json
+import os
+from data.snapshot_diff import SnapshotDiffer, order_snapshots, pack_key, fingerprint, changed_fields
+
+
+def write_snapshot(path, rows):
+    path.write_text(json.dumps(rows))
+    return path
+
+
+def row(ip, port, banner="", service="http", **extra):
+    return {"ip": ip, "port": port, "banner": banner, "service": service, **extra}
+
+
+def test_added_removed_and_changed(tmp_path):
+    old = write_snapshot(tmp_path / "results_20240101_120000.json", [
+        row("10.0.0.1", 80, "nginx"),
+        row("10.0.0.2", 22, "OpenSSH_7.2"),
+        row("10.0.0.3", 443, "apache"),
+    ])
+    new = write_snapshot(tmp_path / "results_20240102_120000.json", [
+        row("10.0.0.1", 80, "nginx"),
+        row("10.0.0.2", 22, "OpenSSH_8.9"),
+        row("10.0.0.4", 21, "vsftpd"),
+    ])
+    diff = SnapshotDiffer().diff(old, new)
+
+    assert (diff.old_count, diff.new_count) == (3, 3)
+    assert diff.added == {pack_key("10.0.0.4", 21)}
+    assert diff.removed == {pack_key("10.0.0.3", 443)}
+    assert diff.changed == {pack_key("10.0.0.2", 22): ["banner"]}
+    assert diff.summary() == "1 added, 1 removed, 1 changed (3 -> 3 rows)"
+
+    results = {(r.ip, r.port): r for r in diff.iter_results()}
+    assert results[("10.0.0.4", 21)].diff == "added"
+    assert results[("10.0.0.3", 443)].diff == "removed"
+    assert results[("10.0.0.2", 22)].message == "changed: banner"
+    assert results[("10.0.0.2", 22)].banner == "OpenSSH_8.9"
+    assert len(results) == 3
+
+
+def test_diff_keeps_only_keys(tmp_path):
+    old = write_snapshot(tmp_path / "old.json", [row("10.0.0.1", 80, "x" * 10000)])
+    new = write_snapshot(tmp_path / "new.json", [row("10.0.0.1", 80, "y" * 10000), row("10.0.0.2", 80)])
+    diff = SnapshotDiffer().diff(old, new)
+    held = list(diff.added) + list(diff.removed) + list(diff.changed)
+    assert all(isinstance(key, int) for key in held)
+
+
+def test_duplicate_rows_are_reported_once(tmp_path):
+    old = write_snapshot(tmp_path / "old.json", [])
+    new = write_snapshot(tmp_path / "new.json", [row("10.0.0.1", 80), row("10.0.0.1", 80)])
+    diff = SnapshotDiffer().diff(old, new)
+    assert len(diff.to_results()) == 1
+
+
+def test_fingerprint_tells_fields_apart():
+    base = row("10.0.0.1", 80, "nginx", color="green", processed=True)
+    assert changed_fields(fingerprint(base), fingerprint(dict(base, service="https"))) == ["service"]
+    assert changed_fields(fingerprint(base), fingerprint(dict(base, color="red"))) == ["outcome"]
+    assert changed_fields(fingerprint(base), fingerprint(base)) == []
+
+
+def test_pack_key_classes():
+    assert pack_key("10.0.0.1", 80) != pack_key("10.0.0.1", 81)
+    assert pack_key("::1", 80) != pack_key("0.0.0.1", 80)
+    assert pack_key("example.com", 80) != pack_key("example.org", 80)
+    # A non-numeric port still gets a key instead of raising
+    assert pack_key("10.0.0.1", "http") != pack_key("10.0.0.1", "https")
+    assert pack_key("10.0.0.1", None) == pack_key("10.0.0.1", 0)
+
+
+def test_order_snapshots_by_timestamp_not_prefix(tmp_path):
+    processing = write_snapshot(tmp_path / "processing_20240105_090000.json", [])
+    results = write_snapshot(tmp_path / "results_20240101_090000.json", [])
+    assert order_snapshots(processing, results) == (results, processing)
+    assert order_snapshots(results, processing) == (results, processing)
+
+
+def test_order_snapshots_falls_back_to_mtime(tmp_path):
+    first = write_snapshot(tmp_path / "b.json", [])
+    second = write_snapshot(tmp_path / "a.json", [])
+    os.utime(first, (1000, 1000))
+    os.utime(second, (2000, 2000))
+    assert order_snapshots(second, first) == (first, second)
+
+
+def test_diff_rows_do_not_touch_search_history(workdir):
+    from data.AggResultQueue import AggResultQueue
+    from data.Models import AggResult
+    queue = AggResultQueue(purpose="RES")
+    seen = AggResult(ip="10.0.0.9", port=80, isUnseen=True)
+    queue.add_results([seen], record=False)
+    assert queue.results[0].isUnseen is True
+    assert not queue.db.check_service("10.0.0.9", 80)
+
+
+def test_first_duplicate_counts_in_both_snapshots(tmp_path):
+    old = write_snapshot(tmp_path / "old.json", [row("10.0.0.1", 80, "nginx"), row("10.0.0.1", 80, "apache")])
+    new = write_snapshot(tmp_path / "new.json", [row("10.0.0.1", 80, "nginx"), row("10.0.0.1", 80, "iis")])
+    diff = SnapshotDiffer().diff(old, new)
+    assert (diff.old_count, diff.new_count) == (2, 2)
+    assert not diff.added and not diff.removed and not diff.changed
+
+    new = write_snapshot(tmp_path / "new.json", [row("10.0.0.1", 80, "apache"), row("10.0.0.1", 80, "nginx")])
+    results = SnapshotDiffer().diff(old, new).to_results()
+    assert [(r.banner, r.message) for r in results] == [("apache", "changed: banner")]
+
+
+def test_replace_results_swaps_the_queue(workdir):
+    from data.AggResultQueue import AggResultQueue
+    from data.Models import AggResult
+    queue = AggResultQueue(purpose="RES")
+    queue.add_results([AggResult(ip="10.0.0.1", port=80)], record=False)
+    queue.replace_results([AggResult(ip="10.0.0.2", port=22)], record=False)
+    assert [(r.ip, r.port) for r in queue.results] == [("10.0.0.2", 22)]
+
+
+def test_gui_diff_reads_back_only_differing_rows(tmp_path):
+    from logic import LogicManager
+    old = write_snapshot(tmp_path / "results_20240101_120000.json", [row("10.0.0.1", 80), row("10.0.0.2", 80)])
+    new = write_snapshot(tmp_path / "results_20240102_120000.json", [row("10.0.0.1", 80), row("10.0.0.3", 80)])
+    old_path, new_path, diff, results = LogicManager._diff_snapshots(str(new), str(old))
+    assert (old_path, new_path) == (old, new)
+    assert sorted((r.ip, r.diff) for r in results) == [("10.0.0.2", "removed"), ("10.0.0.3", "added")]
@@ -0,0 +1,101 @@
+import asyncio
+import errno
+import socket
+from processor.base import probe_port, exchange, classify_error
+from tests.helpers import run
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def serve(handler):
+    server = await asyncio.start_server(handler, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+async def banner_handler(reader, writer):
+    writer.write(b"220 test FTP ready\r\n")
+    await writer.drain()
+    writer.close()
+
+
+async def echo_handler(reader, writer):
+    data = await reader.read(100)
+    writer.write(b"echo:" + data)
+    await writer.drain()
+    writer.close()
+
+
+def test_probe_open_and_refused_ports():
+    async def main():
+        server, port = await serve(banner_handler)
+        async with server:
+            open_outcome = await probe_port("127.0.0.1", port, timeout=2)
+        closed_outcome = await probe_port("127.0.0.1", free_port(), timeout=2)
+        return open_outcome, closed_outcome
+
+    open_outcome, closed_outcome = run(main())
+    assert open_outcome.is_open and open_outcome.rtt is not None
+    assert closed_outcome.status == "refused" and not closed_outcome.is_open
+
+
+def test_exchange_reads_banner_and_sends_payload():
+    async def main():
+        banner_server, banner_port = await serve(banner_handler)
+        echo_server, echo_port = await serve(echo_handler)
+        async with banner_server, echo_server:
+            banner = await exchange("127.0.0.1", banner_port, None, timeout=2)
+            echoed = await exchange("127.0.0.1", echo_port, b"hello", timeout=2)
+        return banner, echoed
+
+    banner, echoed = run(main())
+    assert banner.startswith("220 test FTP")
+    assert echoed == "echo:hello"
+
+
+def test_exchange_times_out_on_silent_service():
+    async def silent(reader, writer):
+        await asyncio.sleep(1)
+        writer.close()
+
+    async def main():
+        server, port = await serve(silent)
+        async with server:
+            try:
+                await exchange("127.0.0.1", port, None, timeout=0.1)
+            except asyncio.TimeoutError as ex:
+                return ex
+
+    assert classify_error(run(main())) == "timeout"
+
+
+def test_classify_error():
+    assert classify_error(ConnectionRefusedError()) == "refused"
+    assert classify_error(ConnectionResetError()) == "reset"
+    assert classify_error(socket.gaierror()) == "dns"
+    assert classify_error(OSError()) == "oserror"
+    assert classify_error(OSError(errno.EHOSTUNREACH, "No route to host")) == "oserror"
+    assert classify_error(OSError(errno.EADDRNOTAVAIL, "Cannot assign requested address")) == "resource"
+
+
+def test_builtin_processors_against_local_service():
+    from processor.manager import ProcessorManager
+    manager = ProcessorManager()
+    knocker = manager.get_processor("Port Knocker")
+    ctf = manager.get_processor("Capture The Flag")
+
+    async def main():
+        server, port = await serve(banner_handler)
+        async with server:
+            knocked = await knocker.process({"ip": "127.0.0.1", "port": port})
+            grabbed = await ctf.process({"ip": "127.0.0.1", "port": port})
+        refused = await knocker.process({"ip": "127.0.0.1", "port": free_port()})
+        return knocked, grabbed, refused
+
+    knocked, grabbed, refused = run(main())
+    assert knocked.success and knocked.color == "green"
+    assert grabbed.success and "220 test FTP" in grabbed.details["banners"]["Unknown Service"]
+    assert not refused.success and refused.error_type == "refused"
@@ -0,0 +1,81 @@
+# tests/test_timeouts.py
+from processor.base import ConnectOutcome, ProcessorConfig, adaptive_timeout
+from processor.context import RunContext, run_context
+from processor.engine import ENGINE_CONFIG_PROPERTIES
+from processor.manager import ProcessorManager
+from processor.runner import configure_rtt
+from processor.timeouts import RttTracker
+from tests.helpers import run
+
+
+def tracker(*rtts, ip="10.0.0.1", **kwargs):
+    rtt = RttTracker(**kwargs)
+    for sample in rtts:
+        rtt.observe(ip, sample)
+    return rtt
+
+
+def test_default_until_enough_samples():
+    assert tracker(0.01, 0.01).timeout_for("10.0.0.1", 3) == 3
+
+
+def test_timeout_is_a_multiple_of_p95():
+    # A single outlier in twenty samples stays above the p95
+    rtt = tracker(*[0.1] * 19, 1.0, k=4)
+    assert rtt.p95("10.0.0.1") == 0.1
+    assert abs(rtt.timeout_for("10.0.0.1", 3) - 0.4) < 1e-9
+
+
+def test_subnet_samples_cover_new_hosts():
+    rtt = tracker(0.1, 0.1, 0.1, k=4)
+    assert abs(rtt.timeout_for("10.0.0.77", 3) - 0.4) < 1e-9
+    assert rtt.timeout_for("10.0.1.1", 3) == 3
+
+
+def test_clamped_to_floor():
+    assert tracker(0.001, 0.001, 0.001, k=4, floor=0.25).timeout_for("10.0.0.1", 3) == 0.25
+
+
+def test_never_longer_than_the_configured_timeout():
+    slow = tracker(2.0, 2.0, 2.0, k=4, ceiling=10)
+    assert slow.timeout_for("10.0.0.1", 3) == 3
+    assert slow.timeout_for("10.0.0.1", 20) == 8
+
+
+def test_least_recently_observed_hosts_are_dropped():
+    rtt = tracker(0.1, ip="10.0.0.1", max_hosts=2, max_subnets=2)
+    rtt.observe("10.0.1.1", 0.1)
+    rtt.observe("10.0.0.1", 0.1)
+    rtt.observe("10.0.2.1", 0.1)
+    assert list(rtt._hosts) == ["10.0.0.1", "10.0.2.1"]
+    assert list(rtt._subnets) == ["10.0.0", "10.0.2"]
+
+
+def test_configure_rtt_applies_run_options():
+    options = ProcessorConfig(ENGINE_CONFIG_PROPERTIES, {
+        "timeout_factor": 3, "timeout_floor_ms": 100, "timeout_ceiling_ms": 50})
+    rtt = configure_rtt(RttTracker(), options)
+    assert (rtt.k, rtt.floor, rtt.ceiling) == (3, 0.1, 0.1)
+
+
+def test_adaptive_timeout_uses_the_run_tracker():
+    assert adaptive_timeout("10.0.0.1", 3) == 3
+    with run_context(RunContext(rtt=tracker(0.1, 0.1, 0.1, k=4))):
+        assert abs(adaptive_timeout("10.0.0.1", 3) - 0.4) < 1e-9
+    with run_context(RunContext()):
+        assert adaptive_timeout("10.0.0.1", 3) == 3
+
+
+def test_stutter_tester_keeps_its_fixed_timeout(monkeypatch):
+    seen = []
+
+    async def probe_port(host, port, timeout, use_cache=True):
+        seen.append(timeout)
+        return ConnectOutcome(status="timeout", timeout=timeout)
+
+    stutter = ProcessorManager().get_processor("Stutter Tester")
+    monkeypatch.setattr(stutter.config, "_values", {"timeout": 5, "attempts": 2})
+    monkeypatch.setitem(type(stutter).process.__globals__, "probe_port", probe_port)
+    with run_context(RunContext(rtt=tracker(0.01, 0.01, 0.01))):
+        run(stutter.process({"ip": "10.0.0.1", "port": 80}))
+    assert seen == [5, 5]
@@ -0,0 +1,64 @@
+# tests/test_ui_dispatcher.py
+import threading
+import time
+from types import SimpleNamespace
+from interface.ui_dispatcher import UIDispatcher
+
+
+def test_changes_for_a_key_are_merged_into_one_redraw():
+    redraws = []
+    ui = UIDispatcher(redraws.append)
+    tile = SimpleNamespace(processing=False, message="")
+    ui.post(0, tile, processing=True)
+    ui.post(0, tile, processing=False, message="done")
+    ui.flush()
+    assert (tile.processing, tile.message) == (False, "done")
+    assert redraws == [[0]]
+    ui.flush()
+    assert redraws == [[0]]
+
+
+def test_calls_run_in_order_and_failures_do_not_stop_the_frame():
+    seen = []
+    ui = UIDispatcher(lambda keys: seen.append(("redraw", keys)))
+    ui.call(seen.append, "first")
+    ui.call(lambda: 1 / 0)
+    ui.call(seen.append, "second")
+    ui.post(3, SimpleNamespace())
+    ui.flush()
+    assert seen == ["first", "second", ("redraw", [3])]
+
+
+def test_thread_applies_changes_and_stop_flushes_the_rest():
+    threads = []
+    ui = UIDispatcher(lambda keys: None, hz=60)
+    ui.start()
+    ui.call(lambda: threads.append(threading.current_thread().name))
+    deadline = time.monotonic() + 1
+    while not threads and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert threads == ["dh-ui-dispatcher"]
+    ui.stop()
+    assert ui._thread is None
+    ui.call(threads.append, "after stop")
+    ui.stop()
+    assert threads[-1] == "after stop"
+
+
+def test_changes_posted_by_a_call_land_in_the_same_frame():
+    redraws = []
+    ui = UIDispatcher(redraws.append)
+    tile = SimpleNamespace(details=None)
+    ui.call(lambda: ui.post(0, tile, details={"response": "stored"}))
+    ui.flush()
+    assert tile.details == {"response": "stored"} and redraws == [[0]]
+
+
+def test_thread_does_the_last_flush_itself():
+    threads = []
+    ui = UIDispatcher(lambda keys: threads.append(("redraw", threading.current_thread().name)), hz=1)
+    ui.start()
+    ui.call(lambda: threads.append(("call", threading.current_thread().name)))
+    ui.post(0, SimpleNamespace())
+    ui.stop()
+    assert threads == [("call", "dh-ui-dispatcher"), ("redraw", "dh-ui-dispatcher")]